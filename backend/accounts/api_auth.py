@@ -1,11 +1,13 @@
 from rest_framework.authtoken.views import ObtainAuthToken
-from rest_framework.authtoken.models import Token
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth import authenticate
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 
+from django_project.authentication import issue_token
+from django_project.login_gate import LoginGate
+
 
 class CustomAuthToken(APIView):
     permission_classes = [AllowAny]
@@ -17,12 +19,22 @@ class CustomAuthToken(APIView):
         if not email or not password:
             return Response({"error": "Email and password are required."}, status=status.HTTP_400_BAD_REQUEST)
 
+        gate = LoginGate(request, email)
+        if not gate.admit():
+            return Response(
+                {"error": "Too many failed login attempts. Try again later."},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(gate.retry_after)},
+            )
+
         user = authenticate(request, username=email, password=password)
 
         if not user:
+            gate.failed()
             return Response({"error": "Invalid credentials."}, status=status.HTTP_400_BAD_REQUEST)
+        gate.succeeded()
 
-        token, _ = Token.objects.get_or_create(user=user)
+        token = issue_token(user)
         return Response({
             "token": token.key,
             "user_id": user.id,
@@ -1,6 +1,20 @@
-from django.apps import AppConfig
+from django.apps import AppConfig, apps
 
 
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        # Beat runs without rest_framework.authtoken
+        if apps.is_installed('rest_framework.authtoken'):
+            from django.conf import settings
+            from django.core.cache import DEFAULT_CACHE_ALIAS
+
+            from django_project.authentication import require_shared_cache
+            from . import signals  # noqa: F401
+
+            # A revoked token's snapshot must leave every worker's view at once,
+            # and login failures must add up across workers and machines
+            require_shared_cache(DEFAULT_CACHE_ALIAS, "Cached token authentication")
+            require_shared_cache(settings.THROTTLE_CACHE_ALIAS, "Login lockouts")
@@ -0,0 +1,38 @@
+"""
+Keeps cached token snapshots (django_project.authentication) in step with
+users and tokens: a deleted token drops its snapshot, a saved user drops
+theirs, and a password change or deactivation deletes the user's token.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from django_project.authentication import invalidate_user, token_cache_key
+
+User = get_user_model()
+
+
+@receiver(post_delete, sender=Token)
+def drop_token_snapshot(sender, instance, **kwargs):
+    cache.delete(token_cache_key(instance.key))
+
+
+@receiver(pre_save, sender=User)
+def note_credential_change(sender, instance, update_fields=None, **kwargs):
+    # set_password() keeps the raw password in _password until save() completes
+    instance._revoke_tokens = instance.pk is not None and (
+        getattr(instance, '_password', None) is not None or not instance.is_active
+    )
+
+
+@receiver(post_save, sender=User)
+def refresh_token_snapshots(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields and set(update_fields) == {'last_login'}):
+        return
+    if getattr(instance, '_revoke_tokens', False):
+        # Deleting the token also drops its snapshot
+        Token.objects.filter(user_id=instance.pk).delete()
+    else:
+        invalidate_user(instance.pk)
@@ -0,0 +1,9 @@
+from celery import shared_task
+
+
+@shared_task
+def purge_expired_tokens():
+    """Delete API tokens past TOKEN_TTL_HOURS (see django_project.authentication)"""
+    from django_project.authentication import purge_expired_tokens as purge
+
+    return f"Purged {purge()} expired token(s)"
@@ -0,0 +1,168 @@
+import datetime
+import io
+from unittest import mock
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from django_project.authentication import issue_token, purge_expired_tokens, require_shared_cache, token_cache_key
+
+User = get_user_model()
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='donor@example.com', password='correct-horse', first_name='Ada')
+        self.client = APIClient()
+
+    def login(self, password='correct-horse'):
+        self.client.credentials()
+        return self.client.post(reverse('accounts:login'), {'email': self.user.email, 'password': password},
+                                format='json')
+
+    def me(self, key):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {key}')
+        return self.client.get(reverse('accounts:me'))
+
+    def test_lookup_is_cached_after_first_request(self):
+        key = self.login().json()['token']
+        self.assertEqual(self.me(key).json()['first_name'], 'Ada')
+        self.assertIsNotNone(cache.get(token_cache_key(key)))
+        with self.assertNumQueries(0):
+            response = self.me(key)
+        self.assertEqual(response.json()['email'], self.user.email)
+
+    def test_profile_save_refreshes_snapshot_and_keeps_password(self):
+        key = self.login().json()['token']
+        self.me(key)
+        response = self.client.put(reverse('accounts:me'), {'first_name': 'Grace'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(cache.get(token_cache_key(key)))
+        self.assertEqual(self.me(key).json()['first_name'], 'Grace')
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('correct-horse'))
+
+    def test_logout_revokes_token(self):
+        key = self.login().json()['token']
+        self.me(key)
+        self.assertEqual(self.client.post(reverse('accounts:logout')).status_code, 204)
+        self.assertFalse(Token.objects.filter(key=key).exists())
+        self.assertEqual(self.me(key).status_code, 401)
+
+    def test_password_change_and_deactivation_revoke_tokens(self):
+        key = self.login().json()['token']
+        self.me(key)
+        self.user.set_password('battery-staple')
+        self.user.save()
+        self.assertEqual(self.me(key).status_code, 401)
+
+        key = self.login('battery-staple').json()['token']
+        self.me(key)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.me(key).status_code, 401)
+
+    @override_settings(TOKEN_TTL_HOURS=1, TOKEN_ROTATE_AFTER_HOURS=0.5)
+    def test_expiry_rotation_and_purge(self):
+        token = issue_token(self.user)
+        self.assertEqual(issue_token(self.user).key, token.key)
+
+        Token.objects.filter(pk=token.pk).update(created=timezone.now() - datetime.timedelta(minutes=40))
+        rotated = issue_token(self.user)
+        self.assertNotEqual(rotated.key, token.key)
+        self.assertEqual(Token.objects.count(), 1)
+
+        Token.objects.filter(pk=rotated.pk).update(created=timezone.now() - datetime.timedelta(hours=2))
+        self.assertEqual(self.me(rotated.key).status_code, 401)
+        self.assertFalse(Token.objects.exists())
+
+        other = User.objects.create_user(email='other@example.com', password='x' * 10)
+        stale = Token.objects.create(user=other)
+        Token.objects.filter(pk=stale.pk).update(created=timezone.now() - datetime.timedelta(hours=2))
+        Token.objects.create(user=self.user)
+        self.assertEqual(purge_expired_tokens(), 1)
+        self.assertEqual(list(Token.objects.values_list('user_id', flat=True)), [self.user.pk])
+
+    def test_per_process_cache_refused_when_shared_one_required(self):
+        # The test cache is LocMem, which other workers can't see evictions in
+        with self.settings(REQUIRE_SHARED_CACHE=True):
+            with self.assertRaises(ImproperlyConfigured):
+                require_shared_cache('default', 'Cached token authentication')
+        require_shared_cache('default', 'Cached token authentication')
+
+    def test_benchmark_command_runs(self):
+        out = io.StringIO()
+        call_command('benchmark_auth', '--requests', '5', stdout=out)
+        self.assertIn('cached-token', out.getvalue())
+        self.assertFalse(User.objects.filter(email__startswith='benchmark-auth').exists())
+
+
+@override_settings(LOGIN_MAX_FAILURES_PER_ACCOUNT=3, LOGIN_MAX_FAILURES_PER_IP=5)
+class LoginGateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='donor@example.com', password='correct-horse')
+        self.client = APIClient()
+
+    def login(self, email='donor@example.com', password='correct-horse'):
+        return self.client.post(reverse('accounts:login'), {'email': email, 'password': password}, format='json')
+
+    def test_account_locked_before_hashing(self):
+        for _ in range(3):
+            self.assertEqual(self.login(password='wrong').status_code, 401)
+        with mock.patch('accounts.views.authenticate') as authenticate:
+            response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        authenticate.assert_not_called()
+
+    def test_success_clears_account_failures_and_ip_counts_unknown_emails(self):
+        self.login(password='wrong')
+        self.login(password='wrong')
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(self.login(password='wrong').status_code, 401)
+
+        # The success isn't counted against the IP, but logins for unknown emails are
+        self.assertEqual(self.login('nobody@example.com', 'x').status_code, 401)
+        self.assertEqual(self.login('someone@example.com', 'x').status_code, 401)
+        self.assertEqual(self.login('anyone@example.com', 'x').status_code, 429)
+
+    def test_spoofed_forwarded_for_keeps_the_ip_bucket(self):
+        # Fly's proxy appends the real client address after anything the client sent
+        for attempt in range(5):
+            response = self.client.post(
+                reverse('accounts:login'), {'email': f'guess{attempt}@example.com', 'password': 'x'},
+                format='json', HTTP_X_FORWARDED_FOR=f'10.0.0.{attempt}, 203.0.113.7',
+            )
+            self.assertEqual(response.status_code, 401)
+        response = self.client.post(
+            reverse('accounts:login'), {'email': 'guess5@example.com', 'password': 'x'},
+            format='json', HTTP_X_FORWARDED_FOR='10.0.0.99, 203.0.113.7',
+        )
+        self.assertEqual(response.status_code, 429)
+
+    def test_lockouts_need_a_shared_cache(self):
+        caches = {
+            'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+            'throttle': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        }
+        with self.settings(REQUIRE_SHARED_CACHE=True, CACHES=caches, THROTTLE_CACHE_ALIAS='throttle'):
+            with self.assertRaisesMessage(ImproperlyConfigured, 'Login lockouts'):
+                apps.get_app_config('accounts').ready()
+
+    def test_pbkdf2_hash_upgraded_to_tuned_argon2_on_login(self):
+        User.objects.filter(pk=self.user.pk).update(password=make_password('correct-horse', hasher='pbkdf2_sha256'))
+        self.assertEqual(self.login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('argon2$'))
+        self.assertIn('m=19456,t=2,p=1', self.user.password)
@@ -1,5 +1,11 @@
 from django.urls import path
 
+from .views import CustomAuthToken, LogoutAPIView, UserProfileAPIView
+
 app_name = "accounts"
 
-urlpatterns = []
+urlpatterns = [
+    path("login/", CustomAuthToken.as_view(), name="login"),
+    path("logout/", LogoutAPIView.as_view(), name="logout"),
+    path("me/", UserProfileAPIView.as_view(), name="me"),
+]
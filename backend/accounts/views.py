@@ -5,6 +5,9 @@ from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import authenticate, get_user_model
 
+from django_project.authentication import issue_token
+from django_project.login_gate import LoginGate
+
 from .serializers import CustomUserSerializer
 
 User = get_user_model()
@@ -49,9 +52,32 @@ class CustomAuthToken(ObtainAuthToken):
         if not email or not password:
             return Response({"error": "Email and password are required."}, status=status.HTTP_400_BAD_REQUEST)
 
+        gate = LoginGate(request, email)
+        if not gate.admit():
+            return Response(
+                {"error": "Too many failed login attempts. Try again later."},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(gate.retry_after)},
+            )
+
         user = authenticate(request, email=email, password=password)
         if not user:
+            gate.failed()
             return Response({"error": "Invalid credentials."}, status=status.HTTP_401_UNAUTHORIZED)
+        gate.succeeded()
 
-        token, created = Token.objects.get_or_create(user=user)
+        token = issue_token(user)
         return Response({"token": token.key})
+
+
+class LogoutAPIView(APIView):
+    """
+    POST /api/accounts/logout/
+    Deletes the caller's token, which also drops its cached lookup.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        if isinstance(request.auth, Token):
+            request.auth.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
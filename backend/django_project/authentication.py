@@ -0,0 +1,134 @@
+# django_project/authentication.py
+"""
+Token authentication served from the cache.
+
+DRF's TokenAuthentication joins Token and User on every authenticated
+request. CachedTokenAuthentication keeps a snapshot of the token's user
+(every field but the password) in the shared cache under a hash of the key,
+for TOKEN_CACHE_TIMEOUT seconds or until the token expires, and rebuilds
+request.user from it without a query. Snapshots are dropped when the token
+is deleted (logout, rotation, expiry) and when the user is saved; changing
+the password or deactivating the user also deletes their token
+(accounts.signals). QuerySet.update() on users bypasses those signals, so
+call invalidate_user() after one. Those evictions only reach other workers
+through a shared cache, so the app refuses to start on a per-process one
+unless REQUIRE_SHARED_CACHE is off (dev and tests).
+
+Tokens expire TOKEN_TTL_HOURS after they are issued. issue_token() hands
+out a fresh key once the current one is TOKEN_ROTATE_AFTER_HOURS old, and
+beat purges expired rows (accounts.tasks.purge_expired_tokens) so the
+table only holds live tokens.
+"""
+import datetime
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+TOKEN_CACHE_KEY = 'auth:token:{digest}'
+
+
+def token_cache_key(key):
+    # Hashed so live keys never show up in the cache's key space
+    return TOKEN_CACHE_KEY.format(digest=hashlib.sha256(key.encode()).hexdigest())
+
+
+def snapshot_fields():
+    return [field.attname for field in get_user_model()._meta.concrete_fields if field.attname != 'password']
+
+
+def token_expires_at(created):
+    if not settings.TOKEN_TTL_HOURS:
+        return None
+    return created + datetime.timedelta(hours=settings.TOKEN_TTL_HOURS)
+
+
+def is_expired(created, now=None):
+    expires_at = token_expires_at(created)
+    return expires_at is not None and expires_at <= (now or timezone.now())
+
+
+def require_shared_cache(alias, feature):
+    """Raise ImproperlyConfigured if caches[alias] is private to this process"""
+    if settings.REQUIRE_SHARED_CACHE and isinstance(caches[alias], LocMemCache):
+        raise ImproperlyConfigured(
+            f"{feature} needs a cache shared by every worker, but caches[{alias!r}] is per-process "
+            "memory; set REDIS_CACHE_URL (or REQUIRE_SHARED_CACHE=false for a single process)"
+        )
+
+
+def invalidate_user(user_id):
+    """Drop the cached snapshot behind each of the user's tokens"""
+    from rest_framework.authtoken.models import Token
+
+    keys = Token.objects.filter(user_id=user_id).values_list('key', flat=True)
+    cache.delete_many([token_cache_key(key) for key in keys])
+
+
+def issue_token(user):
+    """The user's token, replaced by a new key once it is due for rotation or expired"""
+    from rest_framework.authtoken.models import Token
+
+    token, created = Token.objects.get_or_create(user=user)
+    if not created and token.created <= timezone.now() - datetime.timedelta(hours=settings.TOKEN_ROTATE_AFTER_HOURS):
+        token.delete()
+        token = Token.objects.create(user=user)
+    return token
+
+
+def purge_expired_tokens(now=None):
+    from rest_framework.authtoken.models import Token
+
+    if not settings.TOKEN_TTL_HOURS:
+        return 0
+    cutoff = (now or timezone.now()) - datetime.timedelta(hours=settings.TOKEN_TTL_HOURS)
+    return Token.objects.filter(created__lte=cutoff).delete()[1].get(Token._meta.label, 0)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        snapshot = cache.get(cache_key)
+        if snapshot is None:
+            snapshot = self.load_snapshot(key)
+            timeout = settings.TOKEN_CACHE_TIMEOUT
+            expires_at = token_expires_at(snapshot['created'])
+            if expires_at is not None:
+                timeout = min(timeout, max(1, int((expires_at - timezone.now()).total_seconds())))
+            cache.set(cache_key, snapshot, timeout)
+        elif is_expired(snapshot['created']):
+            raise exceptions.AuthenticationFailed(_('Token has expired.'))
+
+        # Only the snapshot's fields are loaded, so a save() can't blank the password
+        user = get_user_model().from_db(DEFAULT_DB_ALIAS, snapshot['fields'], snapshot['values'])
+        token = self.get_model()(key=key, user=user, created=snapshot['created'])
+        token._state.adding = False
+        return user, token
+
+    def load_snapshot(self, key):
+        model = self.get_model()
+        try:
+            token = model.objects.select_related('user').get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        if is_expired(token.created):
+            token.delete()
+            raise exceptions.AuthenticationFailed(_('Token has expired.'))
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        fields = snapshot_fields()
+        return {
+            'created': token.created,
+            'fields': fields,
+            'values': [getattr(token.user, field) for field in fields],
+        }
@@ -13,3 +13,12 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # Load task modules from all registered Django apps
 app.autodiscover_tasks()
+
+# Per-task query/cache/HTTP instrumentation (connects task_prerun/task_postrun)
+from . import instrumentation  # noqa: E402,F401
+
+# Worker heartbeat read by the API's readiness check (connects worker_ready)
+from . import health  # noqa: E402,F401
+
+# Daily archive-and-delete of old rows (apply_retention, scheduled from beat)
+from . import retention  # noqa: E402,F401
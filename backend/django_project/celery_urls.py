@@ -2,11 +2,12 @@
 # Minimal URL configuration for Celery workers (bypasses admin)
 
 from django.urls import path
-from django.http import JsonResponse
+
+from .renderers import ORJSONResponse
 
 def celery_health_check(request):
     """Simple health check for Celery workers"""
-    return JsonResponse({
+    return ORJSONResponse({
         "status": "celery_worker_healthy",
         "service": "celery",
         "message": "Celery worker URLs loaded successfully"
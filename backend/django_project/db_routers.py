@@ -0,0 +1,94 @@
+# django_project/db_routers.py
+"""
+Read-replica routing.
+
+Reads go to the replica only inside replica_reads() (a context manager and
+decorator) and only when a "replica" database is configured; everything
+else, and every write, uses the primary. A client that has just written
+(e.g. created a donation) is pinned to the primary for REPLICA_PIN_SECONDS
+through a cookie, so it reads its own writes even if the replica lags.
+"""
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_ALIAS = 'replica'
+PIN_COOKIE = 'primary_pin'
+
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+# Per-request {'pinned': bool, 'wrote': bool}, set by ReplicaPinMiddleware
+_request_state = contextvars.ContextVar('replica_request_state', default=None)
+
+
+@contextmanager
+def replica_reads():
+    """Send reads in this block to the replica (if configured and not pinned)"""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Force reads in this block back to the primary, e.g. to fill a long-lived cache"""
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get() or not replica_configured():
+            return None
+        state = _request_state.get()
+        if state is not None and (state['pinned'] or state['wrote']):
+            return None
+        # Reads inside a transaction on the primary must see that transaction
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPLICA_ALIAS, None}
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaPinMiddleware:
+    """Pins clients that wrote in this request (or recently) to the primary"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = {'pinned': PIN_COOKIE in request.COOKIES, 'wrote': False}
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+
+        if state['wrote'] and replica_configured():
+            secure = request.is_secure()
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True,
+                secure=secure, samesite='None' if secure else 'Lax',
+            )
+        return response
@@ -0,0 +1,27 @@
+# django_project/hashers.py
+"""
+Argon2 tuned for small machines.
+
+Django's Argon2 defaults (100 MiB, parallelism 8) are sized for big
+servers; a handful of concurrent logins would exhaust a small Fly VM.
+The costs come from PASSWORD_ARGON2_* instead (defaults follow OWASP's
+19 MiB / 2 passes / 1 lane). Hashes made with other parameters, or by the
+PBKDF2 hashers listed after this one, still verify and are rewritten with
+these on the user's next successful login.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
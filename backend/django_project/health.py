@@ -0,0 +1,187 @@
+# django_project/health.py
+"""
+Readiness checks.
+
+Dependency probes (database, cache, Celery broker, worker heartbeat) run on
+a background thread every HEALTH_CHECK_INTERVAL seconds; the endpoints only
+return the last rendered verdict, so a load balancer polling them adds no
+load to the dependencies themselves. Liveness (/health/) stays a plain
+"process is up" response in urls.py.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+
+from celery.signals import worker_ready, worker_shutdown
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+WORKER_HEARTBEAT_KEY = 'health:celery-worker-heartbeat'
+
+
+def _render(report):
+    # Imported late: django_project/__init__ imports this module (via celery.py)
+    # while settings are still loading, and importing DRF then would freeze
+    # its api_settings before REST_FRAMEWORK exists
+    from .renderers import dumps
+    return dumps(report)
+
+
+# ---------------- Probes ----------------
+def check_database():
+    for alias in connections:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+
+def check_cache():
+    key = f'health:probe:{socket.gethostname()}:{os.getpid()}'
+    cache.set(key, 1, 30)
+    if cache.get(key) != 1:
+        raise RuntimeError('cache read-back mismatch')
+
+
+def check_broker():
+    from .celery import app
+    with app.connection_for_write(settings.CELERY_BROKER_URL) as connection:
+        connection.ensure_connection(max_retries=1, timeout=settings.HEALTH_CHECK_TIMEOUT)
+
+
+def check_worker_heartbeat():
+    heartbeat = cache.get(WORKER_HEARTBEAT_KEY)
+    if heartbeat is None:
+        raise RuntimeError('no worker heartbeat')
+    age = time.time() - heartbeat['at']
+    if age > settings.HEALTH_WORKER_HEARTBEAT_MAX_AGE:
+        raise RuntimeError(f"last heartbeat from {heartbeat['hostname']} {age:.0f}s ago")
+    return {'hostname': heartbeat['hostname'], 'age_seconds': round(age, 1)}
+
+
+PROBES = {
+    'database': check_database,
+    'cache': check_cache,
+    'broker': check_broker,
+    'worker': check_worker_heartbeat,
+}
+
+
+def run_checks():
+    """Run every probe once and return the readiness report"""
+    checks = {}
+    for name, probe in PROBES.items():
+        start = time.perf_counter()
+        try:
+            details = probe()
+            result = {'status': 'ok'}
+            if details:
+                result.update(details)
+        except Exception as e:
+            result = {'status': 'error', 'error': str(e)[:200]}
+        result['latency_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        checks[name] = result
+
+    failing = [name for name, result in checks.items() if result['status'] != 'ok']
+    critical = [name for name in failing if name in settings.HEALTH_CRITICAL_CHECKS]
+    return {
+        'status': 'unavailable' if critical else ('degraded' if failing else 'ready'),
+        'checked_at': time.time(),
+        'checks': checks,
+    }
+
+
+# ---------------- Background monitor ----------------
+class HealthMonitor:
+    """
+    Keeps the latest readiness report, pre-rendered. The probe thread is
+    started on first use in each process, so forked workers (gunicorn
+    --preload) each get their own.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = None
+        self.snapshot = None
+
+    def refresh(self):
+        report = run_checks()
+        for name, result in report['checks'].items():
+            if result['status'] != 'ok':
+                logger.warning(f"Health check {name} failing: {result['error']}")
+        self.snapshot = (report, _render(report))
+
+    def run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Health monitor refresh failed: {e}")
+            # Don't hold this thread's DB connections open between runs
+            connections.close_all()
+            time.sleep(settings.HEALTH_CHECK_INTERVAL)
+
+    def ensure_running(self):
+        if self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+            self.snapshot = None
+            if settings.HEALTH_CHECK_BACKGROUND:
+                threading.Thread(target=self.run, name='health-monitor', daemon=True).start()
+
+    def current(self):
+        """(report, rendered body); probes inline if nothing fresh is cached"""
+        self.ensure_running()
+        snapshot = self.snapshot
+        if snapshot is None or time.time() - snapshot[0]['checked_at'] > settings.HEALTH_CHECK_MAX_AGE:
+            if settings.HEALTH_CHECK_BACKGROUND and snapshot is not None:
+                # The monitor thread has stalled; report that instead of probing inline
+                stale = {**snapshot[0], 'status': 'unavailable', 'error': 'health report is stale'}
+                return stale, _render(stale)
+            self.refresh()
+            snapshot = self.snapshot
+        return snapshot
+
+
+monitor = HealthMonitor()
+
+
+def readiness(request):
+    report, body = monitor.current()
+    status = 503 if report['status'] == 'unavailable' else 200
+    return HttpResponse(body, status=status, content_type='application/json')
+
+
+# ---------------- Worker heartbeat ----------------
+_heartbeat_stop = threading.Event()
+
+
+def _beat(hostname):
+    while not _heartbeat_stop.is_set():
+        try:
+            cache.set(
+                WORKER_HEARTBEAT_KEY, {'hostname': hostname, 'at': time.time()},
+                settings.HEALTH_WORKER_HEARTBEAT_MAX_AGE * 2,
+            )
+        except Exception as e:
+            logger.warning(f"Worker heartbeat failed: {e}")
+        _heartbeat_stop.wait(settings.HEALTH_WORKER_HEARTBEAT_INTERVAL)
+
+
+@worker_ready.connect
+def _start_worker_heartbeat(sender=None, **kwargs):
+    hostname = getattr(sender, 'hostname', None) or socket.gethostname()
+    _heartbeat_stop.clear()
+    threading.Thread(target=_beat, args=(hostname,), name='worker-heartbeat', daemon=True).start()
+
+
+@worker_shutdown.connect
+def _stop_worker_heartbeat(**kwargs):
+    _heartbeat_stop.set()
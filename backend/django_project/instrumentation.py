@@ -0,0 +1,231 @@
+# django_project/instrumentation.py
+"""
+Per-request and per-task instrumentation: SQL query count and time, slow
+queries, cache hits/misses and outbound HTTP time.
+
+A sampled fraction of requests (INSTRUMENTATION_SAMPLE_RATE) is measured;
+unsampled requests only pay for one random() call. Results are logged as
+structured fields and, when INSTRUMENTATION_SERVER_TIMING is on, returned
+in a Server-Timing header.
+"""
+import contextvars
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from celery.signals import task_postrun, task_prerun
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar('instrumentation_metrics', default=None)
+_MISSING = object()
+
+
+class Metrics:
+    __slots__ = (
+        'started', 'queries', 'db_ms', 'slow_queries', 'cache_hits', 'cache_misses',
+        'http_calls', 'http_ms', 'slow_query_ms',
+    )
+
+    def __init__(self, slow_query_ms):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.slow_queries = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.http_calls = 0
+        self.http_ms = 0.0
+        self.slow_query_ms = slow_query_ms
+
+    @property
+    def duration_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def record_query(self, sql, elapsed_ms):
+        self.queries += 1
+        self.db_ms += elapsed_ms
+        if self.slow_query_ms is not None and elapsed_ms >= self.slow_query_ms:
+            self.slow_queries.append((round(elapsed_ms, 2), sql[:500]))
+
+    def as_fields(self):
+        return {
+            'duration_ms': round(self.duration_ms, 2),
+            'queries': self.queries,
+            'db_ms': round(self.db_ms, 2),
+            'slow_queries': len(self.slow_queries),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'http_calls': self.http_calls,
+            'http_ms': round(self.http_ms, 2),
+        }
+
+    def server_timing(self):
+        return ', '.join([
+            f'db;dur={self.db_ms:.1f};desc="{self.queries} queries"',
+            f'cache;desc="{self.cache_hits} hits {self.cache_misses} misses"',
+            f'http;dur={self.http_ms:.1f};desc="{self.http_calls} calls"',
+            f'total;dur={self.duration_ms:.1f}',
+        ])
+
+
+def current_metrics():
+    return _current.get()
+
+
+def _sampled():
+    rate = getattr(settings, 'INSTRUMENTATION_SAMPLE_RATE', 0)
+    return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+def _query_wrapper(metrics):
+    def wrapper(execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            metrics.record_query(sql, (time.perf_counter() - start) * 1000)
+    return wrapper
+
+
+class _Measurement:
+    """Activate a Metrics collector and DB wrappers until stop() is called"""
+
+    def __init__(self):
+        self.metrics = Metrics(getattr(settings, 'INSTRUMENTATION_SLOW_QUERY_MS', None))
+        self.stack = ExitStack()
+        wrapper = _query_wrapper(self.metrics)
+        for connection in connections.all():
+            self.stack.enter_context(connection.execute_wrapper(wrapper))
+        self.token = _current.set(self.metrics)
+
+    def stop(self):
+        self.stack.close()
+        _current.reset(self.token)
+        return self.metrics
+
+
+def log_metrics(kind, name, metrics, **fields):
+    fields = {'kind': kind, 'name': name, **fields, **metrics.as_fields()}
+    summary = ' '.join(f'{key}={value}' for key, value in fields.items())
+    logger.info(f"instrumentation {summary}", extra={'metrics': fields})
+    for elapsed_ms, sql in metrics.slow_queries:
+        logger.warning(f"slow query kind={kind} name={name} db_ms={elapsed_ms} sql={sql}")
+
+
+class InstrumentationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install_http_hooks()
+
+    def __call__(self, request):
+        if not _sampled():
+            return self.get_response(request)
+
+        measurement = _Measurement()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics = measurement.stop()
+
+        match = getattr(request, 'resolver_match', None)
+        name = match.view_name if match else request.path
+        log_metrics('request', name, metrics, method=request.method, status=response.status_code)
+        if getattr(settings, 'INSTRUMENTATION_SERVER_TIMING', False):
+            response['Server-Timing'] = metrics.server_timing()
+        return response
+
+
+# ---------------- Celery ----------------
+_task_measurements = {}
+
+
+@task_prerun.connect
+def _start_task_measurement(task_id=None, task=None, **kwargs):
+    if _sampled():
+        install_http_hooks()
+        _task_measurements[task_id] = _Measurement()
+
+
+@task_postrun.connect
+def _finish_task_measurement(task_id=None, task=None, state=None, **kwargs):
+    measurement = _task_measurements.pop(task_id, None)
+    if measurement:
+        log_metrics('task', task.name, measurement.stop(), state=state)
+
+
+# ---------------- Cache ----------------
+class InstrumentedCacheMixin:
+    """Counts hits and misses for get()/get_many() on sampled requests"""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version=version)
+        metrics = _current.get()
+        if metrics is not None:
+            if value is _MISSING:
+                metrics.cache_misses += 1
+            else:
+                metrics.cache_hits += 1
+        return default if value is _MISSING else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version=version)
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.cache_hits += len(found)
+            metrics.cache_misses += len(keys) - len(found)
+        return found
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    pass
+
+
+class InstrumentedRedisCache(InstrumentedCacheMixin, RedisCache):
+    pass
+
+
+# ---------------- Outbound HTTP ----------------
+_http_hooks_installed = False
+_in_http_call = contextvars.ContextVar('instrumentation_in_http_call', default=False)
+
+
+def _timed(func):
+    def wrapper(*args, **kwargs):
+        metrics = _current.get()
+        # urllib3 re-enters urlopen for retries and redirects; time the outer call only
+        if metrics is None or _in_http_call.get():
+            return func(*args, **kwargs)
+        token = _in_http_call.set(True)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _in_http_call.reset(token)
+            metrics.http_calls += 1
+            metrics.http_ms += (time.perf_counter() - start) * 1000
+    wrapper.__wrapped__ = func
+    return wrapper
+
+
+def install_http_hooks():
+    """
+    Time outbound calls made through urllib3 (requests, the Stripe SDK) and
+    httpx. Idempotent.
+    """
+    global _http_hooks_installed
+    if _http_hooks_installed:
+        return
+    _http_hooks_installed = True
+
+    import httpx
+    import urllib3
+
+    urllib3.connectionpool.HTTPConnectionPool.urlopen = _timed(urllib3.connectionpool.HTTPConnectionPool.urlopen)
+    httpx.HTTPTransport.handle_request = _timed(httpx.HTTPTransport.handle_request)
@@ -0,0 +1,73 @@
+# django_project/login_gate.py
+"""
+Lockout gate that runs before a login attempt reaches the password hasher.
+
+Every attempt atomically increments two counters in the throttle cache, one
+for the account (a hash of the normalised email, whether or not it exists)
+and one for the client IP, in fixed LOGIN_LOCKOUT_WINDOW windows. Once
+either passes its limit the attempt is refused with a 429 before
+authenticate() runs, so a flood of guesses, or of logins for emails that
+don't exist, costs a few cache operations instead of an Argon2 hash each.
+A successful login clears the account counter and takes itself back off
+the IP's, so only failures count towards a lockout. Incrementing before
+checking means concurrent attempts can't all slip in under the limit.
+The IP is DRF's get_ident(), which trusts only the last NUM_PROXIES
+X-Forwarded-For entries, so a forged header can't move a client to a
+fresh bucket. The counters only mean anything in a cache every worker
+shares; on a per-process one each worker would allow the full limit, so
+the accounts app refuses to start there (REQUIRE_SHARED_CACHE).
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+from .metrics import record_login
+
+
+class LoginGate:
+    def __init__(self, request, email):
+        self.cache = caches[settings.THROTTLE_CACHE_ALIAS]
+        self.window = settings.LOGIN_LOCKOUT_WINDOW
+        now = time.time()
+        index = int(now // self.window)
+        self.retry_after = max(1, int((index + 1) * self.window - now))
+
+        account = hashlib.sha256(email.strip().lower().encode()).hexdigest()
+        ip = BaseThrottle().get_ident(request)
+        self.account_key = f"login:failures:account:{account}:{index}"
+        self.ip_key = f"login:failures:ip:{ip}:{index}"
+        self.limits = {
+            self.account_key: settings.LOGIN_MAX_FAILURES_PER_ACCOUNT,
+            self.ip_key: settings.LOGIN_MAX_FAILURES_PER_IP,
+        }
+
+    def _incr(self, key):
+        self.cache.add(key, 0, self.window)
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Key expired between add() and incr()
+            self.cache.set(key, 1, self.window)
+            return 1
+
+    def admit(self):
+        """Count the attempt; False if the account or IP is locked out"""
+        for key, limit in self.limits.items():
+            if limit and self._incr(key) > limit:
+                record_login('locked')
+                return False
+        return True
+
+    def failed(self):
+        record_login('failure')
+
+    def succeeded(self):
+        record_login('success')
+        self.cache.delete(self.account_key)
+        try:
+            self.cache.decr(self.ip_key)
+        except ValueError:
+            pass
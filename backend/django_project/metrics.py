@@ -0,0 +1,195 @@
+# django_project/metrics.py
+"""
+Prometheus metrics for the API and Celery workers.
+
+When PROMETHEUS_MULTIPROC_DIR is set (it must be, before this module is
+imported, under gunicorn or a prefork worker), every process writes its
+samples there and a scrape aggregates all of them.
+
+/metrics/ on the API needs METRICS_AUTH_TOKEN outside DEBUG. Scrapers that
+can't send one (Fly's) read APP_METRICS_PORT instead: gunicorn's master
+serves the same metrics there, unauthenticated, on a port the public HTTP
+service never routes to, the way workers use CELERY_METRICS_PORT.
+"""
+import logging
+import os
+import time
+
+from celery.signals import task_postrun, task_prerun, worker_ready
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+if MULTIPROC_DIR:
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
+
+# ---------------- HTTP ----------------
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by route',
+    ['method', 'route', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+# ---------------- Donation funnel ----------------
+DONATIONS_CREATED = Counter('donations_created_total', 'Pending donations created at checkout start')
+DONATIONS_COMPLETED = Counter('donations_completed_total', 'Donations marked completed')
+DONATIONS_REFUNDED = Counter('donations_refunded_total', 'Donations refunded after completion')
+DONATION_AMOUNT = Counter('donation_amount_dollars_total', 'Donation dollars by outcome', ['status'])
+WEBHOOK_LAG = Histogram(
+    'stripe_webhook_lag_seconds', 'Time between the Stripe event and our processing of it',
+    ['event_type'],
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600),
+)
+
+# ---------------- Celery and email ----------------
+TASK_DURATION = Histogram(
+    'celery_task_duration_seconds', 'Celery task run time', ['task', 'state'],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+EMAILS_SENT = Counter('emails_sent_total', 'Email send attempts', ['kind', 'result'])
+
+
+def record_donation_transition(donation, old_status, is_new):
+    """Called from Donation.save() with the status before the save"""
+    if is_new:
+        DONATIONS_CREATED.inc()
+    if donation.payment_status == old_status:
+        return
+    if donation.payment_status == 'completed':
+        DONATIONS_COMPLETED.inc()
+        DONATION_AMOUNT.labels('completed').inc(float(donation.amount))
+    elif donation.payment_status == 'refunded' and old_status == 'completed':
+        DONATIONS_REFUNDED.inc()
+        DONATION_AMOUNT.labels('refunded').inc(float(donation.amount))
+
+
+def record_bulk_donation_transition(new_status, count, amount):
+    """Counterpart of record_donation_transition for the admin's bulk UPDATEs"""
+    if new_status == 'completed':
+        DONATIONS_COMPLETED.inc(count)
+    elif new_status == 'refunded':
+        DONATIONS_REFUNDED.inc(count)
+    DONATION_AMOUNT.labels(new_status).inc(float(amount))
+
+
+def record_webhook_lag(event):
+    created = event.get('created')
+    if created:
+        WEBHOOK_LAG.labels(event['type']).observe(max(0, time.time() - created))
+
+
+def record_email(kind, sent):
+    EMAILS_SENT.labels(kind, 'success' if sent else 'failure').inc()
+
+
+# ---------------- Authentication ----------------
+LOGIN_ATTEMPTS = Counter('login_attempts_total', 'Token login attempts', ['result'])
+
+
+def record_login(result):
+    """result is 'success', 'failure' or 'locked' (refused before hashing by the login gate)"""
+    LOGIN_ATTEMPTS.labels(result).inc()
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match else 'unmatched'
+        REQUEST_LATENCY.labels(request.method, route, response.status_code).observe(time.perf_counter() - start)
+        return response
+
+
+class CeleryQueueDepthCollector:
+    """Reads broker queue lengths at scrape time (Redis broker only)"""
+
+    def collect(self):
+        gauge = GaugeMetricFamily('celery_queue_depth', 'Messages waiting in the broker queue', labels=['queue'])
+        broker_url = settings.CELERY_BROKER_URL
+        if broker_url.startswith(('redis://', 'rediss://')):
+            try:
+                import redis
+                client = redis.Redis.from_url(broker_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+                for queue in getattr(settings, 'METRICS_CELERY_QUEUES', ['celery']):
+                    gauge.add_metric([queue], client.llen(queue))
+            except Exception as e:
+                logger.warning(f"Could not read Celery queue depth: {e}")
+        yield gauge
+
+
+def build_registry(include_queue_depth=True):
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        from prometheus_client import REGISTRY as registry
+    if include_queue_depth:
+        scrape_registry = CollectorRegistry()
+        scrape_registry.register(CeleryQueueDepthCollector())
+        return [registry, scrape_registry]
+    return [registry]
+
+
+def serve_app_metrics(port):
+    """Serve every gunicorn worker's metrics (plus queue depth) on an internal port"""
+    from prometheus_client import start_http_server
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(CeleryQueueDepthCollector())
+    start_http_server(port, registry=registry)
+    logger.info(f"Serving API metrics on :{port}")
+
+
+def metrics_view(request):
+    token = getattr(settings, 'METRICS_AUTH_TOKEN', '')
+    # Fail closed: without a token, /metrics/ is only open in DEBUG
+    if token:
+        if request.headers.get('Authorization') != f'Bearer {token}':
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        return HttpResponseForbidden()
+    body = b''.join(generate_latest(registry) for registry in build_registry())
+    return HttpResponse(body, content_type=CONTENT_TYPE_LATEST)
+
+
+# ---------------- Celery signals ----------------
+_task_starts = {}
+
+
+@task_prerun.connect
+def _task_started(task_id=None, **kwargs):
+    _task_starts[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _task_finished(task_id=None, task=None, state=None, **kwargs):
+    start = _task_starts.pop(task_id, None)
+    if start is not None:
+        TASK_DURATION.labels(task.name, state or 'UNKNOWN').observe(time.perf_counter() - start)
+
+
+@worker_ready.connect
+def _serve_worker_metrics(**kwargs):
+    """Workers have no web server, so expose their metrics on CELERY_METRICS_PORT"""
+    port = os.environ.get('CELERY_METRICS_PORT')
+    if not port:
+        return
+    from prometheus_client import start_http_server
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        start_http_server(int(port), registry=registry)
+    else:
+        start_http_server(int(port))
+    logger.info(f"Serving Celery worker metrics on :{port}")
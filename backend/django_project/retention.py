@@ -0,0 +1,255 @@
+# django_project/retention.py
+"""
+Data retention: archive, then delete, rows past their table's retention.
+
+Each RetentionPolicy names a model, the timestamp that ages its rows and
+RETENTION_DAYS[label] (0 or missing turns the policy off). Eligible rows
+are read in primary-key order a chunk at a time, each chunk is written as
+its own compressed file (gzipped JSON lines, or Parquet) under
+RETENTION_ARCHIVE_DIR/<label>/<run>/, and it is deleted in its own short
+transaction once that file is closed and synced, so no lock is held for
+long, every file on disk is readable and a crash at worst archives a
+chunk twice. Rows a policy's ``keep`` hook returns stay online regardless of
+age, e.g. the sent email that stops a thank-you going out twice.
+
+Nothing is archived or deleted until RETENTION_ARCHIVE_DIR points somewhere
+that survives a redeploy: apply() raises ImproperlyConfigured and the beat
+task logs a warning and skips. Dry runs work either way.
+
+Run daily from beat (apply_retention), or by hand with
+``manage.py apply_retention [--dry-run]``.
+"""
+import datetime
+import gzip
+import itertools
+import json
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from celery import shared_task
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMATS = ('jsonl', 'parquet')
+SIZE_SAMPLE_ROWS = 500
+
+
+def _latest_sent_email_per_donation(model):
+    """send_thank_you_email skips donations with a sent EmailLog, so keep one per donation"""
+    return model.objects.filter(was_sent=True, donation__isnull=False).order_by() \
+        .values('donation').annotate(latest=Max('pk')).values('latest')
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    label: str
+    date_field: str
+    filter: Q = Q()
+    keep: object = None  # model -> queryset of primary keys to keep online
+
+    @property
+    def model(self):
+        return apps.get_model(self.label)
+
+    @property
+    def days(self):
+        return settings.RETENTION_DAYS.get(self.label, 0)
+
+    @property
+    def enabled(self):
+        app_label = self.label.split('.')[0]
+        return bool(self.days) and any(config.label == app_label for config in apps.get_app_configs())
+
+    def eligible(self, now=None):
+        cutoff = (now or timezone.now()) - datetime.timedelta(days=self.days)
+        queryset = self.model.objects.filter(self.filter, **{f'{self.date_field}__lt': cutoff})
+        if self.keep is not None:
+            queryset = queryset.exclude(pk__in=self.keep(self.model))
+        return queryset
+
+
+POLICIES = [
+    RetentionPolicy('emails.EmailLog', 'created_at', keep=_latest_sent_email_per_donation),
+    RetentionPolicy('django_celery_results.TaskResult', 'date_done'),
+    # Abandoned checkouts the pending-donation sweeper expired or failed; anything
+    # that ever reached the ledger stays, since entries RESTRICT deleting it
+    RetentionPolicy('donations.Donation', 'updated_at',
+                    filter=Q(payment_status__in=['expired', 'failed'], ledger_entries__isnull=True)),
+]
+
+
+def _columns(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+# ---------------- Archives ----------------
+def _sync(path):
+    """fsync a finished file and the directory entry pointing at it"""
+    for target, flags in ((path, os.O_RDONLY), (path.parent, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))):
+        fd = os.open(target, flags)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class JSONLinesArchive:
+    suffix = '.jsonl.gz'
+
+    @staticmethod
+    def write(path, model, rows):
+        with gzip.open(path, 'wt', encoding='utf-8') as archive:
+            for row in rows:
+                archive.write(json.dumps(row, cls=DjangoJSONEncoder, separators=(',', ':')))
+                archive.write('\n')
+
+
+class ParquetArchive:
+    suffix = '.parquet'
+
+    @staticmethod
+    def schema_for(model):
+        import pyarrow as pa
+
+        types = []
+        for field in model._meta.concrete_fields:
+            if isinstance(field, (models.AutoField, models.IntegerField, models.ForeignKey)):
+                arrow_type = pa.int64()
+            elif isinstance(field, models.BooleanField):
+                arrow_type = pa.bool_()
+            elif isinstance(field, models.DateTimeField):
+                arrow_type = pa.timestamp('us', tz='UTC')
+            elif isinstance(field, models.FloatField):
+                arrow_type = pa.float64()
+            else:
+                # Decimals, JSON and text are kept as their string form
+                arrow_type = pa.string()
+            types.append((field.attname, arrow_type))
+        return pa.schema(types)
+
+    @classmethod
+    def write(cls, path, model, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = cls.schema_for(model)
+        strings = {name for name, arrow_type in zip(schema.names, schema.types) if arrow_type == pa.string()}
+        rows = [
+            {name: (value if value is None or name not in strings or isinstance(value, str) else
+                    json.dumps(value, cls=DjangoJSONEncoder) if isinstance(value, (dict, list)) else str(value))
+             for name, value in row.items()}
+            for row in rows
+        ]
+        pq.write_table(pa.Table.from_pylist(rows, schema=schema), path, compression='zstd')
+
+
+ARCHIVES = {'jsonl': JSONLinesArchive, 'parquet': ParquetArchive}
+
+
+# ---------------- Running policies ----------------
+@dataclass
+class RetentionResult:
+    label: str
+    rows: int = 0
+    kept: int = 0
+    estimated_bytes: int = 0
+    archive: str = ''
+
+
+def estimate_bytes(queryset, rows):
+    """Space the rows take: the table's share of its on-disk size on Postgres, JSON size elsewhere"""
+    if not rows:
+        return 0
+    model = queryset.model
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_total_relation_size(c.oid), GREATEST(c.reltuples, 1) FROM pg_class c "
+                "WHERE c.oid = to_regclass(%s)",
+                [connection.ops.quote_name(model._meta.db_table)],
+            )
+            total_bytes, total_rows = cursor.fetchone()
+        return int(total_bytes * min(1, rows / total_rows))
+    sample = list(queryset.order_by('pk').values(*_columns(model))[:SIZE_SAMPLE_ROWS])
+    average = sum(len(json.dumps(row, cls=DjangoJSONEncoder)) for row in sample) / len(sample)
+    return int(average * rows)
+
+
+def report(policy):
+    """Dry run: how many rows the policy would archive and roughly how much space that frees"""
+    eligible = policy.eligible()
+    rows = eligible.count()
+    result = RetentionResult(policy.label, rows=rows, estimated_bytes=estimate_bytes(eligible, rows))
+    if policy.keep is not None:
+        aged = policy.model.objects.filter(
+            policy.filter, **{f'{policy.date_field}__lt': timezone.now() - datetime.timedelta(days=policy.days)}
+        )
+        result.kept = aged.count() - rows
+    return result
+
+
+def archive_root():
+    if not settings.RETENTION_ARCHIVE_DIR:
+        raise ImproperlyConfigured(
+            "RETENTION_ARCHIVE_DIR is not set; point it at persistent storage before deleting anything"
+        )
+    return Path(settings.RETENTION_ARCHIVE_DIR)
+
+
+def apply(policy, archive_format=None, chunk_size=None):
+    """Archive and delete the policy's eligible rows chunk by chunk"""
+    root = archive_root()
+    archive_format = archive_format or settings.RETENTION_ARCHIVE_FORMAT
+    chunk_size = chunk_size or settings.RETENTION_CHUNK_SIZE
+    model = policy.model
+    now = timezone.now()
+    eligible = policy.eligible(now).order_by('pk')
+    columns = _columns(model)
+
+    directory = root / policy.label / f"{now:%Y%m%dT%H%M%S}"
+    archive_class = ARCHIVES[archive_format]
+
+    result = RetentionResult(policy.label)
+    last_pk = None
+    for part in itertools.count():
+        chunk = eligible if last_pk is None else eligible.filter(pk__gt=last_pk)
+        rows = list(chunk.values(*columns)[:chunk_size])
+        if not rows:
+            break
+        if not part:
+            directory.mkdir(parents=True, exist_ok=True)
+            result.archive = str(directory)
+        # Each chunk is a complete file, closed and synced, before its rows go
+        path = directory / f"part-{part:05d}{archive_class.suffix}"
+        archive_class.write(path, model, rows)
+        _sync(path)
+        pks = [row[model._meta.pk.attname] for row in rows]
+        with transaction.atomic():
+            model.objects.filter(pk__in=pks).delete()
+        result.rows += len(rows)
+        last_pk = pks[-1]
+    logger.info(f"Retention {policy.label}: archived and deleted {result.rows} row(s) {result.archive}")
+    return result
+
+
+def enabled_policies(labels=None):
+    return [policy for policy in POLICIES if policy.enabled and (not labels or policy.label in labels)]
+
+
+@shared_task
+def apply_retention():
+    if not settings.RETENTION_ARCHIVE_DIR:
+        logger.warning("Retention skipped: RETENTION_ARCHIVE_DIR is not set")
+        return {}
+    results = [apply(policy) for policy in enabled_policies()]
+    return {result.label: result.rows for result in results}
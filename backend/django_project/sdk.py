@@ -0,0 +1,64 @@
+# django_project/sdk.py
+"""
+Lazily imported, lazily configured third-party SDKs.
+
+``from django_project.sdk import stripe`` behaves like ``import stripe``, but
+the (slow) import and the api_key/api_base setup happen on first attribute
+access, so processes that never talk to Stripe or Cloudinary don't pay for
+them at startup.
+"""
+import importlib
+import threading
+
+from django.conf import settings
+
+
+class LazySDK:
+    def __init__(self, module_name, configure):
+        self._module_name = module_name
+        self._configure = configure
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    module = importlib.import_module(self._module_name)
+                    self._configure(module)
+                    self._module = module
+        return self._module
+
+    def __getattr__(self, name):
+        module = self._load()
+        try:
+            return getattr(module, name)
+        except AttributeError:
+            # Submodules the package doesn't import itself (cloudinary.uploader)
+            try:
+                return importlib.import_module(f'{self._module_name}.{name}')
+            except ModuleNotFoundError:
+                raise AttributeError(f"module {self._module_name!r} has no attribute {name!r}") from None
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f'<LazySDK {self._module_name} ({state})>'
+
+
+def _configure_stripe(module):
+    module.api_key = settings.STRIPE_SECRET_KEY
+    if settings.STRIPE_API_BASE:
+        module.api_base = settings.STRIPE_API_BASE
+
+
+def _configure_cloudinary(module):
+    module.config(
+        cloud_name=settings.CLOUDINARY_STORAGE['CLOUD_NAME'],
+        api_key=settings.CLOUDINARY_STORAGE['API_KEY'],
+        api_secret=settings.CLOUDINARY_STORAGE['API_SECRET'],
+        secure=True,
+    )
+
+
+stripe = LazySDK('stripe', _configure_stripe)
+cloudinary = LazySDK('cloudinary', _configure_cloudinary)
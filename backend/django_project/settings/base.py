@@ -1,14 +1,8 @@
 from environ import Env
 from pathlib import Path
 from django.core.exceptions import ImproperlyConfigured
-import stripe
-import os
-import sys
 
-# Cloudinary Configuration
-import cloudinary
-import cloudinary.uploader
-import cloudinary.api
+from .roles import detect_role, profile
 
 # Initialize environment variables
 env = Env()
@@ -40,18 +34,19 @@ else:
         'API_SECRET': env('CLOUDINARY_API_SECRET', default='dummy'),
     }
 
-cloudinary.config(
-    cloud_name=CLOUDINARY_STORAGE['CLOUD_NAME'],
-    api_key=CLOUDINARY_STORAGE['API_KEY'],
-    api_secret=CLOUDINARY_STORAGE['API_SECRET'],
-    secure=True
-)
+# The Cloudinary and Stripe SDKs are configured from these settings on first
+# use (django_project.sdk), not imported here
 
 # Stripe Configuration
 STRIPE_PUBLISHABLE_KEY = env('STRIPE_PUBLISHABLE_KEY', default='pk_test_dummy')
 STRIPE_SECRET_KEY = env('STRIPE_SECRET_KEY', default='sk_test_dummy')
 STRIPE_WEBHOOK_SECRET = env('STRIPE_WEBHOOK_SECRET', default='whsec_dummy')
-stripe.api_key = STRIPE_SECRET_KEY
+
+# Point the SDK at a local fake (manage.py fake_stripe_server) to run offline
+STRIPE_API_BASE = env('STRIPE_API_BASE', default='')
+
+# Resolves featured video URLs into embed/thumbnail metadata
+MEDIA_RESOLVER = env('MEDIA_RESOLVER', default='donations.media.OEmbedResolver')
 
 # Base directory
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -67,13 +62,9 @@ ALLOWED_HOSTS = env.list("DJANGO_ALLOWED_HOSTS", default=[
     "localhost", "127.0.0.1", "0.0.0.0", "backend", "*.fly.dev"
 ])
 
-# Celery Worker Detection
-IS_CELERY = (
-    os.environ.get('IS_CELERY_WORKER') == 'true' or
-    'celery' in sys.argv[0] or
-    'worker' in sys.argv or
-    'beat' in sys.argv
-)
+# Process role (web, worker, beat, manage) picks the app/middleware profile
+PROCESS_ROLE = detect_role()
+IS_CELERY = PROCESS_ROLE in ('worker', 'beat')
 
 # CSRF Exemptions for donation platform
 CSRF_EXEMPT_URLS = [
@@ -92,86 +83,10 @@ class DisableCSRFMiddleware:
         return self.get_response(request)
 
 # Application Configuration
-if IS_CELERY:
-    INSTALLED_APPS = [
-        'django.contrib.auth',
-        'django.contrib.contenttypes',
-        'django.contrib.sessions',
-        'django.contrib.messages',
-        'django.contrib.staticfiles',
-        'cloudinary_storage',
-        'cloudinary',
-
-        # Donation platform apps
-        'accounts.apps.AccountsConfig',
-        'donations.apps.DonationsConfig',
-        'emails.apps.EmailsConfig',
-
-        # Celery
-        'django_celery_beat',
-        'django_celery_results',
-        'rest_framework',
-        'rest_framework.authtoken',
-    ]
-
-    MIDDLEWARE = [
-        'django.middleware.security.SecurityMiddleware',
-        'django.contrib.sessions.middleware.SessionMiddleware',
-        'django.middleware.common.CommonMiddleware',
-        'django.middleware.csrf.CsrfViewMiddleware',
-        'django.contrib.auth.middleware.AuthenticationMiddleware',
-        'django.contrib.messages.middleware.MessageMiddleware',
-    ]
-
-    ROOT_URLCONF = 'django_project.celery_urls'
-
-else:
-    INSTALLED_APPS = [
-        'django.contrib.admin',
-        'django.contrib.auth',
-        'django.contrib.contenttypes',
-        'django.contrib.sessions',
-        'django.contrib.messages',
-        'django.contrib.staticfiles',
-        'cloudinary_storage',
-        'cloudinary',
-
-        'accounts.apps.AccountsConfig',
-
-        # Donation platform apps
-        'donations.apps.DonationsConfig',
-        'emails.apps.EmailsConfig',
-
-        # Allauth (kept for existing DB tables)
-        'django.contrib.sites',
-        'allauth',
-        'allauth.account',
-        'allauth.socialaccount',
-        'allauth.socialaccount.providers.google',
-
-        # API
-        'corsheaders',
-        'rest_framework',
-        'rest_framework.authtoken',
-        'django_celery_beat',
-        'django_celery_results',
-    ]
-
-    MIDDLEWARE = [
-        'corsheaders.middleware.CorsMiddleware',
-        'django_project.settings.base.DisableCSRFMiddleware',
-        'django.middleware.security.SecurityMiddleware',
-        'whitenoise.middleware.WhiteNoiseMiddleware',
-        'django.contrib.sessions.middleware.SessionMiddleware',
-        'allauth.account.middleware.AccountMiddleware',
-        'django.middleware.common.CommonMiddleware',
-        'django.middleware.csrf.CsrfViewMiddleware',
-        'django.contrib.auth.middleware.AuthenticationMiddleware',
-        'django.contrib.messages.middleware.MessageMiddleware',
-        'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    ]
-
-    ROOT_URLCONF = 'django_project.urls'
+_profile = profile(PROCESS_ROLE)
+INSTALLED_APPS = _profile['INSTALLED_APPS']
+MIDDLEWARE = _profile['MIDDLEWARE']
+ROOT_URLCONF = _profile['ROOT_URLCONF']
 
 # Templates
 TEMPLATES = [
@@ -197,12 +112,35 @@ DATABASES = {
     "default": env.db_url("DATABASE_URL", default="sqlite:///tmp/build.db")
 }
 
+# Read replica (optional, see django_project.db_routers): public read
+# endpoints and reports read from DATABASES["replica"] when it is configured
+DATABASE_ROUTERS = ['django_project.db_routers.ReplicaRouter']
+DATABASE_REPLICA_URL = env('DATABASE_REPLICA_URL', default='')
+REPLICA_PIN_SECONDS = env.int('REPLICA_PIN_SECONDS', default=15)
+
 # Authentication
 AUTH_USER_MODEL = 'accounts.CustomUser'
 AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',
     'allauth.account.auth_backends.AuthenticationBackend',
 ]
+# New hashes use Argon2 (django_project.hashers); PBKDF2 hashes still verify
+# and are upgraded on the user's next login
+PASSWORD_HASHERS = [
+    'django_project.hashers.TunedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_ARGON2_TIME_COST = env.int('PASSWORD_ARGON2_TIME_COST', default=2)
+PASSWORD_ARGON2_MEMORY_COST = env.int('PASSWORD_ARGON2_MEMORY_COST', default=19 * 1024)  # KiB
+PASSWORD_ARGON2_PARALLELISM = env.int('PASSWORD_ARGON2_PARALLELISM', default=1)
+# Token logins are refused before hashing once an account or IP has this
+# many failed attempts in the current LOGIN_LOCKOUT_WINDOW seconds
+# (django_project.login_gate); 0 turns a limit off
+LOGIN_LOCKOUT_WINDOW = env.int('LOGIN_LOCKOUT_WINDOW', default=15 * 60)
+LOGIN_MAX_FAILURES_PER_ACCOUNT = env.int('LOGIN_MAX_FAILURES_PER_ACCOUNT', default=5)
+LOGIN_MAX_FAILURES_PER_IP = env.int('LOGIN_MAX_FAILURES_PER_IP', default=30)
 
 # Allauth settings (kept for existing DB tables)
 SITE_ID = env.int("DJANGO_SITE_ID", default=1)
@@ -250,20 +188,80 @@ OWNER_EMAIL = env("OWNER_EMAIL", default="mnraynor90@gmail.com")
 
 # REST Framework
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'django_project.renderers.ORJSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'django_project.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'django_project.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle',
+        'django_project.throttling.SlidingWindowAnonRateThrottle',
+        'django_project.throttling.SlidingWindowUserRateThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/hour',
         'user': '1000/hour',
     },
+    # Client IPs for throttles and the login gate come from the X-Forwarded-For
+    # entry Fly's proxy appends, not whatever the client put in front of it;
+    # 0 uses REMOTE_ADDR when nothing sits in front of Django
+    'NUM_PROXIES': env.int('NUM_PROXIES', default=1),
 }
 
+# Cache (Redis when configured so throttle counters are shared across workers)
+REDIS_CACHE_URL = env('REDIS_CACHE_URL', default='')
+if REDIS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_project.instrumentation.InstrumentedRedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_project.instrumentation.InstrumentedLocMemCache',
+        }
+    }
+THROTTLE_CACHE_ALIAS = 'default'
+# Token snapshots must be evicted in every worker at once and login lockout
+# counters must add up across them, so refuse to start on the per-process
+# LocMem cache unless this is turned off (dev, tests)
+REQUIRE_SHARED_CACHE = env.bool('REQUIRE_SHARED_CACHE', default=True)
+
+# Per-request/per-task query, cache and outbound HTTP instrumentation
+INSTRUMENTATION_SAMPLE_RATE = env.float('INSTRUMENTATION_SAMPLE_RATE', default=0.1)
+INSTRUMENTATION_SLOW_QUERY_MS = env.float('INSTRUMENTATION_SLOW_QUERY_MS', default=100)
+INSTRUMENTATION_SERVER_TIMING = env.bool('INSTRUMENTATION_SERVER_TIMING', default=DEBUG)
+
+# Prometheus: /metrics/ on the API, CELERY_METRICS_PORT on workers. Set
+# PROMETHEUS_MULTIPROC_DIR in the environment so every gunicorn/prefork
+# process is aggregated. /metrics/ needs "Authorization: Bearer
+# <METRICS_AUTH_TOKEN>", and answers 403 outside DEBUG when no token is set.
+METRICS_AUTH_TOKEN = env('METRICS_AUTH_TOKEN', default='')
+METRICS_CELERY_QUEUES = env.list('METRICS_CELERY_QUEUES', default=['celery'])
+
+# Admin changelists (django_project.admin_performance): above this many rows
+# pagination uses Postgres' row estimate instead of COUNT(*)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = env.int('ADMIN_ESTIMATED_COUNT_THRESHOLD', default=10000)
+ADMIN_FILTER_CHOICES_TIMEOUT = env.int('ADMIN_FILTER_CHOICES_TIMEOUT', default=300)
+
+# Readiness probes (django_project.health): refreshed in the background,
+# served from memory. Only HEALTH_CRITICAL_CHECKS failing makes /health/ready/ 503.
+HEALTH_CHECK_BACKGROUND = env.bool('HEALTH_CHECK_BACKGROUND', default=True)
+HEALTH_CHECK_INTERVAL = env.float('HEALTH_CHECK_INTERVAL', default=10)
+HEALTH_CHECK_MAX_AGE = env.float('HEALTH_CHECK_MAX_AGE', default=30)
+HEALTH_CHECK_TIMEOUT = env.float('HEALTH_CHECK_TIMEOUT', default=2)
+HEALTH_CRITICAL_CHECKS = env.list('HEALTH_CRITICAL_CHECKS', default=['database', 'cache', 'broker'])
+HEALTH_WORKER_HEARTBEAT_INTERVAL = env.float('HEALTH_WORKER_HEARTBEAT_INTERVAL', default=15)
+HEALTH_WORKER_HEARTBEAT_MAX_AGE = env.float('HEALTH_WORKER_HEARTBEAT_MAX_AGE', default=60)
+
 # CORS (only for non-Celery)
 if not IS_CELERY:
     CORS_ALLOWED_ORIGINS = [
@@ -276,6 +274,66 @@ if not IS_CELERY:
 CELERY_BROKER_URL = env('CELERY_BROKER_URL', default='redis://redis:6379/0')
 CELERY_RESULT_BACKEND = 'django-db'
 CELERY_TIMEZONE = TIME_ZONE
+# TaskResult rows are archived by django_project.retention, not dropped by backend_cleanup
+CELERY_RESULT_EXPIRES = None
+
+# Campaign totals are folded from the donation ledger (donations.ledger):
+# LEDGER_FOLD_DELAY seconds after a donation settles, and every
+# LEDGER_FOLD_INTERVAL seconds from beat in case a fold was lost
+LEDGER_FOLD_DELAY = env.float('LEDGER_FOLD_DELAY', default=2)
+LEDGER_FOLD_INTERVAL = env.float('LEDGER_FOLD_INTERVAL', default=60)
+# Counter slots per campaign (donations.counters); more slots, fewer lock waits
+CAMPAIGN_COUNTER_SHARDS = env.int('CAMPAIGN_COUNTER_SHARDS', default=8)
+
+# Pending donations older than this are checked against Stripe and expired,
+# failed or settled (donations.sweeper); 'delete' policy drops swept rows
+PENDING_DONATION_MAX_AGE_HOURS = env.float('PENDING_DONATION_MAX_AGE_HOURS', default=25)
+PENDING_SWEEP_INTERVAL = env.float('PENDING_SWEEP_INTERVAL', default=60 * 60)
+PENDING_SWEEP_BATCH_SIZE = env.int('PENDING_SWEEP_BATCH_SIZE', default=200)
+PENDING_SWEEP_POLICY = env('PENDING_SWEEP_POLICY', default='keep')
+
+# API tokens expire TOKEN_TTL_HOURS after they're issued (0 = never), logging
+# in replaces a token older than TOKEN_ROTATE_AFTER_HOURS, and the token ->
+# user lookup is cached for TOKEN_CACHE_TIMEOUT seconds
+# (django_project.authentication)
+TOKEN_TTL_HOURS = env.float('TOKEN_TTL_HOURS', default=24 * 30)
+TOKEN_ROTATE_AFTER_HOURS = env.float('TOKEN_ROTATE_AFTER_HOURS', default=24)
+TOKEN_CACHE_TIMEOUT = env.int('TOKEN_CACHE_TIMEOUT', default=300)
+TOKEN_PURGE_INTERVAL = env.float('TOKEN_PURGE_INTERVAL', default=24 * 60 * 60)
+
+# Rows older than RETENTION_DAYS[label] are archived to RETENTION_ARCHIVE_DIR
+# ('jsonl' or 'parquet') and deleted in RETENTION_CHUNK_SIZE chunks
+# (django_project.retention); 0 keeps a table forever. The archive must
+# outlive the machine (a mounted volume, or a bucket mounted as a directory),
+# so there is no default: nothing is deleted until it is set
+RETENTION_DAYS = {
+    'emails.EmailLog': env.int('RETENTION_EMAIL_LOG_DAYS', default=365),
+    'django_celery_results.TaskResult': env.int('RETENTION_TASK_RESULT_DAYS', default=14),
+    'donations.Donation': env.int('RETENTION_ABANDONED_DONATION_DAYS', default=90),
+}
+RETENTION_ARCHIVE_DIR = env('RETENTION_ARCHIVE_DIR', default='')
+RETENTION_ARCHIVE_FORMAT = env('RETENTION_ARCHIVE_FORMAT', default='jsonl')
+RETENTION_CHUNK_SIZE = env.int('RETENTION_CHUNK_SIZE', default=1000)
+RETENTION_INTERVAL = env.float('RETENTION_INTERVAL', default=24 * 60 * 60)
+
+CELERY_BEAT_SCHEDULE = {
+    'fold-campaign-ledgers': {
+        'task': 'donations.tasks.fold_campaign_ledgers',
+        'schedule': LEDGER_FOLD_INTERVAL,
+    },
+    'sweep-pending-donations': {
+        'task': 'donations.tasks.sweep_pending_donations',
+        'schedule': PENDING_SWEEP_INTERVAL,
+    },
+    'apply-retention': {
+        'task': 'django_project.retention.apply_retention',
+        'schedule': RETENTION_INTERVAL,
+    },
+    'purge-expired-tokens': {
+        'task': 'accounts.tasks.purge_expired_tokens',
+        'schedule': TOKEN_PURGE_INTERVAL,
+    },
+}
 
 # Default field
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
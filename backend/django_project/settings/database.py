@@ -0,0 +1,62 @@
+# django_project/settings/database.py
+"""
+Postgres connection handling, chosen with DB_POOL_MODE:
+
+    persistent  one long-lived connection per thread (CONN_MAX_AGE); the
+                old behaviour
+    native      Django 5.1's psycopg 3 pool, one per process, sized for the
+                process role
+    pgbouncer   short-lived client connections to PgBouncer in transaction
+                pooling mode. Server-side cursors and prepared statements
+                don't survive a transaction there, so both are disabled.
+
+With the native pool, the server sees at most
+gunicorn workers x web max_size + Celery children x worker max_size.
+"""
+from importlib.util import find_spec
+
+from django.core.exceptions import ImproperlyConfigured
+
+POOL_MODES = ('persistent', 'native', 'pgbouncer')
+
+# (min_size, max_size) per process role
+POOL_SIZES = {
+    'web': (1, 4),      # one per gthread thread (GUNICORN_THREADS)
+    'worker': (1, 2),   # prefork children run one task at a time
+    'beat': (1, 1),
+    'manage': (1, 4),
+}
+
+
+def configure_database(database, role, env):
+    """Return ``database`` (a DATABASES entry) set up for DB_POOL_MODE and ``role``"""
+    mode = env('DB_POOL_MODE', default='persistent')
+    if mode not in POOL_MODES:
+        raise ImproperlyConfigured(f"DB_POOL_MODE must be one of {', '.join(POOL_MODES)}, not {mode!r}")
+
+    database = {**database, 'OPTIONS': dict(database.get('OPTIONS', {}))}
+    psycopg3 = find_spec('psycopg') is not None
+
+    if mode == 'native':
+        if not psycopg3 or find_spec('psycopg_pool') is None:
+            raise ImproperlyConfigured("DB_POOL_MODE=native needs psycopg 3 with the pool extra (psycopg[pool])")
+        min_size, max_size = POOL_SIZES[role]
+        if role == 'web':
+            max_size = env.int('GUNICORN_THREADS', default=max_size)
+        max_size = env.int('DB_POOL_MAX_SIZE', default=max_size)
+        database['CONN_MAX_AGE'] = 0  # the pool owns connection lifetime
+        database['OPTIONS']['pool'] = {
+            'min_size': min(env.int('DB_POOL_MIN_SIZE', default=min_size), max_size),
+            'max_size': max_size,
+            'timeout': env.float('DB_POOL_TIMEOUT', default=10),
+            'max_idle': env.float('DB_POOL_MAX_IDLE', default=300),
+            'name': f'{role}-pool',
+        }
+
+    elif mode == 'pgbouncer':
+        database['CONN_MAX_AGE'] = env.int('DB_CONN_MAX_AGE', default=0)
+        database['DISABLE_SERVER_SIDE_CURSORS'] = True
+        if psycopg3:
+            database['OPTIONS']['prepare_threshold'] = None
+
+    return database
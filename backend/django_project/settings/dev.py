@@ -6,6 +6,15 @@ DATABASES = {
     "default": env.db_url("DATABASE_URL", default="postgresql://postgres:postgres_password@db:5432/donations_db")
 }
 
+# ORJSON stays the default; the browsable API is for poking at endpoints locally
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    "DEFAULT_RENDERER_CLASSES": [
+        *REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"],
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
+
 ALLOWED_HOSTS = ["localhost", "127.0.0.1", "0.0.0.0", "backend"]
 
 CORS_ALLOWED_ORIGINS = [
@@ -26,3 +35,6 @@ EMAIL_HOST_USER = env("GMAIL_USER", default="")
 EMAIL_HOST_PASSWORD = env("GMAIL_APP_PASSWORD", default="")
 DEFAULT_FROM_EMAIL = env("GMAIL_USER", default="")
 FRONTEND_URL = env("FRONTEND_URL", default="http://localhost:5173")
+# runserver is one process, so the LocMem cache is fine without REDIS_CACHE_URL
+REQUIRE_SHARED_CACHE = env.bool("REQUIRE_SHARED_CACHE", default=False)
+RETENTION_ARCHIVE_DIR = env("RETENTION_ARCHIVE_DIR", default=str(BASE_DIR.parent / "archive"))
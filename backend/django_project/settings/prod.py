@@ -1,8 +1,11 @@
 from .base import *
 import os
+from urllib.parse import urlsplit, urlunsplit
 import dj_database_url
 from django.core.exceptions import ImproperlyConfigured
 
+from .database import configure_database
+
 DEBUG = False
 
 # ---------------- SECURITY ----------------
@@ -82,6 +85,33 @@ if DATABASE_URL:
 else:
     raise ImproperlyConfigured("DATABASE_URL environment variable is required in production")
 
+# ---------------- CONNECTION POOLING ----------------
+# DB_POOL_MODE=persistent|native|pgbouncer, sized per PROCESS_ROLE
+DATABASES["default"] = configure_database(DATABASES["default"], PROCESS_ROLE, env)
+
+# ---------------- READ REPLICA ----------------
+if DATABASE_REPLICA_URL:
+    DATABASES["replica"] = configure_database(
+        dj_database_url.parse(DATABASE_REPLICA_URL, conn_max_age=600, conn_health_checks=True),
+        PROCESS_ROLE, env,
+    )
+
+# ---------------- CACHE ----------------
+# Share throttle counters and cached payloads between gunicorn workers. Without
+# REDIS_CACHE_URL the broker's Redis is reused, but on its own database
+# (REDIS_CACHE_DB), so a cache.clear() can never flush queued tasks
+if not REDIS_CACHE_URL:
+    broker = urlsplit(CELERY_BROKER_URL)
+    cache_db = env.int("REDIS_CACHE_DB", default=1)
+    if broker.path.strip("/") == str(cache_db):
+        raise ImproperlyConfigured("REDIS_CACHE_DB must differ from the Celery broker's Redis database")
+    CACHES = {
+        "default": {
+            "BACKEND": "django_project.instrumentation.InstrumentedRedisCache",
+            "LOCATION": urlunsplit(broker._replace(path=f"/{cache_db}")),
+        }
+    }
+
 # ---------------- HOSTS ----------------
 FLY_APP_NAME = os.environ.get("FLY_APP_NAME", "mff-v2")
 
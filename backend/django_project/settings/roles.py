@@ -0,0 +1,128 @@
+# django_project/settings/roles.py
+"""
+Per-role INSTALLED_APPS / MIDDLEWARE / ROOT_URLCONF.
+
+Each process only loads what it needs: Celery workers and beat skip the
+admin, allauth, CORS and Cloudinary apps, and beat skips the web middleware
+entirely. Set DJANGO_PROCESS_ROLE (web, worker, beat, manage) to choose a
+profile explicitly; otherwise it is inferred from the command line.
+"""
+import os
+import sys
+
+ROLES = ('web', 'worker', 'beat', 'manage')
+
+
+def detect_role(argv=None, environ=None):
+    argv = sys.argv if argv is None else argv
+    environ = os.environ if environ is None else environ
+
+    role = environ.get('DJANGO_PROCESS_ROLE')
+    if role:
+        if role not in ROLES:
+            raise ValueError(f"DJANGO_PROCESS_ROLE must be one of {', '.join(ROLES)}, not {role!r}")
+        return role
+
+    program = os.path.basename(argv[0]) if argv else ''
+    if 'beat' in argv:
+        return 'beat'
+    if environ.get('IS_CELERY_WORKER') == 'true' or 'celery' in program or 'worker' in argv:
+        return 'worker'
+    if program == 'manage.py' or program == 'django-admin':
+        return 'web' if 'runserver' in argv else 'manage'
+    return 'web'
+
+
+_CELERY_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+
+    # Donation platform apps
+    'accounts.apps.AccountsConfig',
+    'donations.apps.DonationsConfig',
+    'emails.apps.EmailsConfig',
+
+    # Celery
+    'django_celery_beat',
+    'django_celery_results',
+    'rest_framework',
+    'rest_framework.authtoken',
+]
+
+_WEB_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'cloudinary_storage',
+    'cloudinary',
+
+    'accounts.apps.AccountsConfig',
+
+    # Donation platform apps
+    'donations.apps.DonationsConfig',
+    'emails.apps.EmailsConfig',
+
+    # Allauth (kept for existing DB tables)
+    'django.contrib.sites',
+    'allauth',
+    'allauth.account',
+    'allauth.socialaccount',
+    'allauth.socialaccount.providers.google',
+
+    # API
+    'corsheaders',
+    'rest_framework',
+    'rest_framework.authtoken',
+    'django_celery_beat',
+    'django_celery_results',
+]
+
+_WEB_MIDDLEWARE = [
+    'django_project.metrics.MetricsMiddleware',
+    'django_project.instrumentation.InstrumentationMiddleware',
+    'django_project.db_routers.ReplicaPinMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django_project.settings.base.DisableCSRFMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'allauth.account.middleware.AccountMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+PROFILES = {
+    'web': {
+        'INSTALLED_APPS': _WEB_APPS,
+        'MIDDLEWARE': _WEB_MIDDLEWARE,
+        'ROOT_URLCONF': 'django_project.urls',
+    },
+    # Migrations, collectstatic, shell and the benchmarks need every app
+    'manage': {
+        'INSTALLED_APPS': _WEB_APPS,
+        'MIDDLEWARE': _WEB_MIDDLEWARE,
+        'ROOT_URLCONF': 'django_project.urls',
+    },
+    'worker': {
+        'INSTALLED_APPS': _CELERY_APPS,
+        'MIDDLEWARE': [],
+        'ROOT_URLCONF': 'django_project.celery_urls',
+    },
+    # Beat only publishes schedules; nothing it imports touches API tokens
+    'beat': {
+        'INSTALLED_APPS': [app for app in _CELERY_APPS if app != 'rest_framework.authtoken'],
+        'MIDDLEWARE': [],
+        'ROOT_URLCONF': 'django_project.celery_urls',
+    },
+}
+
+
+def profile(role):
+    """Copies of the role's settings, safe for a settings module to extend"""
+    return {name: list(value) if isinstance(value, list) else value for name, value in PROFILES[role].items()}
@@ -6,7 +6,6 @@ SECRET_KEY = "test-secret-key"
 STRIPE_PUBLISHABLE_KEY = "pk_test_dummy"
 STRIPE_SECRET_KEY = "sk_test_dummy"
 STRIPE_WEBHOOK_SECRET = "whsec_dummy"
-stripe.api_key = STRIPE_SECRET_KEY
 
 
 
@@ -19,14 +18,34 @@ EMAIL_HOST_PASSWORD = ""
 DEFAULT_FROM_EMAIL = "test@example.com"
 
 
-# In-memory test DB
+# In-memory test DB, with a mirrored "replica" so read routing is exercised
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "test.sqlite3",
+    },
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "test_replica.sqlite3",
+        "TEST": {"MIRROR": "default"},
+    },
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django_project.instrumentation.InstrumentedLocMemCache",
     }
 }
 
+REQUIRE_SHARED_CACHE = False
+
+CELERY_TASK_ALWAYS_EAGER = True
+LEDGER_FOLD_DELAY = 0
+INSTRUMENTATION_SAMPLE_RATE = 1.0
+INSTRUMENTATION_SERVER_TIMING = True
+MEDIA_RESOLVER = "donations.media.FakeMediaResolver"
+HEALTH_CHECK_BACKGROUND = False
+
 RECAPTCHA_PUBLIC_KEY = "test"
 RECAPTCHA_PRIVATE_KEY = "test"
 
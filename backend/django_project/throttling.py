@@ -0,0 +1,92 @@
+# django_project/throttling.py
+"""
+Sliding-window throttles backed by atomic cache counters.
+
+DRF's SimpleRateThrottle stores a list of timestamps per client and rewrites
+the whole list on every request. These throttles keep two integer counters
+per client instead (the current and previous fixed window) and estimate the
+sliding-window count from them, so each request costs a constant number of
+cache operations. With the Redis cache backend the counters are shared by
+every worker and incremented atomically.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+
+
+class SlidingWindowThrottleMixin:
+    """
+    Drop-in replacement for SimpleRateThrottle's history-list algorithm.
+    Mix in before a SimpleRateThrottle subclass.
+    """
+    cache_alias = None
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias or getattr(settings, 'THROTTLE_CACHE_ALIAS', 'default')]
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        self.elapsed = self.now - window * self.duration
+        current_key = f"{self.key}:{window}"
+        previous_key = f"{self.key}:{window - 1}"
+
+        self.previous_count = self.cache.get(previous_key, 0)
+
+        # Counters live for two windows so the next window can still read them
+        self.cache.add(current_key, 0, self.duration * 2)
+        try:
+            self.current_count = self.cache.incr(current_key)
+        except ValueError:
+            # Key expired between add() and incr()
+            self.cache.set(current_key, 1, self.duration * 2)
+            self.current_count = 1
+
+        if self._estimated_count(self.current_count) > self.num_requests:
+            # Don't count rejected requests against the client
+            self.cache.decr(current_key)
+            self.current_count -= 1
+            return self.throttle_failure()
+        return self.throttle_success()
+
+    def _estimated_count(self, current_count):
+        weight = 1 - (self.elapsed / self.duration)
+        return self.previous_count * weight + current_count
+
+    def throttle_success(self):
+        return True
+
+    def wait(self):
+        """
+        Seconds until the estimated count drops far enough to admit one
+        more request.
+        """
+        remaining = self.duration - self.elapsed
+        if self.current_count + 1 > self.num_requests:
+            # Wait for this window to roll over, then for enough of it to
+            # slide out of the estimate.
+            fraction = 1 - (self.num_requests - 1) / max(self.current_count, 1)
+            return remaining + fraction * self.duration
+
+        if not self.previous_count:
+            return None
+
+        # previous * (1 - f) + current + 1 <= limit
+        needed = 1 - (self.num_requests - self.current_count - 1) / self.previous_count
+        return max(needed * self.duration - self.elapsed, 0)
+
+
+class SlidingWindowAnonRateThrottle(SlidingWindowThrottleMixin, AnonRateThrottle):
+    pass
+
+
+class SlidingWindowUserRateThrottle(SlidingWindowThrottleMixin, UserRateThrottle):
+    pass
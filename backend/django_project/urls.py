@@ -1,9 +1,12 @@
 from django.contrib import admin
 from django.urls import path, include
-from django.http import JsonResponse
+
+from .health import readiness
+from .metrics import metrics_view
+from .renderers import ORJSONResponse
 
 def api_root(request):
-    return JsonResponse({
+    return ORJSONResponse({
         "message": "Matt Freedom Fundraiser API v2",
         "endpoints": {
             "current_campaign": "/api/donations/campaign/",
@@ -16,11 +19,15 @@ def api_root(request):
     })
 
 def health_check(request):
-    return JsonResponse({"status": "healthy", "service": "matt-freedom-fundraiser"})
+    """Liveness: the process is up. Dependency checks live in /health/ready/"""
+    return ORJSONResponse({"status": "healthy", "service": "matt-freedom-fundraiser"})
 
 urlpatterns = [
     path("", api_root),
     path("health/", health_check),
+    path("health/live/", health_check),
+    path("health/ready/", readiness),
+    path("metrics/", metrics_view),
     path("admin/", admin.site.urls),
     path("api/accounts/", include("accounts.urls")),
     path("api/donations/", include("donations.urls")),
@@ -1,5 +1,9 @@
-from django.contrib import admin
-from .models import Campaign, Donation, CampaignUpdate
+from django.contrib import admin, messages
+
+from django_project.admin_performance import CachedRelatedFieldListFilter, ScalableAdminMixin
+
+from .bulk import bulk_set_status, regenerate_receipts, resend_thank_you_emails
+from .models import Campaign, Donation, CampaignUpdate, DonationLedgerEntry
 
 @admin.register(Campaign)
 class CampaignAdmin(admin.ModelAdmin):
@@ -8,14 +12,64 @@ class CampaignAdmin(admin.ModelAdmin):
     list_filter = ['is_active']
 
 @admin.register(Donation)
-class DonationAdmin(admin.ModelAdmin):
-    list_display = ['amount', 'ticket_quantity', 'donor_name', 'donor_email', 'payment_status', 'created_at']
+class DonationAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ['amount', 'ticket_quantity', 'donor_name', 'donor_email', 'campaign', 'payment_status', 'created_at']
+    list_select_related = ['campaign']
     readonly_fields = ['stripe_session_id', 'stripe_payment_intent_id']
-    list_filter = ['payment_status', 'campaign']
+    list_filter = ['payment_status', ('campaign', CachedRelatedFieldListFilter)]
+    date_hierarchy = 'created_at'
+    # Plain id inputs instead of <select>s listing every campaign and user
+    raw_id_fields = ['campaign', 'user']
+    actions = ['mark_completed', 'mark_refunded', 'resend_thank_you', 'regenerate_receipt']
+
+    def _report_transition(self, request, queryset, new_status):
+        # Counted first: the action's queryset is re-evaluated, and a status
+        # filter on the changelist drops the rows the update just moved
+        selected = queryset.count()
+        changed, total = bulk_set_status(queryset, new_status)
+        skipped = selected - changed
+        self.message_user(request, f"Marked {changed} donation(s) {new_status} (${total}).")
+        if skipped:
+            self.message_user(request, f"Skipped {skipped} donation(s) that can't be {new_status}.", messages.WARNING)
+
+    @admin.action(description="Mark selected donations completed", permissions=['change'])
+    def mark_completed(self, request, queryset):
+        self._report_transition(request, queryset, 'completed')
+
+    @admin.action(description="Mark selected donations refunded", permissions=['change'])
+    def mark_refunded(self, request, queryset):
+        self._report_transition(request, queryset, 'refunded')
+
+    @admin.action(description="Resend thank-you emails", permissions=['change'])
+    def resend_thank_you(self, request, queryset):
+        queued = resend_thank_you_emails(queryset)
+        self.message_user(request, f"Queued {queued} thank-you email(s).")
+
+    @admin.action(description="Regenerate receipts", permissions=['change'])
+    def regenerate_receipt(self, request, queryset):
+        queued = regenerate_receipts(queryset)
+        self.message_user(request, f"Queued {queued} receipt(s).")
 
 @admin.register(CampaignUpdate)
 class CampaignUpdateAdmin(admin.ModelAdmin):
     list_display = ['title', 'campaign', 'created_at']
-    readonly_fields = ['created_at']
+    readonly_fields = ['created_at', 'video_provider', 'video_id', 'video_embed_url', 'video_thumbnail_url']
+
+@admin.register(DonationLedgerEntry)
+class DonationLedgerEntryAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ['id', 'campaign', 'donation', 'kind', 'amount', 'created_at']
+    list_select_related = ['campaign', 'donation']
+    list_filter = ['kind', ('campaign', CachedRelatedFieldListFilter)]
+    date_hierarchy = 'created_at'
+    raw_id_fields = ['campaign', 'donation']
+
+    # Append-only: entries come from donation status changes and reconciliation
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
-    
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""
+Set-wise donation changes for the admin.
+
+Donation.save() reads the old status and appends a ledger entry per row;
+these do the same for a whole selection with one UPDATE of the donations
+and one INSERT into the ledger, in a single transaction. Emails are
+queued as one Celery group once the transaction commits.
+"""
+from celery import group
+from django.db import transaction
+from django.utils import timezone
+
+from django_project import metrics
+
+from . import ledger
+from .models import Donation, DonationLedgerEntry
+
+# new status -> (statuses it may be applied to, ledger entry kind, sign of the entry)
+TRANSITIONS = {
+    'completed': (['pending', 'failed', 'expired', 'refunded'], 'credit', 1),
+    'refunded': (['completed'], 'debit', -1),
+}
+
+
+def bulk_set_status(queryset, new_status):
+    """Move the eligible donations in ``queryset`` to ``new_status``; returns (changed, total amount)"""
+    from_statuses, kind, sign = TRANSITIONS[new_status]
+    with transaction.atomic():
+        eligible = list(
+            Donation.objects.select_for_update().filter(
+                pk__in=queryset.values('pk'), payment_status__in=from_statuses,
+            ).values_list('pk', 'campaign_id', 'amount')
+        )
+        if not eligible:
+            return 0, 0
+        ids = [pk for pk, _, _ in eligible]
+        Donation.objects.filter(pk__in=ids).update(payment_status=new_status, updated_at=timezone.now())
+        ledger.append([
+            DonationLedgerEntry(campaign_id=campaign_id, donation_id=pk, kind=kind, amount=sign * amount)
+            for pk, campaign_id, amount in eligible
+        ])
+    total = sum(amount for _, _, amount in eligible)
+    metrics.record_bulk_donation_transition(new_status, len(ids), total)
+    return len(ids), total
+
+
+def _queue_after_commit(signatures):
+    signatures = list(signatures)
+    if signatures:
+        transaction.on_commit(lambda: group(signatures).apply_async())
+    return len(signatures)
+
+
+def resend_thank_you_emails(queryset, force=True):
+    """Queue thank-you emails for completed donations that have a donor address"""
+    from emails.tasks import send_thank_you_email
+
+    ids = queryset.filter(payment_status='completed', is_anonymous=False).exclude(donor_email='') \
+        .values_list('pk', flat=True)
+    return _queue_after_commit(send_thank_you_email.s(pk, force=force) for pk in ids)
+
+
+def regenerate_receipts(queryset):
+    """Clear the receipt flags of completed donations and queue new receipts"""
+    from emails.tasks import send_donation_receipt
+
+    with transaction.atomic():
+        ids = list(queryset.filter(payment_status='completed').values_list('pk', flat=True))
+        Donation.objects.filter(pk__in=ids).update(receipt_sent=False, receipt_sent_at=None)
+        return _queue_after_commit(send_donation_receipt.s(pk) for pk in ids)
@@ -0,0 +1,69 @@
+"""
+Sharded running totals for campaigns (CampaignCounterShard).
+
+A single counter row per campaign makes every settling donation queue on
+that row's lock until its transaction commits. Spreading the total over
+CAMPAIGN_COUNTER_SHARDS slots and adding to a random one lets concurrent
+webhooks proceed in parallel; readers sum the slots (a handful of rows)
+or use Campaign.current_amount, which the ledger fold keeps as the cached
+sum.
+"""
+import random
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import CampaignCounterShard
+
+ZERO = Value(Decimal('0.00'), output_field=DecimalField(max_digits=10, decimal_places=2))
+
+
+def increment(campaign_id, amount):
+    """Add ``amount`` (negative for refunds) to one random slot of the campaign"""
+    slot = random.randrange(settings.CAMPAIGN_COUNTER_SHARDS)
+    shard = CampaignCounterShard.objects.filter(campaign_id=campaign_id, slot=slot)
+    if not shard.update(amount=F('amount') + amount):
+        # First write for this campaign (or the shard count went up): create the slots, racing safely
+        CampaignCounterShard.objects.bulk_create(
+            [CampaignCounterShard(campaign_id=campaign_id, slot=n) for n in range(settings.CAMPAIGN_COUNTER_SHARDS)],
+            ignore_conflicts=True,
+        )
+        shard.update(amount=F('amount') + amount)
+
+
+def total(campaign_id):
+    return CampaignCounterShard.objects.filter(campaign_id=campaign_id) \
+        .aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+
+
+def total_subquery():
+    shards = CampaignCounterShard.objects.filter(campaign=OuterRef('pk')).order_by() \
+        .values('campaign').annotate(total=Sum('amount')).values('total')
+    return Coalesce(Subquery(shards), ZERO)
+
+
+def lock(campaign_id):
+    """
+    Lock every slot of the campaign until the surrounding transaction ends.
+    Settling donations for it then waits at increment(), so totals read
+    after this include every settle that committed and none still in flight.
+    """
+    CampaignCounterShard.objects.bulk_create(
+        [CampaignCounterShard(campaign_id=campaign_id, slot=n) for n in range(settings.CAMPAIGN_COUNTER_SHARDS)],
+        ignore_conflicts=True,
+    )
+    shards = CampaignCounterShard.objects.select_for_update().filter(campaign_id=campaign_id)
+    list(shards.values_list('pk'))
+    return shards
+
+
+def rebuild(campaign_id, amount):
+    """Collapse the campaign's slots into one holding ``amount``, e.g. the ledger total"""
+    with transaction.atomic():
+        # Writers adding to these slots wait until the new total is in place
+        shards = lock(campaign_id)
+        shards.exclude(slot=0).update(amount=Decimal('0.00'))
+        shards.filter(slot=0).update(amount=amount)
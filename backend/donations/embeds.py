@@ -0,0 +1,62 @@
+import re
+from urllib.parse import urlparse, parse_qs
+
+YOUTUBE_HOSTS = {'youtube.com', 'www.youtube.com', 'm.youtube.com', 'youtube-nocookie.com', 'www.youtube-nocookie.com'}
+VIMEO_HOSTS = {'vimeo.com', 'www.vimeo.com', 'player.vimeo.com'}
+
+EMBED_SRC_RE = re.compile(r'src=["\']([^"\']+)["\']', re.IGNORECASE)
+YOUTUBE_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+VIMEO_ID_RE = re.compile(r'^\d+$')
+
+
+def parse_video_url(url):
+    """
+    Extract (provider, video_id) from a YouTube or Vimeo URL.
+    Returns ('', '') when the URL isn't a recognised video link.
+    """
+    if not url:
+        return '', ''
+    if url.startswith('//'):
+        url = f'https:{url}'
+
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    parts = [part for part in parsed.path.split('/') if part]
+
+    if host == 'youtu.be' and parts:
+        video_id = parts[0]
+    elif host in YOUTUBE_HOSTS:
+        if parts and parts[0] in ('embed', 'shorts', 'live', 'v') and len(parts) > 1:
+            video_id = parts[1]
+        else:
+            video_id = parse_qs(parsed.query).get('v', [''])[0]
+        if not YOUTUBE_ID_RE.match(video_id):
+            return '', ''
+    elif host in VIMEO_HOSTS:
+        video_id = next((part for part in reversed(parts) if VIMEO_ID_RE.match(part)), '')
+        return ('vimeo', video_id) if video_id else ('', '')
+    else:
+        return '', ''
+
+    return ('youtube', video_id) if YOUTUBE_ID_RE.match(video_id) else ('', '')
+
+
+def parse_embed_code(embed_code):
+    """Pull the iframe src out of a pasted embed snippet and parse it"""
+    match = EMBED_SRC_RE.search(embed_code or '')
+    return parse_video_url(match.group(1)) if match else ('', '')
+
+
+def embed_url_for(provider, video_id):
+    if provider == 'youtube':
+        return f'https://www.youtube-nocookie.com/embed/{video_id}'
+    if provider == 'vimeo':
+        return f'https://player.vimeo.com/video/{video_id}'
+    return ''
+
+
+def thumbnail_url_for(provider, video_id):
+    # Vimeo thumbnails need an API lookup, so only YouTube is derived here
+    if provider == 'youtube':
+        return f'https://i.ytimg.com/vi/{video_id}/hqdefault.jpg'
+    return ''
@@ -0,0 +1,219 @@
+"""
+Streaming donation exports (CSV and Parquet) for bookkeeping.
+
+Rows are read with a server-side cursor (or keyset pages where server-side
+cursors are disabled, i.e. behind PgBouncer) and encoded a chunk at a time,
+so memory stays flat however many donations there are. Used by the
+export_donations command and the staff-only export endpoint.
+"""
+import csv
+import datetime
+import io
+
+from django.db import connections
+from django.db.models import Case, Exists, OuterRef, Subquery, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from django_project.db_routers import replica_reads
+
+from .models import Donation
+
+EXPORT_FORMATS = ('csv', 'parquet')
+CHUNK_SIZE = 2000
+
+# (column header, values_list() lookup)
+EXPORT_COLUMNS = [
+    ('donation_id', 'id'),
+    ('created_at', 'created_at'),
+    ('campaign_id', 'campaign_id'),
+    ('campaign', 'campaign__title'),
+    ('amount', 'amount'),
+    ('ticket_quantity', 'ticket_quantity'),
+    ('payment_status', 'payment_status'),
+    ('donor_name', 'donor_name'),
+    ('donor_email', 'donor_email'),
+    ('is_anonymous', 'is_anonymous'),
+    ('message', 'message'),
+    ('stripe_session_id', 'stripe_session_id'),
+    ('stripe_payment_intent_id', 'stripe_payment_intent_id'),
+    ('email_status', 'email_status'),
+    ('email_sent_at', 'email_sent_at'),
+]
+HEADERS = [header for header, _ in EXPORT_COLUMNS]
+
+
+def parse_filters(campaign=None, start=None, end=None):
+    """Validate raw filter strings; raises ValueError with a readable message"""
+    filters = {}
+    if campaign not in (None, ''):
+        try:
+            filters['campaign_id'] = int(campaign)
+        except (TypeError, ValueError):
+            raise ValueError(f"campaign must be an id, not {campaign!r}")
+    for name, value in (('start', start), ('end', end)):
+        if value in (None, ''):
+            continue
+        date = parse_date(value) if isinstance(value, str) else value
+        if date is None:
+            raise ValueError(f"{name} must be a YYYY-MM-DD date, not {value!r}")
+        filters[name] = date
+    return filters
+
+
+def export_queryset(campaign_id=None, start=None, end=None):
+    """Donations joined with campaign title and thank-you email status, oldest first"""
+    from emails.models import EmailLog
+
+    # The thank-you email is the one addressed to the donor (the owner is notified too)
+    emails = EmailLog.objects.filter(donation=OuterRef('pk'), recipient_email=OuterRef('donor_email'))
+    queryset = Donation.objects.annotate(
+        email_status=Case(
+            When(Exists(emails.filter(was_sent=True)), then=Value('sent')),
+            When(Exists(emails), then=Value('failed')),
+            default=Value('none'),
+        ),
+        email_sent_at=Subquery(emails.filter(was_sent=True).order_by('-sent_at').values('sent_at')[:1]),
+    )
+    if campaign_id is not None:
+        queryset = queryset.filter(campaign_id=campaign_id)
+    # Whole days in the site's time zone; the upper bound is exclusive so the index is usable
+    if start is not None:
+        queryset = queryset.filter(created_at__gte=_start_of_day(start))
+    if end is not None:
+        queryset = queryset.filter(created_at__lt=_start_of_day(end + datetime.timedelta(days=1)))
+    return queryset.order_by('id').values_list(*[lookup for _, lookup in EXPORT_COLUMNS])
+
+
+def _start_of_day(date):
+    return timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+
+
+def iter_rows(queryset, chunk_size=CHUNK_SIZE):
+    """Stream rows from the replica (when configured) without loading them all"""
+    with replica_reads():
+        database = queryset.db
+    queryset = queryset.using(database)
+
+    if not connections[database].settings_dict.get('DISABLE_SERVER_SIDE_CURSORS'):
+        yield from queryset.iterator(chunk_size=chunk_size)
+        return
+
+    # Transaction pooling rules out server-side cursors: page by primary key instead
+    last_id = 0
+    while True:
+        page = list(queryset.filter(id__gt=last_id)[:chunk_size])
+        if not page:
+            return
+        yield from page
+        last_id = page[-1][0]
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class _Echo:
+    """csv.writer target that hands each encoded line straight back"""
+
+    def write(self, value):
+        return value
+
+
+# Spreadsheets evaluate cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_cell(value):
+    """Quote donor-supplied text so a spreadsheet shows it instead of running it"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def stream_csv(queryset, chunk_size=CHUNK_SIZE):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(HEADERS).encode()
+    for chunk in _chunks(iter_rows(queryset, chunk_size), chunk_size):
+        yield ''.join(writer.writerow([_csv_cell(value) for value in row]) for row in chunk).encode()
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file that buffers until drained; lets ParquetWriter stream"""
+
+    def __init__(self):
+        self.buffer = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.buffer.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+def parquet_schema():
+    import pyarrow as pa
+
+    timestamp = pa.timestamp('us', tz='UTC')
+    return pa.schema([
+        ('donation_id', pa.int64()),
+        ('created_at', timestamp),
+        ('campaign_id', pa.int64()),
+        ('campaign', pa.string()),
+        ('amount', pa.decimal128(8, 2)),
+        ('ticket_quantity', pa.int32()),
+        ('payment_status', pa.string()),
+        ('donor_name', pa.string()),
+        ('donor_email', pa.string()),
+        ('is_anonymous', pa.bool_()),
+        ('message', pa.string()),
+        ('stripe_session_id', pa.string()),
+        ('stripe_payment_intent_id', pa.string()),
+        ('email_status', pa.string()),
+        ('email_sent_at', timestamp),
+    ])
+
+
+def stream_parquet(queryset, chunk_size=CHUNK_SIZE):
+    """One Parquet row group per chunk, yielded as soon as it is written"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = parquet_schema()
+    sink = _DrainableSink()
+    with pq.ParquetWriter(sink, schema, compression='zstd') as writer:
+        for chunk in _chunks(iter_rows(queryset, chunk_size), chunk_size):
+            columns = list(zip(*chunk))
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def parquet_available():
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+STREAMERS = {'csv': stream_csv, 'parquet': stream_parquet}
+CONTENT_TYPES = {'csv': 'text/csv', 'parquet': 'application/vnd.apache.parquet'}
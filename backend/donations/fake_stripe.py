@@ -0,0 +1,346 @@
+"""
+Local stand-in for the Stripe Checkout API used by donations.views.
+
+Keeps sessions in memory and produces correctly signed webhook payloads, so
+the donation funnel can be exercised without network access. FakeStripe can
+patch the SDK in-process, or FakeStripeServer serves it over HTTP for the SDK
+to reach through settings.STRIPE_API_BASE (see the fake_stripe_server
+management command).
+"""
+import hmac
+import itertools
+import json
+import logging
+import queue
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qsl, urlparse
+
+import httpx
+import stripe
+
+logger = logging.getLogger(__name__)
+
+
+def sign_payload(payload, secret, timestamp=None):
+    """Build a Stripe-Signature header for ``payload`` (bytes or str)"""
+    if isinstance(payload, bytes):
+        payload = payload.decode()
+    timestamp = int(timestamp or time.time())
+    signature = hmac.new(secret.encode(), f"{timestamp}.{payload}".encode(), sha256).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+class FakeStripe:
+    def __init__(self, checkout_base_url='https://checkout.stripe.invalid'):
+        self.checkout_base_url = checkout_base_url
+        self.sessions = {}
+        self.lock = threading.Lock()
+        self.counter = itertools.count(1)
+
+    def create_session(self, line_items=(), metadata=None, success_url='', cancel_url='', **params):
+        with self.lock:
+            number = next(self.counter)
+        session_id = f"cs_test_fake{number:012d}"
+        session = {
+            'id': session_id,
+            'object': 'checkout.session',
+            'url': f"{self.checkout_base_url}/pay/{session_id}",
+            'status': 'open',
+            'payment_status': 'unpaid',
+            'payment_intent': f"pi_test_fake{number:012d}",
+            'amount_total': sum(
+                int(item['price_data']['unit_amount']) * int(item.get('quantity', 1)) for item in line_items
+            ),
+            'currency': 'usd',
+            'mode': params.get('mode', 'payment'),
+            'metadata': dict(metadata or {}),
+            'success_url': success_url,
+            'cancel_url': cancel_url,
+            'created': int(time.time()),
+        }
+        with self.lock:
+            self.sessions[session_id] = session
+        return session
+
+    def retrieve_session(self, session_id):
+        with self.lock:
+            session = self.sessions.get(session_id)
+        if session is None:
+            raise stripe.error.InvalidRequestError(f"No such checkout.session: '{session_id}'", 'id')
+        return session
+
+    def list_sessions(self, limit=10, starting_after=None, status=None, created=None, **params):
+        """A page of sessions, newest first, shaped like Stripe's list object"""
+        with self.lock:
+            sessions = list(reversed(self.sessions.values()))
+        if starting_after:
+            ids = [session['id'] for session in sessions]
+            sessions = sessions[ids.index(starting_after) + 1:] if starting_after in ids else []
+        if status:
+            sessions = [session for session in sessions if session['status'] == status]
+        if created and 'gte' in created:
+            sessions = [session for session in sessions if session['created'] >= int(created['gte'])]
+        if created and 'lte' in created:
+            sessions = [session for session in sessions if session['created'] <= int(created['lte'])]
+        limit = int(limit)
+        return {
+            'object': 'list',
+            'url': '/v1/checkout/sessions',
+            'has_more': len(sessions) > limit,
+            'data': [dict(session) for session in sessions[:limit]],
+        }
+
+    def complete_session(self, session_id):
+        """Mark a session paid and return the checkout.session.completed event"""
+        session = self.retrieve_session(session_id)
+        with self.lock:
+            session.update(status='complete', payment_status='paid')
+            number = next(self.counter)
+        return {
+            'id': f"evt_test_fake{number:012d}",
+            'object': 'event',
+            'type': 'checkout.session.completed',
+            'created': int(time.time()),
+            'data': {'object': dict(session)},
+        }
+
+    def expire_session(self, session_id):
+        """What Stripe does to an unpaid session after 24 hours (or on Session.expire)"""
+        session = self.retrieve_session(session_id)
+        with self.lock:
+            session.update(status='expired')
+        return session
+
+    def signed_webhook(self, session_id, secret):
+        """(payload bytes, Stripe-Signature header) for a completed session"""
+        payload = json.dumps(self.complete_session(session_id)).encode()
+        return payload, sign_payload(payload, secret)
+
+    @contextmanager
+    def patch_sdk(self):
+        """Route stripe.checkout.Session.create/retrieve/list to this fake"""
+        def create(**params):
+            return stripe.checkout.Session.construct_from(self.create_session(**params), stripe.api_key)
+
+        def retrieve(session_id, **params):
+            return stripe.checkout.Session.construct_from(self.retrieve_session(session_id), stripe.api_key)
+
+        def list_(**params):
+            return stripe.ListObject.construct_from(self.list_sessions(**params), stripe.api_key)
+
+        with mock.patch.object(stripe.checkout.Session, 'create', side_effect=create), \
+             mock.patch.object(stripe.checkout.Session, 'retrieve', side_effect=retrieve), \
+             mock.patch.object(stripe.checkout.Session, 'list', side_effect=list_):
+            yield self
+
+
+def parse_stripe_form(body):
+    """
+    Decode the SDK's bracketed form encoding
+    (``line_items[0][price_data][unit_amount]=5000``) into nested dicts/lists.
+    """
+    data = {}
+    for key, value in parse_qsl(body, keep_blank_values=True):
+        parts = re.findall(r'[^\[\]]+', key)
+        target = data
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = value
+
+    def listify(node):
+        if not isinstance(node, dict):
+            return node
+        node = {key: listify(value) for key, value in node.items()}
+        if node and all(key.isdigit() for key in node):
+            return [node[key] for key in sorted(node, key=int)]
+        return node
+
+    return listify(data)
+
+
+class WebhookEmitter:
+    """
+    Posts signed checkout.session.completed events to ``url`` ``delay``
+    seconds after each session is paid, at no more than ``rate`` per second.
+    """
+
+    def __init__(self, fake_stripe, url, secret, delay=0.0, rate=None):
+        self.fake_stripe = fake_stripe
+        self.url = url
+        self.secret = secret
+        self.delay = delay
+        self.interval = 1 / rate if rate else 0
+        self.queue = queue.PriorityQueue()
+        self.sent = 0
+        self.failed = 0
+        self.client = httpx.Client(timeout=30)
+
+    def schedule(self, session_id):
+        self.queue.put((time.monotonic() + self.delay, session_id))
+
+    def run(self):
+        next_slot = time.monotonic()
+        while True:
+            due, session_id = self.queue.get()
+            if session_id is None:
+                break
+            time.sleep(max(0, due - time.monotonic(), next_slot - time.monotonic()))
+            next_slot = time.monotonic() + self.interval
+
+            payload, signature = self.fake_stripe.signed_webhook(session_id, self.secret)
+            try:
+                response = self.client.post(self.url, content=payload, headers={
+                    'Content-Type': 'application/json', 'Stripe-Signature': signature,
+                })
+                response.raise_for_status()
+                self.sent += 1
+            except httpx.HTTPError as e:
+                self.failed += 1
+                logger.warning(f"Fake Stripe webhook for {session_id} failed: {e}")
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=30):
+        """Send everything still queued, then shut down"""
+        self.queue.put((float('inf'), None))
+        self.thread.join(timeout)
+        self.client.close()
+
+
+class FakeStripeHandler(BaseHTTPRequestHandler):
+    session_path = re.compile(r'^/v1/checkout/sessions/(?P<id>[^/]+)$')
+    pay_path = re.compile(r'^/pay/(?P<id>[^/]+)$')
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Request-Id', f"req_fake_{time.monotonic_ns()}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_missing(self, session_id):
+        self.send_json(404, {'error': {
+            'type': 'invalid_request_error',
+            'code': 'resource_missing',
+            'param': 'id',
+            'message': f"No such checkout.session: '{session_id}'",
+        }})
+
+    def simulate_latency(self):
+        latency = self.server.latency
+        if latency:
+            time.sleep(max(0, random.gauss(latency, self.server.latency_jitter)))
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if path != '/v1/checkout/sessions':
+            return self.send_json(404, {'error': {'type': 'invalid_request_error', 'message': 'Unrecognized request URL'}})
+
+        self.simulate_latency()
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0)).decode()
+        self.send_json(200, self.server.fake_stripe.create_session(**parse_stripe_form(body)))
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        path = url.path
+        fake_stripe = self.server.fake_stripe
+
+        if path == '/v1/checkout/sessions':
+            self.simulate_latency()
+            return self.send_json(200, fake_stripe.list_sessions(**parse_stripe_form(url.query)))
+
+        match = self.session_path.match(path)
+        if match:
+            self.simulate_latency()
+            try:
+                return self.send_json(200, fake_stripe.retrieve_session(match['id']))
+            except stripe.error.InvalidRequestError:
+                return self.send_missing(match['id'])
+
+        # The checkout URL: "paying" completes the session and queues its webhook
+        match = self.pay_path.match(path)
+        if match:
+            try:
+                session = fake_stripe.retrieve_session(match['id'])
+            except stripe.error.InvalidRequestError:
+                return self.send_missing(match['id'])
+            if self.server.emitter:
+                self.server.emitter.schedule(match['id'])
+            self.send_response(303)
+            self.send_header('Location', session['success_url'].replace('{CHECKOUT_SESSION_ID}', match['id']))
+            self.end_headers()
+            return
+
+        self.send_json(404, {'error': {'type': 'invalid_request_error', 'message': 'Unrecognized request URL'}})
+
+
+class FakeStripeServer(ThreadingHTTPServer):
+    """
+    Serves Checkout Session create/retrieve/list over HTTP. ``latency`` and
+    ``latency_jitter`` (seconds) delay each API call; ``emitter`` sends the
+    webhook once a checkout URL is visited, or for every session on create
+    when ``auto_complete`` is set.
+    """
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, latency_jitter=0.0,
+                 emitter=None, auto_complete=False):
+        super().__init__((host, port), FakeStripeHandler)
+        self.fake_stripe = FakeStripe(checkout_base_url=f"http://{host}:{self.server_address[1]}")
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.emitter = emitter
+        if emitter:
+            emitter.fake_stripe = self.fake_stripe
+            if auto_complete:
+                create_session = self.fake_stripe.create_session
+
+                def create_and_schedule(**params):
+                    session = create_session(**params)
+                    emitter.schedule(session['id'])
+                    return session
+
+                self.fake_stripe.create_session = create_and_schedule
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve on a background thread and return self"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        if self.emitter:
+            self.emitter.start()
+        return self
+
+    def stop(self):
+        if self.emitter:
+            self.emitter.stop()
+        self.shutdown()
+        self.server_close()
+
+    @contextmanager
+    def sdk_pointed_here(self):
+        """Point the stripe SDK at this server for the duration"""
+        previous = stripe.api_base
+        stripe.api_base = self.url
+        try:
+            yield self
+        finally:
+            stripe.api_base = previous
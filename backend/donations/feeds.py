@@ -0,0 +1,74 @@
+import math
+import time
+
+from django.core.cache import cache
+from django.urls import reverse
+
+from django_project.db_routers import primary_reads
+from django_project.renderers import ORJSONRenderer
+
+from .models import Campaign, CampaignUpdate
+from .values_serializers import CampaignUpdateFeedValuesSerializer
+
+UPDATES_FEED_PAGE_SIZE = 10
+UPDATES_FEED_TIMEOUT = 60 * 60
+UPDATES_FEED_VERSION_KEY = 'updates_feed:version'
+
+
+def invalidate_updates_feed():
+    """Bump the feed version so every cached page is ignored from now on"""
+    cache.set(UPDATES_FEED_VERSION_KEY, time.time_ns(), None)
+
+
+def _page_link(page, last_page):
+    if page < 1 or page > last_page:
+        return None
+    return f"{reverse('donations:campaign-updates')}?page={page}"
+
+
+def build_updates_feed_page(campaign, page):
+    """Serialize one page of the campaign's updates into JSON bytes"""
+    updates = campaign.updates.all() if campaign else CampaignUpdate.objects.none()
+    count = updates.count()
+    last_page = max(1, math.ceil(count / UPDATES_FEED_PAGE_SIZE))
+    offset = (page - 1) * UPDATES_FEED_PAGE_SIZE
+
+    return ORJSONRenderer().render({
+        'count': count,
+        'next': _page_link(page + 1, last_page),
+        'previous': _page_link(page - 1, last_page),
+        'results': CampaignUpdateFeedValuesSerializer.serialize_many(
+            updates[offset:offset + UPDATES_FEED_PAGE_SIZE]
+        ),
+    })
+
+
+def get_updates_feed_page(page):
+    """
+    Return the pre-rendered JSON for a page of the active campaign's updates,
+    building and caching it on a miss, or None if the page doesn't exist.
+    """
+    campaign = Campaign.objects.filter(is_active=True).only('id').first()
+    # A fresh version if the key was evicted, so stale pages are never served
+    version = cache.get_or_set(UPDATES_FEED_VERSION_KEY, time.time_ns, None)
+    prefix = f"updates_feed:v{version}:{campaign.id if campaign else 0}"
+
+    if page > 1:
+        # Checked against a cached count so made-up page numbers cost neither
+        # a cache entry each nor more than one query per feed version
+        count = cache.get(f"{prefix}:count")
+        if count is None:
+            with primary_reads():
+                count = campaign.updates.count() if campaign else 0
+            cache.set(f"{prefix}:count", count, UPDATES_FEED_TIMEOUT)
+        if page > math.ceil(count / UPDATES_FEED_PAGE_SIZE):
+            return None
+
+    key = f"{prefix}:{page}"
+    body = cache.get(key)
+    if body is None:
+        # Cached for an hour, so build from the primary rather than a lagging replica
+        with primary_reads():
+            body = build_updates_feed_page(campaign, page)
+        cache.set(key, body, UPDATES_FEED_TIMEOUT)
+    return body
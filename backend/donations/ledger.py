@@ -0,0 +1,96 @@
+"""
+Campaign totals derived from the append-only DonationLedgerEntry table.
+
+Completing or refunding a donation appends a signed entry and adds it to
+one of the campaign's counter slots (donations.counters) instead of
+updating the campaign row, so bursts of donations no longer queue on one
+hot row. Campaign.current_amount is a snapshot folded from those slots:
+the first entry for a campaign schedules a fold LEDGER_FOLD_DELAY seconds
+out and later ones within that window ride along, with beat folding every
+campaign each LEDGER_FOLD_INTERVAL as a backstop. A fold re-sums the
+slots, which move in the same transactions as the entries, so it is
+idempotent and can't miss entries that committed out of id order.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import counters
+from .models import Campaign, DonationLedgerEntry
+
+FOLD_SCHEDULED_KEY = 'ledger:fold-scheduled:{campaign_id}'
+ZERO = Value(Decimal('0.00'), output_field=DecimalField(max_digits=10, decimal_places=2))
+
+
+def entry_for_transition(donation, old_status, is_new):
+    """The entry a status change produces, mirroring what used to update the campaign"""
+    status = donation.payment_status
+    if status == 'completed' and (is_new or (old_status and old_status != 'completed')):
+        return DonationLedgerEntry(campaign_id=donation.campaign_id, donation=donation, kind='credit',
+                                   amount=donation.amount)
+    if status == 'refunded' and old_status == 'completed':
+        return DonationLedgerEntry(campaign_id=donation.campaign_id, donation=donation, kind='debit',
+                                   amount=-donation.amount)
+    return None
+
+
+def append(entries):
+    """Insert ``entries`` in one statement, add them to the counters and schedule folds after commit"""
+    with transaction.atomic():
+        entries = DonationLedgerEntry.objects.bulk_create(entries)
+        amounts = {}
+        for entry in entries:
+            amounts[entry.campaign_id] = amounts.get(entry.campaign_id, 0) + entry.amount
+        for campaign_id, amount in amounts.items():
+            counters.increment(campaign_id, amount)
+    for campaign_id in amounts:
+        transaction.on_commit(lambda campaign_id=campaign_id: schedule_fold(campaign_id))
+    return entries
+
+
+def schedule_fold(campaign_id):
+    """Queue a fold unless one is already due within LEDGER_FOLD_DELAY"""
+    from .tasks import fold_campaign_ledgers
+
+    delay = settings.LEDGER_FOLD_DELAY
+    # The pending fold runs no earlier than this key expires, so it sees this entry
+    if delay and not cache.add(FOLD_SCHEDULED_KEY.format(campaign_id=campaign_id), 1, delay):
+        return
+    fold_campaign_ledgers.apply_async(([campaign_id],), countdown=delay)
+
+
+def ledger_total_subquery():
+    entries = DonationLedgerEntry.objects.filter(campaign=OuterRef('pk')).order_by() \
+        .values('campaign').annotate(total=Sum('amount')).values('total')
+    return Coalesce(Subquery(entries), ZERO)
+
+
+def fold(campaign_ids=None):
+    """Set current_amount to the counter total in one UPDATE (every campaign when None)"""
+    campaigns = Campaign.objects.all()
+    if campaign_ids is not None:
+        campaigns = campaigns.filter(pk__in=campaign_ids)
+    return campaigns.update(current_amount=counters.total_subquery())
+
+
+def total_at(campaign_id, when):
+    """Campaign total as of ``when``: an index range sum over (campaign, created_at)"""
+    total = DonationLedgerEntry.objects.filter(campaign_id=campaign_id, created_at__lte=when) \
+        .aggregate(total=Sum('amount'))['total']
+    return total or Decimal('0.00')
+
+
+def adjust_to(campaign_id, amount):
+    """Append an adjustment bringing the campaign's ledger total to ``amount``"""
+    with transaction.atomic():
+        # Serialize adjustments to one campaign so two can't both apply the same difference
+        list(Campaign.objects.select_for_update().filter(pk=campaign_id).values_list('pk'))
+        difference = amount - total_at(campaign_id, timezone.now())
+        if difference:
+            append([DonationLedgerEntry(campaign_id=campaign_id, kind='adjustment', amount=difference)])
+    return difference
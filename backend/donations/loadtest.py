@@ -0,0 +1,185 @@
+"""
+Building blocks for the donation funnel load test (see the loadtest_funnel
+management command): an in-process threaded WSGI server with per-endpoint
+query counting, a local Celery task queue, and latency statistics.
+"""
+import math
+import queue
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from socketserver import ThreadingMixIn
+from unittest import mock
+from wsgiref.simple_server import WSGIServer, WSGIRequestHandler, make_server
+
+from celery.app.task import Task
+from django.core.wsgi import get_wsgi_application
+from django.db import connection, connections
+from django.urls import Resolver404, resolve
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values`` (0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def summarize(latencies_ms):
+    return {
+        'count': len(latencies_ms),
+        'mean_ms': round(statistics.fmean(latencies_ms), 3) if latencies_ms else 0.0,
+        'p50_ms': round(percentile(latencies_ms, 50), 3),
+        'p95_ms': round(percentile(latencies_ms, 95), 3),
+        'p99_ms': round(percentile(latencies_ms, 99), 3),
+        'max_ms': round(max(latencies_ms), 3) if latencies_ms else 0.0,
+    }
+
+
+class Recorder:
+    """Thread-safe per-key samples: latency plus arbitrary counters"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+
+    def record(self, key, latency_ms, **counters):
+        with self.lock:
+            entry = self.samples.setdefault(key, {'latencies': [], 'counters': {}})
+            entry['latencies'].append(latency_ms)
+            for name, value in counters.items():
+                entry['counters'][name] = entry['counters'].get(name, 0) + value
+
+    def report(self, wall_seconds=None):
+        report = {}
+        for key, entry in sorted(self.samples.items()):
+            count = len(entry['latencies'])
+            summary = summarize(entry['latencies'])
+            if wall_seconds:
+                summary['per_sec'] = round(count / wall_seconds, 2)
+            for name, total in entry['counters'].items():
+                summary[f'{name}_total'] = total
+                summary[f'{name}_per_call'] = round(total / count, 3) if count else 0.0
+            report[key] = summary
+        return report
+
+
+@contextmanager
+def count_queries():
+    """Count queries and DB time on this thread's default connection"""
+    stats = {'queries': 0, 'db_ms': 0.0}
+
+    def wrapper(execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            stats['queries'] += 1
+            stats['db_ms'] += (time.perf_counter() - start) * 1000
+
+    with connection.execute_wrapper(wrapper):
+        yield stats
+
+
+class QueryCountingApp:
+    """WSGI wrapper recording server-side time and queries per URL name"""
+
+    def __init__(self, app, recorder):
+        self.app = app
+        self.recorder = recorder
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        try:
+            key = resolve(path).view_name
+        except Resolver404:
+            key = path
+
+        start = time.perf_counter()
+        with count_queries() as stats:
+            body = b''.join(self.app(environ, start_response))
+        self.recorder.record(
+            key, (time.perf_counter() - start) * 1000,
+            queries=stats['queries'], db_ms=round(stats['db_ms'], 3),
+        )
+        return [body]
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+@contextmanager
+def serve(recorder, host='127.0.0.1', port=0):
+    """Serve the Django app on a background thread, yielding its base URL"""
+    app = QueryCountingApp(get_wsgi_application(), recorder)
+    server = make_server(host, port, app, server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class LocalTaskQueue:
+    """
+    Stands in for the broker and workers: .delay()/.apply_async() enqueue
+    onto an in-memory queue drained by ``workers`` threads, each task timed
+    and query-counted under its task name.
+    """
+
+    def __init__(self, recorder, workers=2):
+        self.recorder = recorder
+        self.workers = workers
+        self.queue = queue.Queue()
+        self.failures = 0
+
+    def worker(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            task, args, kwargs = item
+            start = time.perf_counter()
+            try:
+                with count_queries() as stats:
+                    result = task.apply(args=args, kwargs=kwargs)
+                if result.failed():
+                    self.failures += 1
+            finally:
+                self.recorder.record(
+                    task.name, (time.perf_counter() - start) * 1000,
+                    queries=stats['queries'], db_ms=round(stats['db_ms'], 3),
+                )
+                self.queue.task_done()
+        connections.close_all()
+
+    @contextmanager
+    def running(self):
+        local_queue = self.queue
+
+        def apply_async(task, args=None, kwargs=None, **options):
+            local_queue.put((task, args or (), kwargs or {}))
+
+        threads = [threading.Thread(target=self.worker, daemon=True) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            with mock.patch.object(Task, 'apply_async', apply_async):
+                yield self
+                self.queue.join()
+        finally:
+            for _ in threads:
+                self.queue.put(None)
+            for thread in threads:
+                thread.join()
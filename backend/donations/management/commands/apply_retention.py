@@ -0,0 +1,54 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from django_project import retention
+
+
+class Command(BaseCommand):
+    help = (
+        "Archive rows past their table's RETENTION_DAYS (email logs, Celery task results, abandoned "
+        "donations) to compressed files, then delete them in small chunks. --dry-run only reports what "
+        "would go and roughly how much space that frees."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--policy', action='append', dest='policies',
+                            choices=[policy.label for policy in retention.POLICIES], help='Limit to table(s)')
+        parser.add_argument('--format', dest='archive_format', choices=retention.ARCHIVE_FORMATS)
+        parser.add_argument('--chunk-size', type=int)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['archive_format'] == 'parquet':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise CommandError("Parquet archives need pyarrow installed")
+
+        if not options['dry_run']:
+            try:
+                retention.archive_root()
+            except ImproperlyConfigured as e:
+                raise CommandError(str(e))
+
+        policies = retention.enabled_policies(options['policies'])
+        if not policies:
+            self.stdout.write("No retention policies enabled")
+            return
+
+        for policy in policies:
+            if options['dry_run']:
+                result = retention.report(policy)
+                line = (
+                    f"{policy.label}: {result.rows} row(s) older than {policy.days} day(s), "
+                    f"~{result.estimated_bytes / 1024 / 1024:.1f} MB"
+                )
+                if result.kept:
+                    line += f", {result.kept} more kept online"
+                self.stdout.write(line)
+            else:
+                result = retention.apply(policy, options['archive_format'], options['chunk_size'])
+                self.stdout.write(self.style.SUCCESS(
+                    f"{policy.label}: archived and deleted {result.rows} row(s)"
+                    + (f" to {result.archive}" if result.archive else "")
+                ))
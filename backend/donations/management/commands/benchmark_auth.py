@@ -0,0 +1,47 @@
+import uuid
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from django_project.authentication import CachedTokenAuthentication, issue_token, token_cache_key
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-request authentication overhead of DRF's TokenAuthentication (Token + User join every "
+        "time) against CachedTokenAuthentication, using a throwaway user and token"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.create_user(email=f'benchmark-auth-{uuid.uuid4().hex[:8]}@example.com')
+        try:
+            token = issue_token(user)
+            factory = APIRequestFactory()
+            request = Request(factory.get('/api/accounts/me/', HTTP_AUTHORIZATION=f'Token {token.key}'))
+
+            for name, authenticator in [('drf-token', TokenAuthentication()),
+                                        ('cached-token', CachedTokenAuthentication())]:
+                cache.delete(token_cache_key(token.key))
+                # Warm up (fills the cache for the cached backend)
+                authenticator.authenticate(request)
+                with CaptureQueriesContext(connection) as queries:
+                    start = perf_counter()
+                    for _ in range(options['requests']):
+                        authenticator.authenticate(request)
+                    elapsed = perf_counter() - start
+                per_request_us = elapsed / options['requests'] * 1_000_000
+                per_request_queries = len(queries) / options['requests']
+                self.stdout.write(f"{name:<14} {per_request_us:10.1f} µs/request {per_request_queries:6.2f} queries/request")
+        finally:
+            # Deleting the user cascades to the token and drops its cached snapshot
+            user.delete()
@@ -0,0 +1,101 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.db.models import F
+
+from donations import counters, ledger
+from donations.loadtest import summarize
+from donations.models import Campaign, Donation, DonationLedgerEntry
+
+
+def hot_row(donation):
+    """What Donation.save() used to do: one UPDATE on the campaign row"""
+    Campaign.objects.filter(pk=donation.campaign_id).update(current_amount=F('current_amount') + donation.amount)
+
+
+def sharded(donation):
+    counters.increment(donation.campaign_id, donation.amount)
+
+
+def ledger_append(donation):
+    """The full settle path: ledger entry plus counter slot"""
+    ledger.append([DonationLedgerEntry(
+        campaign_id=donation.campaign_id, donation=donation, kind='credit', amount=donation.amount,
+    )])
+
+
+MODES = {'hot-row': hot_row, 'sharded': sharded, 'ledger': ledger_append}
+
+
+class Command(BaseCommand):
+    help = (
+        "Settle donations from many threads at once, each in a webhook-like transaction (mark the donation "
+        "completed, add to the campaign total, hold the transaction open for --hold-ms), and compare the "
+        "single campaign row with the sharded counter. Postgres only: SQLite locks the whole database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', nargs='+', choices=MODES, default=['hot-row', 'sharded'])
+        parser.add_argument('--threads', type=int, default=32)
+        parser.add_argument('--iterations', type=int, default=50, help='Webhooks per thread')
+        parser.add_argument('--hold-ms', type=float, default=5,
+                            help='Time the transaction stays open after the counter write')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Row-lock contention needs Postgres; SQLite serializes every writer")
+
+        self.stdout.write(f"{'mode':<10} {'webhooks/s':>11} {'p50':>8} {'p99':>8} {'max':>8}")
+        for mode in options['modes']:
+            campaign = Campaign.objects.create(
+                title=f'Counter benchmark ({mode})', description='benchmark', goal_amount=Decimal('1000000.00'),
+                is_active=False,
+            )
+            try:
+                result = self.run_mode(MODES[mode], campaign, options)
+            finally:
+                # The ledger is append-only, so leave the throwaway campaign's entries to the CASCADE
+                Campaign.objects.filter(pk=campaign.pk).delete()
+            self.stdout.write(
+                f"{mode:<10} {result['per_sec']:11.1f} {result['p50_ms']:8.1f} {result['p99_ms']:8.1f} "
+                f"{result['max_ms']:8.1f}"
+            )
+
+    def run_mode(self, write, campaign, options):
+        total = options['threads'] * options['iterations']
+        Donation.objects.bulk_create([
+            Donation(campaign=campaign, amount=Decimal('10.00'), payment_status='pending') for _ in range(total)
+        ])
+        ids = list(Donation.objects.filter(campaign=campaign).values_list('pk', flat=True))
+        hold = options['hold_ms'] / 1000
+
+        def worker(number):
+            latencies = []
+            try:
+                for donation_id in ids[number::options['threads']]:
+                    start = time.perf_counter()
+                    with transaction.atomic():
+                        Donation.objects.filter(pk=donation_id).update(payment_status='completed')
+                        write(Donation(pk=donation_id, campaign_id=campaign.pk, amount=Decimal('10.00')))
+                        time.sleep(hold)
+                    latencies.append((time.perf_counter() - start) * 1000)
+            finally:
+                connections.close_all()
+            return latencies
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            results = list(pool.map(worker, range(options['threads'])))
+        elapsed = time.perf_counter() - start
+
+        latencies = [latency for thread_latencies in results for latency in thread_latencies]
+        summary = summarize(latencies)
+        return {
+            'per_sec': len(latencies) / elapsed,
+            'p50_ms': summary['p50_ms'],
+            'p99_ms': summary['p99_ms'],
+            'max_ms': summary['max_ms'],
+        }
@@ -0,0 +1,125 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import dj_database_url
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, connections
+
+from donations.loadtest import summarize
+
+ACTIVE_CONNECTIONS_SQL = (
+    "SELECT count(*) FROM pg_stat_activity "
+    "WHERE datname = current_database() AND backend_type = 'client backend'"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run many threads of short 'requests' (a query, then some non-DB work while the connection is "
+        "still held) with persistent connections, the psycopg pool and PgBouncer, reporting throughput, "
+        "latency and peak server connections. Postgres only."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', nargs='+', choices=['persistent', 'native', 'pgbouncer'],
+                            default=['persistent', 'native'])
+        parser.add_argument('--threads', type=int, default=64)
+        parser.add_argument('--iterations', type=int, default=50, help='Requests per thread')
+        parser.add_argument('--think-ms', type=float, default=5, help='Non-DB work per request')
+        parser.add_argument('--pool-size', type=int, default=8, help='max_size for the native pool')
+        parser.add_argument('--pgbouncer-url', help='Database URL pointing at PgBouncer (for --modes pgbouncer)')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Connection pooling only applies to Postgres")
+        if 'pgbouncer' in options['modes'] and not options['pgbouncer_url']:
+            raise CommandError("--modes pgbouncer needs --pgbouncer-url")
+
+        self.stdout.write(
+            f"{'mode':<12} {'req/s':>9} {'p50':>8} {'p99':>8} {'max':>8} {'peak conns':>11} {'errors':>7}"
+        )
+        for mode in options['modes']:
+            alias = f'benchmark_{mode}'
+            connections.settings[alias] = self.database_for(mode, options)
+            try:
+                result = self.run_mode(alias, options)
+            finally:
+                wrapper = connections[alias]
+                wrapper.close()
+                if hasattr(wrapper, 'close_pool'):
+                    wrapper.close_pool()
+                del connections.settings[alias]
+            self.stdout.write(
+                f"{mode:<12} {result['per_sec']:9.1f} {result['p50_ms']:8.1f} {result['p99_ms']:8.1f} "
+                f"{result['max_ms']:8.1f} {result['peak_connections']:11d} {result['errors']:7d}"
+            )
+
+    def database_for(self, mode, options):
+        database = {**connections['default'].settings_dict, 'OPTIONS': {}}
+        if mode == 'persistent':
+            database['CONN_MAX_AGE'] = 600
+        elif mode == 'native':
+            database['CONN_MAX_AGE'] = 0
+            database['OPTIONS']['pool'] = {'min_size': 1, 'max_size': options['pool_size'], 'timeout': 30}
+        else:
+            parsed = dj_database_url.parse(options['pgbouncer_url'])
+            database.update({name: parsed[name] for name in ('NAME', 'USER', 'PASSWORD', 'HOST', 'PORT')})
+            database['CONN_MAX_AGE'] = 0
+            database['DISABLE_SERVER_SIDE_CURSORS'] = True
+            database['OPTIONS']['prepare_threshold'] = None
+        return database
+
+    def run_mode(self, alias, options):
+        think = options['think_ms'] / 1000
+        peak = {'connections': 0}
+        stop = threading.Event()
+
+        def monitor():
+            # Counted from the default connection, which is not part of the benchmark
+            with connections['default'].cursor() as cursor:
+                while not stop.is_set():
+                    cursor.execute(ACTIVE_CONNECTIONS_SQL)
+                    peak['connections'] = max(peak['connections'], cursor.fetchone()[0] - 1)
+                    stop.wait(0.02)
+            connections['default'].close()
+
+        def worker(_):
+            latencies, errors = [], 0
+            wrapper = connections[alias]
+            try:
+                for _ in range(options['iterations']):
+                    start = time.perf_counter()
+                    try:
+                        with wrapper.cursor() as cursor:
+                            cursor.execute('SELECT count(*) FROM donations_campaign WHERE is_active')
+                            cursor.fetchone()
+                        time.sleep(think)
+                    except DatabaseError:
+                        errors += 1
+                    # What request_finished does at the end of every Django request
+                    wrapper.close_if_unusable_or_obsolete()
+                    latencies.append((time.perf_counter() - start) * 1000)
+            finally:
+                wrapper.close()
+            return latencies, errors
+
+        monitor_thread = threading.Thread(target=monitor, daemon=True)
+        monitor_thread.start()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            results = list(pool.map(worker, range(options['threads'])))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        monitor_thread.join()
+
+        latencies = [latency for thread_latencies, _ in results for latency in thread_latencies]
+        summary = summarize(latencies)
+        return {
+            'per_sec': len(latencies) / elapsed,
+            'p50_ms': summary['p50_ms'],
+            'p99_ms': summary['p99_ms'],
+            'max_ms': summary['max_ms'],
+            'peak_connections': peak['connections'],
+            'errors': sum(errors for _, errors in results),
+        }
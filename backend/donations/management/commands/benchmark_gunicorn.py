@@ -0,0 +1,142 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from donations.loadtest import summarize
+
+# name -> environment overrides for gunicorn.conf.py
+VARIANTS = {
+    'sync': {'GUNICORN_WORKLOAD': 'cpu', 'GUNICORN_PRELOAD': 'false'},
+    'sync-preload': {'GUNICORN_WORKLOAD': 'cpu', 'GUNICORN_PRELOAD': 'true'},
+    'gthread-preload': {'GUNICORN_WORKLOAD': 'io', 'GUNICORN_PRELOAD': 'true'},
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def children(pid):
+    path = Path(f'/proc/{pid}/task/{pid}/children')
+    return [int(child) for child in path.read_text().split()]
+
+
+def memory_kb(pid):
+    """Rss, Pss and Uss (private pages) of a process, from smaps_rollup"""
+    fields = {}
+    for line in Path(f'/proc/{pid}/smaps_rollup').read_text().splitlines()[1:]:
+        name, value = line.split(':', 1)
+        fields[name] = int(value.split()[0])
+    return {
+        'rss': fields['Rss'],
+        'pss': fields['Pss'],
+        'uss': fields['Private_Clean'] + fields['Private_Dirty'],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Start gunicorn (gunicorn.conf.py) in several configurations and compare memory per worker "
+        "and throughput against one endpoint. Linux only."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--variants', nargs='+', choices=VARIANTS, default=list(VARIANTS))
+        parser.add_argument('--workers', type=int, default=3)
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--path', default='/api/donations/campaign/')
+
+    def handle(self, *args, **options):
+        if not Path('/proc/self/smaps_rollup').exists():
+            raise CommandError("Memory figures come from /proc/<pid>/smaps_rollup; run this on Linux")
+
+        self.stdout.write(
+            f"{'variant':<16} {'uss/worker':>11} {'pss/worker':>11} {'total pss':>10} "
+            f"{'req/s':>8} {'p50':>7} {'p99':>7} {'errors':>7}"
+        )
+        for name in options['variants']:
+            result = self.run_variant(VARIANTS[name], options)
+            self.stdout.write(
+                f"{name:<16} {result['uss_mb']:9.1f}MB {result['pss_mb']:9.1f}MB {result['total_pss_mb']:8.1f}MB "
+                f"{result['per_sec']:8.1f} {result['p50_ms']:7.1f} {result['p99_ms']:7.1f} {result['errors']:7d}"
+            )
+
+    def run_variant(self, overrides, options):
+        port = free_port()
+        env = {
+            **os.environ, **overrides,
+            'GUNICORN_BIND': f'127.0.0.1:{port}',
+            'GUNICORN_WORKERS': str(options['workers']),
+            'GUNICORN_MAX_REQUESTS': '0',
+            'DJANGO_PROCESS_ROLE': 'web',
+        }
+        backend_dir = settings.BASE_DIR.parent
+        master = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', str(backend_dir / 'gunicorn.conf.py')],
+            cwd=backend_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        base_url = f'http://127.0.0.1:{port}'
+        try:
+            self.wait_until_up(base_url, master)
+            latencies, errors, elapsed = self.load(base_url, options)
+            # Measured after the load so pages workers dirtied while serving are counted
+            workers = [memory_kb(pid) for pid in children(master.pid)]
+            total_pss = memory_kb(master.pid)['pss'] + sum(worker['pss'] for worker in workers)
+        finally:
+            master.terminate()
+            master.wait(30)
+
+        summary = summarize(latencies)
+        return {
+            'uss_mb': sum(worker['uss'] for worker in workers) / len(workers) / 1024,
+            'pss_mb': sum(worker['pss'] for worker in workers) / len(workers) / 1024,
+            'total_pss_mb': total_pss / 1024,
+            'per_sec': len(latencies) / elapsed,
+            'p50_ms': summary['p50_ms'],
+            'p99_ms': summary['p99_ms'],
+            'errors': errors,
+        }
+
+    def wait_until_up(self, base_url, master, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if master.poll() is not None:
+                raise CommandError(f"gunicorn exited with status {master.returncode}")
+            try:
+                httpx.get(f'{base_url}/health/live/', timeout=1)
+                return
+            except httpx.TransportError:
+                time.sleep(0.2)
+        raise CommandError("gunicorn did not start in time")
+
+    def load(self, base_url, options):
+        per_client = max(1, options['requests'] // options['concurrency'])
+
+        def client(number):
+            latencies, errors = [], 0
+            with httpx.Client(base_url=base_url, timeout=30) as http:
+                for request in range(number * per_client, (number + 1) * per_client):
+                    # A distinct X-Forwarded-For per request keeps the anon throttle out of the measurement
+                    address = f'10.{request // 65536 % 256}.{request // 256 % 256}.{request % 256}'
+                    start = time.perf_counter()
+                    response = http.get(options['path'], headers={'X-Forwarded-For': address})
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    errors += response.status_code >= 400
+            return latencies, errors
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(client, range(options['concurrency'])))
+        elapsed = time.perf_counter() - start
+        return [latency for latencies, _ in results for latency in latencies], sum(e for _, e in results), elapsed
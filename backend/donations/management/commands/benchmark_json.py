@@ -0,0 +1,83 @@
+import io
+from datetime import timedelta
+from decimal import Decimal
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from django_project.parsers import ORJSONParser
+from django_project.renderers import ORJSONRenderer
+
+
+def campaign_payload():
+    now = timezone.now()
+    return {
+        'id': 1,
+        'title': "Matt's Freedom Fundraiser — 1st Annual Silent Auction",
+        'description': 'A community fundraiser to support Matt Raynor. ' * 20,
+        'goal_amount': '5000.00',
+        'current_amount': '3275.00',
+        'progress_percentage': Decimal('65.5'),
+        'tickets_sold': 48,
+        'is_active': True,
+        'start_date': now,
+        'end_date': None,
+        'featured_image': 'https://res.cloudinary.com/demo/image/upload/matt.jpg',
+        'featured_video_url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+        'created_at': now,
+        'updated_at': now,
+    }
+
+
+def donor_list_payload(rows):
+    now = timezone.now()
+    return [
+        {
+            'id': i,
+            'amount': Decimal('50.00') * (i % 5 + 1),
+            'ticket_quantity': i % 4,
+            'donor_name': f'Donor {i}',
+            'is_anonymous': False,
+            'message': 'Go Matt! Rooting for you from Hampton Bays.',
+            'created_at': now - timedelta(minutes=i),
+        }
+        for i in range(rows)
+    ]
+
+
+class Command(BaseCommand):
+    help = "Compare DRF's stdlib JSON renderer/parser against the orjson pair"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000)
+        parser.add_argument('--rows', type=int, default=100, help='Rows in the donor-list payload')
+
+    def time_it(self, func, iterations):
+        start = perf_counter()
+        for _ in range(iterations):
+            func()
+        return (perf_counter() - start) / iterations * 1_000_000
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        payloads = {
+            'campaign': campaign_payload(),
+            f"donors[{options['rows']}]": donor_list_payload(options['rows']),
+        }
+
+        self.stdout.write(f"{'payload':<14} {'operation':<8} {'stdlib µs':>10} {'orjson µs':>10} {'speedup':>8}")
+        for name, payload in payloads.items():
+            body = JSONRenderer().render(payload)
+            cases = [
+                ('render', lambda: JSONRenderer().render(payload), lambda: ORJSONRenderer().render(payload)),
+                ('parse', lambda: JSONParser().parse(io.BytesIO(body)), lambda: ORJSONParser().parse(io.BytesIO(body))),
+            ]
+            for operation, stdlib, fast in cases:
+                stdlib_us = self.time_it(stdlib, iterations)
+                fast_us = self.time_it(fast, iterations)
+                self.stdout.write(
+                    f"{name:<14} {operation:<8} {stdlib_us:10.1f} {fast_us:10.1f} {stdlib_us / fast_us:7.1f}x"
+                )
@@ -0,0 +1,66 @@
+from decimal import Decimal
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from donations.models import Campaign, Donation, CampaignUpdate
+from donations.serializers import DonationSerializer, CampaignUpdateFeedSerializer
+from donations.values_serializers import DonationValuesSerializer, CampaignUpdateFeedValuesSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare ModelSerializer and values() serializer time per 1,000 rows (rows are rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def time_per_thousand(self, func, rows, repeat):
+        best = min(self.time_once(func) for _ in range(repeat))
+        return best / rows * 1000 * 1000
+
+    def time_once(self, func):
+        start = perf_counter()
+        func()
+        return perf_counter() - start
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+
+        with transaction.atomic():
+            campaign = Campaign.objects.create(
+                title='Benchmark campaign', description='Benchmark', goal_amount=Decimal('5000.00')
+            )
+            Donation.objects.bulk_create([
+                Donation(
+                    campaign=campaign, amount=Decimal('50.00'), ticket_quantity=1,
+                    donor_name=f'Donor {i}', message='Go Matt!',
+                    stripe_session_id=f'cs_bench_{i}', payment_status='completed',
+                )
+                for i in range(rows)
+            ])
+            CampaignUpdate.objects.bulk_create([
+                CampaignUpdate(
+                    campaign=campaign, title=f'Update {i}', content='Progress report',
+                    video_url='https://youtu.be/dQw4w9WgXcQ',
+                )
+                for i in range(rows)
+            ])
+
+            donations = Donation.objects.filter(campaign=campaign)
+            updates = CampaignUpdate.objects.filter(campaign=campaign)
+            cases = [
+                ('donations', lambda: DonationSerializer(donations.all(), many=True).data,
+                 lambda: DonationValuesSerializer.serialize_many(donations.all())),
+                ('updates', lambda: CampaignUpdateFeedSerializer(updates.all(), many=True).data,
+                 lambda: CampaignUpdateFeedValuesSerializer.serialize_many(updates.all())),
+            ]
+
+            self.stdout.write(f"{'endpoint':<10} {'ModelSerializer ms':>19} {'values() ms':>12} {'speedup':>8}   (per 1,000 rows)")
+            for name, model_path, values_path in cases:
+                model_ms = self.time_per_thousand(model_path, rows, repeat)
+                values_ms = self.time_per_thousand(values_path, rows, repeat)
+                self.stdout.write(f"{name:<10} {model_ms:19.2f} {values_ms:12.2f} {model_ms / values_ms:7.1f}x")
+
+            transaction.set_rollback(True)
@@ -0,0 +1,76 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from django_project.settings.roles import ROLES
+
+# What each role does before it can serve its first request / task
+STARTUP = {
+    'web': "import django; django.setup(); from django.urls import get_resolver; get_resolver().url_patterns",
+    'worker': "import django; django.setup(); from django_project.celery import app; app.loader.import_default_modules()",
+    'beat': "import django; django.setup(); from django_project.celery import app; app.loader.import_default_modules()",
+    'manage': "import django; django.setup(); from django.core.management import get_commands; get_commands()",
+}
+
+# What settings/base.py used to import up front in every process
+EAGER_SDKS = "import stripe, cloudinary, cloudinary.uploader, cloudinary.api; "
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)')
+
+
+def parse_importtime(stderr):
+    """(total self time in µs, {top-level module: cumulative µs})"""
+    total = 0
+    top_level = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        total += int(self_us)
+        if len(indent) <= 1:
+            top_level[module] = top_level.get(module, 0) + int(cumulative_us)
+    return total, top_level
+
+
+class Command(BaseCommand):
+    help = "Measure cold-start import time per process role with python -X importtime"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--roles', nargs='+', choices=ROLES, default=list(ROLES))
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--top', type=int, default=8, help='Show the slowest N top-level imports')
+
+    def measure(self, role, code, runs):
+        env = {**os.environ, 'DJANGO_PROCESS_ROLE': role, 'PYTHONWARNINGS': 'ignore'}
+        env.setdefault('DJANGO_SETTINGS_MODULE', os.environ.get('DJANGO_SETTINGS_MODULE', 'django_project.settings.dev'))
+        command = [sys.executable, '-X', 'importtime', '-c', code]
+        cwd = settings.BASE_DIR.parent
+
+        subprocess.run(command, env=env, cwd=cwd, capture_output=True, check=True)  # warm .pyc files
+        walls, imports, top_level = [], [], {}
+        for _ in range(runs):
+            start = perf_counter()
+            result = subprocess.run(command, env=env, cwd=cwd, capture_output=True, text=True, check=True)
+            walls.append((perf_counter() - start) * 1000)
+            total, top_level = parse_importtime(result.stderr)
+            imports.append(total / 1000)
+        return statistics.median(walls), statistics.median(imports), top_level
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'role':<8} {'profile':<12} {'wall ms':>9} {'import ms':>10}")
+        for role in options['roles']:
+            lazy = self.measure(role, STARTUP[role], options['runs'])
+            eager = self.measure(role, EAGER_SDKS + STARTUP[role], options['runs'])
+            for name, (wall, imports, _) in [('eager-sdks', eager), ('lazy-sdks', lazy)]:
+                self.stdout.write(f"{role:<8} {name:<12} {wall:9.1f} {imports:10.1f}")
+            self.stdout.write(f"{'':<8} {'saved':<12} {eager[0] - lazy[0]:9.1f} {eager[1] - lazy[1]:10.1f}")
+
+            slowest = sorted(lazy[2].items(), key=lambda item: item[1], reverse=True)[:options['top']]
+            self.stdout.write('  slowest imports: ' + ', '.join(f"{module} {us / 1000:.0f}ms" for module, us in slowest))
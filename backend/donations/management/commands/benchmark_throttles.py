@@ -0,0 +1,60 @@
+from time import perf_counter, time
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework.throttling import AnonRateThrottle
+
+from django_project.throttling import SlidingWindowAnonRateThrottle
+
+
+BENCHMARK_CACHE_FORMAT = 'benchmark_throttle_%(scope)s_%(ident)s'
+
+
+class Command(BaseCommand):
+    help = "Compare per-request overhead of DRF's history throttle against the sliding-window throttle"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000)
+        parser.add_argument('--rate', default='100000/hour')
+        parser.add_argument('--cache', default='default', help='Cache alias to benchmark against')
+
+    def handle(self, *args, **options):
+        cache = caches[options['cache']]
+        factory = APIRequestFactory()
+        request = Request(factory.get('/api/donations/campaign/', REMOTE_ADDR='10.0.0.1'))
+        request.user = None
+
+        # Own key prefix, so only the benchmark's counters are ever removed:
+        # the cache may hold live throttles, tokens and lockouts (or share
+        # a Redis server with the Celery broker), so no clear()
+        class HistoryThrottle(AnonRateThrottle):
+            rate = options['rate']
+            cache_format = BENCHMARK_CACHE_FORMAT
+
+        class SlidingThrottle(SlidingWindowAnonRateThrottle):
+            rate = options['rate']
+            cache_alias = options['cache']
+            cache_format = BENCHMARK_CACHE_FORMAT
+
+        HistoryThrottle.cache = cache
+
+        for name, throttle_class in [('drf-history', HistoryThrottle), ('sliding-window', SlidingThrottle)]:
+            keys = self.benchmark_keys(throttle_class(), request)
+            cache.delete_many(keys)
+            start = perf_counter()
+            for _ in range(options['requests']):
+                throttle_class().allow_request(request, None)
+            elapsed = perf_counter() - start
+            cache.delete_many(keys)
+            per_request_us = elapsed / options['requests'] * 1_000_000
+            self.stdout.write(f"{name:<16} {per_request_us:10.1f} µs/request")
+
+    @staticmethod
+    def benchmark_keys(throttle, request):
+        """The history key, and the sliding-window counters either side of now"""
+        key = throttle.get_cache_key(request, None)
+        duration = throttle.parse_rate(throttle.rate)[1]
+        window = int(time() // duration)
+        return [key] + [f"{key}:{window + offset}" for offset in (-1, 0, 1)]
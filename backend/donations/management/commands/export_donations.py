@@ -0,0 +1,43 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from donations.exports import EXPORT_FORMATS, STREAMERS, export_queryset, parquet_available, parse_filters
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream donations (with campaign and thank-you email status) to a CSV or Parquet file for "
+        "bookkeeping. Memory use stays flat regardless of table size."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', dest='file_format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--campaign', help='Only donations to this campaign id')
+        parser.add_argument('--start', help='First day to include (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last day to include (YYYY-MM-DD)')
+        parser.add_argument('--output', '-o', help='File to write (default: stdout)')
+
+    def handle(self, *args, **options):
+        if options['file_format'] == 'parquet' and not parquet_available():
+            raise CommandError("Parquet export needs pyarrow installed")
+        try:
+            filters = parse_filters(options['campaign'], options['start'], options['end'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        chunks = STREAMERS[options['file_format']](export_queryset(**filters))
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                written = self.write(chunks, output)
+            self.stderr.write(self.style.SUCCESS(f"Wrote {written} bytes to {options['output']}"))
+        else:
+            self.write(chunks, sys.stdout.buffer)
+
+    def write(self, chunks, output):
+        written = 0
+        for chunk in chunks:
+            output.write(chunk)
+            written += len(chunk)
+        output.flush()
+        return written
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from donations.fake_stripe import FakeStripeServer, WebhookEmitter
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a local fake Stripe Checkout API. Point the app at it with "
+        "STRIPE_API_BASE=http://<host>:<port>"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=12111)
+        parser.add_argument('--latency-ms', type=float, default=0, help='Mean delay added to each API call')
+        parser.add_argument('--jitter-ms', type=float, default=0, help='Standard deviation of the API delay')
+        parser.add_argument('--webhook-url', help='Where to POST signed checkout.session.completed events')
+        parser.add_argument('--webhook-delay', type=float, default=0, help='Seconds between payment and webhook')
+        parser.add_argument('--webhook-rate', type=float, help='Maximum webhooks per second')
+        parser.add_argument('--auto-complete', action='store_true',
+                            help='Pay every session as soon as it is created instead of on checkout URL visit')
+
+    def handle(self, *args, **options):
+        emitter = None
+        if options['webhook_url']:
+            emitter = WebhookEmitter(
+                None, options['webhook_url'], settings.STRIPE_WEBHOOK_SECRET,
+                delay=options['webhook_delay'], rate=options['webhook_rate'],
+            )
+
+        server = FakeStripeServer(
+            options['host'], options['port'],
+            latency=options['latency_ms'] / 1000, latency_jitter=options['jitter_ms'] / 1000,
+            emitter=emitter, auto_complete=options['auto_complete'],
+        )
+        if emitter:
+            emitter.start()
+
+        self.stdout.write(self.style.SUCCESS(f"Fake Stripe listening on {server.url}"))
+        if emitter:
+            self.stdout.write(f"Sending webhooks to {options['webhook_url']}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if emitter:
+                emitter.stop(timeout=5)
+                self.stdout.write(f"Webhooks sent: {emitter.sent}, failed: {emitter.failed}")
+            server.server_close()
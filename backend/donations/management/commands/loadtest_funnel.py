@@ -0,0 +1,188 @@
+import json
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from pathlib import Path
+
+import httpx
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings, setup_databases, teardown_databases
+from django.utils import timezone
+
+from donations.fake_stripe import FakeStripeServer
+from donations.loadtest import LocalTaskQueue, Recorder, serve
+from donations.models import Campaign, Donation
+from emails.smtp_sink import SMTPSink
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive campaign read -> create_donation -> stripe_webhook -> email tasks concurrently "
+        "against a throwaway test database, a local fake Stripe server and a local SMTP sink"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--donors', type=int, default=200, help='Number of funnels to run')
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--workers', type=int, default=2, help='Local Celery worker threads')
+        parser.add_argument('--stripe-latency-ms', type=float, default=0,
+                            help='Delay the fake Stripe adds to each API call')
+        parser.add_argument('--output', help='Write results JSON here (default: loadtest-results/<commit>-<time>.json)')
+        parser.add_argument('--compare', help='Previous results JSON to diff against')
+
+    def handle(self, *args, **options):
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            results = self.run_funnel(options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        output = Path(options['output'] or (
+            Path('loadtest-results') / f"funnel-{results['meta']['commit'] or 'local'}-{int(time.time())}.json"
+        ))
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, indent=2))
+
+        self.print_results(results)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {output}"))
+
+        if options['compare']:
+            self.print_comparison(json.loads(Path(options['compare']).read_text()), results)
+
+    def run_funnel(self, options):
+        server_recorder = Recorder()
+        client_recorder = Recorder()
+        task_recorder = Recorder()
+        stripe_server = FakeStripeServer(latency=options['stripe_latency_ms'] / 1000).start()
+        fake_stripe = stripe_server.fake_stripe
+        sink = SMTPSink().start()
+        webhook_secret = settings.STRIPE_WEBHOOK_SECRET
+
+        Campaign.objects.create(
+            title='Load test campaign', description='Load test',
+            goal_amount=Decimal('1000000.00'), is_active=True,
+        )
+
+        email_settings = override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1', EMAIL_PORT=sink.port, EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='',
+        )
+        task_queue = LocalTaskQueue(task_recorder, workers=options['workers'])
+
+        with email_settings, stripe_server.sdk_pointed_here(), task_queue.running(), \
+                serve(server_recorder) as base_url:
+            def donor(number):
+                headers = {'X-Forwarded-For': f"10.{number // 65536 % 256}.{number // 256 % 256}.{number % 256}"}
+                with httpx.Client(base_url=base_url, headers=headers, timeout=30) as client:
+                    steps = [
+                        ('campaign', lambda: client.get('/api/donations/campaign/')),
+                        ('create', lambda: client.post('/api/donations/create/', json={
+                            'ticket_quantity': 1,
+                            'donation_amount': '25.00',
+                            'donor_name': f'Load Test {number}',
+                            'donor_email': f'donor{number}@example.com',
+                        })),
+                    ]
+                    for name, request in steps:
+                        start = time.perf_counter()
+                        response = request()
+                        client_recorder.record(name, (time.perf_counter() - start) * 1000,
+                                               errors=int(response.status_code >= 400))
+                        if response.status_code >= 400:
+                            return False
+
+                    session_id = response.json()['checkout_url'].rsplit('/', 1)[-1]
+                    payload, signature = fake_stripe.signed_webhook(session_id, webhook_secret)
+                    start = time.perf_counter()
+                    response = client.post(
+                        '/api/donations/stripe/webhook/', content=payload,
+                        headers={'Content-Type': 'application/json', 'Stripe-Signature': signature},
+                    )
+                    client_recorder.record('webhook', (time.perf_counter() - start) * 1000,
+                                           errors=int(response.status_code >= 400))
+                    return response.status_code < 400
+
+            funnel_start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                outcomes = list(pool.map(donor, range(options['donors'])))
+            requests_seconds = time.perf_counter() - funnel_start
+        # Leaving task_queue.running() waits for every queued email task
+        wall_seconds = time.perf_counter() - funnel_start
+        sink.stop()
+        stripe_server.stop()
+
+        completed = Donation.objects.filter(payment_status='completed').count()
+        return {
+            'meta': {
+                'commit': git_commit(),
+                'timestamp': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'donors': options['donors'],
+                'concurrency': options['concurrency'],
+                'workers': options['workers'],
+                'stripe_latency_ms': options['stripe_latency_ms'],
+            },
+            'funnel': {
+                'succeeded': sum(outcomes),
+                'failed': len(outcomes) - sum(outcomes),
+                'donations_completed': completed,
+                'requests_seconds': round(requests_seconds, 3),
+                'wall_seconds': round(wall_seconds, 3),
+                'funnels_per_sec': round(sum(outcomes) / requests_seconds, 2) if requests_seconds else 0.0,
+            },
+            'endpoints': client_recorder.report(requests_seconds),
+            'server': server_recorder.report(requests_seconds),
+            'tasks': task_recorder.report(wall_seconds),
+            'task_failures': task_queue.failures,
+            'emails': {'delivered': sink.message_count, 'bytes': sink.total_bytes},
+        }
+
+    def print_results(self, results):
+        funnel = results['funnel']
+        self.stdout.write(
+            f"{funnel['succeeded']} funnels ok, {funnel['failed']} failed, "
+            f"{funnel['funnels_per_sec']} funnels/s, {results['emails']['delivered']} emails delivered"
+        )
+        self.stdout.write(f"{'endpoint':<36} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8}")
+        server = results['server']
+        for step, stats in results['endpoints'].items():
+            view = {'campaign': 'donations:current-campaign', 'create': 'donations:create-donation',
+                    'webhook': 'donations:stripe-webhook'}[step]
+            queries = server.get(view, {}).get('queries_per_call', 0)
+            self.stdout.write(
+                f"{view:<36} {stats['per_sec']:8.1f} {stats['p50_ms']:8.1f} "
+                f"{stats['p95_ms']:8.1f} {stats['p99_ms']:8.1f} {queries:8.1f}"
+            )
+        for task, stats in results['tasks'].items():
+            self.stdout.write(
+                f"{task:<36} {stats['per_sec']:8.1f} {stats['p50_ms']:8.1f} "
+                f"{stats['p95_ms']:8.1f} {stats['p99_ms']:8.1f} {stats['queries_per_call']:8.1f}"
+            )
+
+    def print_comparison(self, before, after):
+        self.stdout.write(f"\nCompared with {before['meta'].get('commit')} ({before['meta'].get('timestamp')}):")
+        for section in ('endpoints', 'server', 'tasks'):
+            for key, stats in after[section].items():
+                old = before.get(section, {}).get(key)
+                if not old:
+                    continue
+                deltas = []
+                for metric in ('p50_ms', 'p95_ms', 'p99_ms', 'queries_per_call'):
+                    if metric in stats and old.get(metric):
+                        change = (stats[metric] - old[metric]) / old[metric] * 100
+                        deltas.append(f"{metric} {old[metric]} -> {stats[metric]} ({change:+.0f}%)")
+                if deltas:
+                    self.stdout.write(f"  {section}/{key}: " + ', '.join(deltas))
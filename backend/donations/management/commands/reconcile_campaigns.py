@@ -0,0 +1,54 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from donations.reconciliation import campaign_balances, fix_drift, missed_webhooks, settle_missed_webhooks
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare each campaign's current_amount with the sum of its completed donations and, with --stripe, "
+        "look for paid Checkout Sessions whose webhook never arrived. Reports by default; --fix repairs both."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--campaign', type=int, action='append', dest='campaigns', help='Limit to campaign id(s)')
+        parser.add_argument('--stripe', action='store_true', help='Also page through Stripe Checkout Sessions')
+        parser.add_argument('--days', type=int, default=30, help='How far back to look in Stripe')
+        parser.add_argument('--fix', action='store_true', help='Settle missed webhooks and correct drifted totals')
+
+    def handle(self, *args, **options):
+        campaigns = options['campaigns']
+
+        if options['stripe']:
+            since = timezone.now() - datetime.timedelta(days=options['days'])
+            missed = missed_webhooks(since, campaigns)
+            for entry in missed:
+                self.stdout.write(self.style.WARNING(
+                    f"Missed webhook: donation {entry.donation_id} (${entry.amount}) session {entry.session_id}"
+                ))
+            if missed and options['fix']:
+                settled = settle_missed_webhooks(missed)
+                self.stdout.write(self.style.SUCCESS(f"Marked {settled} donation(s) completed"))
+            elif not missed:
+                self.stdout.write(f"No missed webhooks in the last {options['days']} day(s)")
+
+        balances = campaign_balances(campaigns)
+        drifted = [balance for balance in balances if not balance.balanced]
+        for balance in balances:
+            line = (
+                f"Campaign {balance.campaign_id} {balance.title[:40]!r}: stored ${balance.current_amount}, "
+                f"ledger ${balance.ledger_amount}, donations ${balance.expected_amount} "
+                f"({balance.completed_count} completed, ${balance.refunded_amount} refunded)"
+            )
+            if not balance.balanced:
+                self.stdout.write(self.style.ERROR(f"{line}, drift ${balance.drift}"))
+            else:
+                self.stdout.write(line)
+
+        if drifted and options['fix']:
+            fixed = fix_drift(drifted)
+            self.stdout.write(self.style.SUCCESS(f"Corrected {fixed} campaign total(s)"))
+        elif drifted:
+            self.stdout.write(self.style.WARNING(f"{len(drifted)} campaign(s) drifted; rerun with --fix to correct"))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from donations.models import Campaign, CampaignUpdate
+from donations.tasks import resolve_campaign_media, resolve_campaign_update_media
+
+
+class Command(BaseCommand):
+    help = "Queue media metadata resolution for every campaign and campaign update"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sync', action='store_true', help='Resolve inline instead of queueing Celery tasks')
+
+    def handle(self, *args, **options):
+        run = (lambda task, pk: task(pk)) if options['sync'] else (lambda task, pk: task.delay(pk))
+
+        campaign_ids = list(Campaign.objects.values_list('id', flat=True))
+        for campaign_id in campaign_ids:
+            run(resolve_campaign_media, campaign_id)
+
+        update_ids = list(CampaignUpdate.objects.values_list('id', flat=True))
+        for update_id in update_ids:
+            run(resolve_campaign_update_media, update_id)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Resolved media for {len(campaign_ids)} campaign(s) and {len(update_ids)} update(s)"
+        ))
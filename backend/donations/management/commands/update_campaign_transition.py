@@ -1,5 +1,6 @@
 # backend/donations/management/commands/update_campaign_transition.py
 from django.core.management.base import BaseCommand
+from donations import ledger
 from donations.models import Campaign
 from decimal import Decimal
 
@@ -24,12 +25,16 @@ I want to be able to use the shower I raised money for. I want to hang out with
 
 The Hampton Bays community and my recovery family have been incredible throughout this journey. This is the last mile of a two-year journey toward independence. Everything is in the oven – I just need help bridging the gap while the bureaucracy catches up.''',
                 'goal_amount': Decimal('6000.00'),
-                'current_amount': Decimal('0.00'),  # Reset for new campaign
                 'is_active': True,
                 'featured_video_url': '',  # Add new video URL if you have one
                 'featured_image': '',  # Add new image URL if you have one
             }
         )
+
+        # Reset for new campaign: totals come from the donation ledger, so zero it there
+        ledger.adjust_to(campaign.id, Decimal('0.00'))
+        ledger.fold([campaign.id])
+        campaign.refresh_from_db(fields=['current_amount'])
         
         if created:
             self.stdout.write(
@@ -0,0 +1,119 @@
+import logging
+
+import httpx
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from django_project.sdk import cloudinary
+
+from .embeds import parse_video_url, embed_url_for, thumbnail_url_for
+
+logger = logging.getLogger(__name__)
+
+RESPONSIVE_WIDTHS = (480, 960, 1440)
+
+OEMBED_ENDPOINTS = {
+    'youtube': 'https://www.youtube.com/oembed',
+    'vimeo': 'https://vimeo.com/api/oembed.json',
+}
+
+
+class OEmbedResolver:
+    """Resolve YouTube/Vimeo URLs through the providers' public oEmbed APIs"""
+    timeout = 5.0
+
+    def resolve(self, url, provider, video_id):
+        response = httpx.get(
+            OEMBED_ENDPOINTS[provider],
+            params={'url': url, 'format': 'json'},
+            timeout=self.timeout,
+            follow_redirects=True,
+        )
+        response.raise_for_status()
+        data = response.json()
+        return {
+            'title': data.get('title', ''),
+            'width': data.get('width'),
+            'height': data.get('height'),
+            'thumbnail_url': data.get('thumbnail_url', ''),
+            'thumbnail_width': data.get('thumbnail_width'),
+            'thumbnail_height': data.get('thumbnail_height'),
+        }
+
+
+class FakeMediaResolver:
+    """Deterministic resolver for tests and offline development"""
+
+    def resolve(self, url, provider, video_id):
+        return {
+            'title': f'{provider} video {video_id}',
+            'width': 640,
+            'height': 360,
+            'thumbnail_url': f'https://thumbnails.invalid/{provider}/{video_id}.jpg',
+            'thumbnail_width': 480,
+            'thumbnail_height': 360,
+        }
+
+
+def get_media_resolver():
+    return import_string(settings.MEDIA_RESOLVER)()
+
+
+def responsive_image_urls(url):
+    """Cloudinary fetch URLs for a remote image at each responsive width"""
+    return {
+        str(width): cloudinary.utils.cloudinary_url(
+            url, type='fetch', width=width, crop='limit',
+            fetch_format='auto', quality='auto'
+        )[0]
+        for width in RESPONSIVE_WIDTHS
+    }
+
+
+def resolve_image(url):
+    if not url:
+        return {}
+    return {
+        'source_url': url,
+        'type': 'image',
+        'responsive': responsive_image_urls(url),
+    }
+
+
+def resolve_video(url, resolver=None):
+    """
+    Resolve a video URL into provider, embed, size and thumbnail metadata.
+    Falls back to what can be derived from the URL alone if the provider
+    lookup fails.
+    """
+    if not url:
+        return {}
+
+    provider, video_id = parse_video_url(url)
+    metadata = {
+        'source_url': url,
+        'type': 'video',
+        'provider': provider,
+        'video_id': video_id,
+        'embed_url': embed_url_for(provider, video_id),
+        'thumbnail_url': thumbnail_url_for(provider, video_id),
+    }
+    if not provider:
+        return metadata
+
+    resolver = resolver or get_media_resolver()
+    try:
+        resolved = resolver.resolve(url, provider, video_id)
+    except Exception as e:
+        logger.warning(f"Media resolution failed for {url}: {e}")
+    else:
+        metadata.update({key: value for key, value in resolved.items() if value})
+
+    if metadata['thumbnail_url']:
+        metadata['responsive'] = responsive_image_urls(metadata['thumbnail_url'])
+    return metadata
+
+
+def is_stale(metadata, key, url):
+    """True if the stored entry for ``key`` wasn't resolved from ``url``"""
+    return (metadata or {}).get(key, {}).get('source_url', '') != (url or '')
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.6 on 2026-10-19 12:06
+
+from django.db import migrations, models
+
+from donations.embeds import parse_video_url, parse_embed_code, embed_url_for, thumbnail_url_for
+
+
+def backfill_video_metadata(apps, schema_editor):
+    CampaignUpdate = apps.get_model("donations", "CampaignUpdate")
+    for update in CampaignUpdate.objects.all():
+        provider, video_id = parse_video_url(update.video_url)
+        if not provider:
+            provider, video_id = parse_embed_code(update.video_embed_code)
+        update.video_provider = provider
+        update.video_id = video_id
+        update.video_embed_url = embed_url_for(provider, video_id)
+        update.video_thumbnail_url = thumbnail_url_for(provider, video_id)
+        update.save(update_fields=[
+            "video_provider", "video_id", "video_embed_url", "video_thumbnail_url"
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("donations", "0003_donation_ticket_quantity"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="campaignupdate",
+            name="video_embed_url",
+            field=models.URLField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="campaignupdate",
+            name="video_id",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="campaignupdate",
+            name="video_provider",
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.AddField(
+            model_name="campaignupdate",
+            name="video_thumbnail_url",
+            field=models.URLField(blank=True),
+        ),
+        migrations.RunPython(backfill_video_metadata, migrations.RunPython.noop),
+    ]
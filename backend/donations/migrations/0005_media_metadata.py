@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-19 12:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("donations", "0004_campaignupdate_video_metadata"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="campaign",
+            name="media_metadata",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="campaignupdate",
+            name="media_metadata",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.6 on 2026-10-19 12:13
+
+from django.db import migrations, models
+
+
+def blank_session_ids_to_null(apps, schema_editor):
+    Donation = apps.get_model("donations", "Donation")
+    Donation.objects.filter(stripe_session_id="").update(stripe_session_id=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("donations", "0005_media_metadata"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="donation",
+            name="stripe_session_id",
+            field=models.CharField(blank=True, max_length=200, null=True, unique=True),
+        ),
+        migrations.RunPython(blank_session_ids_to_null, migrations.RunPython.noop),
+    ]
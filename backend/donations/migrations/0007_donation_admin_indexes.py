@@ -0,0 +1,26 @@
+# Generated by Django 5.1.6 on 2026-10-19 12:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("donations", "0006_donation_stripe_session_id_nullable"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="donation",
+            index=models.Index(fields=["created_at"], name="donation_created_at_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="donation",
+            index=models.Index(
+                fields=["payment_status", "created_at"],
+                name="donation_status_created_idx",
+            ),
+        ),
+    ]
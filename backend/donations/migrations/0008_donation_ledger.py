@@ -0,0 +1,110 @@
+# Generated by Django 5.1.6 on 2026-10-19 12:36
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_ledger(apps, schema_editor):
+    """
+    Credit every completed/refunded donation (and debit refunds), then add one
+    adjustment per campaign so folded totals equal what current_amount shows
+    today; `reconcile_campaigns` reports any difference from the donations.
+    """
+    Campaign = apps.get_model("donations", "Campaign")
+    Donation = apps.get_model("donations", "Donation")
+    DonationLedgerEntry = apps.get_model("donations", "DonationLedgerEntry")
+
+    batch = []
+    donations = Donation.objects.filter(payment_status__in=["completed", "refunded"]).order_by("id").values_list(
+        "id", "campaign_id", "amount", "payment_status", "created_at", "updated_at",
+    )
+    for donation_id, campaign_id, amount, status, created_at, updated_at in donations.iterator(chunk_size=2000):
+        batch.append(DonationLedgerEntry(
+            campaign_id=campaign_id, donation_id=donation_id, kind="credit", amount=amount, created_at=created_at,
+        ))
+        if status == "refunded":
+            batch.append(DonationLedgerEntry(
+                campaign_id=campaign_id, donation_id=donation_id, kind="debit", amount=-amount, created_at=updated_at,
+            ))
+        if len(batch) >= 2000:
+            DonationLedgerEntry.objects.bulk_create(batch)
+            batch = []
+    DonationLedgerEntry.objects.bulk_create(batch)
+
+    totals = dict(
+        DonationLedgerEntry.objects.order_by().values("campaign_id").annotate(total=Sum("amount"))
+        .values_list("campaign_id", "total")
+    )
+    DonationLedgerEntry.objects.bulk_create([
+        DonationLedgerEntry(campaign_id=campaign_id, kind="adjustment", amount=current - totals.get(campaign_id, 0))
+        for campaign_id, current in Campaign.objects.values_list("id", "current_amount")
+        if current != totals.get(campaign_id, 0)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("donations", "0007_donation_admin_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DonationLedgerEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("credit", "Credit"),
+                            ("debit", "Debit"),
+                            ("adjustment", "Adjustment"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("amount", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "campaign",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ledger_entries",
+                        to="donations.campaign",
+                    ),
+                ),
+                (
+                    "donation",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.RESTRICT,
+                        related_name="ledger_entries",
+                        to="donations.donation",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "donation ledger entries",
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        fields=["campaign", "created_at"],
+                        name="ledger_campaign_created_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_ledger, migrations.RunPython.noop),
+    ]
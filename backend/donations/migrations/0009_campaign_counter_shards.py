@@ -0,0 +1,65 @@
+# Generated by Django 5.1.6 on 2026-10-19 12:38
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def seed_counters(apps, schema_editor):
+    """Start each campaign's slot 0 at its ledger total"""
+    CampaignCounterShard = apps.get_model("donations", "CampaignCounterShard")
+    DonationLedgerEntry = apps.get_model("donations", "DonationLedgerEntry")
+
+    totals = DonationLedgerEntry.objects.order_by().values("campaign_id").annotate(total=Sum("amount")) \
+        .values_list("campaign_id", "total")
+    CampaignCounterShard.objects.bulk_create([
+        CampaignCounterShard(campaign_id=campaign_id, slot=0, amount=total) for campaign_id, total in totals
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("donations", "0008_donation_ledger"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CampaignCounterShard",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("slot", models.PositiveSmallIntegerField()),
+                (
+                    "amount",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=10
+                    ),
+                ),
+                (
+                    "campaign",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="counter_shards",
+                        to="donations.campaign",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("campaign", "slot"), name="unique_campaign_counter_slot"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
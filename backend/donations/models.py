@@ -1,11 +1,22 @@
-from django.db import models
-from django.db.models import F
+from django.db import NotSupportedError, models, transaction
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from decimal import Decimal
 
+from django_project import metrics
+
+from .embeds import parse_video_url, parse_embed_code, embed_url_for, thumbnail_url_for
+from .media import is_stale
+
 User = get_user_model()
 
+
+def progress_percentage(current_amount, goal_amount):
+    if goal_amount and goal_amount > 0:
+        return min(100, (current_amount / goal_amount) * 100)
+    return 0
+
+
 class Campaign(models.Model):
     """
     Matt's fundraising campaigns - usually one active at a time
@@ -20,6 +31,8 @@ class Campaign(models.Model):
     end_date = models.DateTimeField(null=True, blank=True)
     featured_image = models.URLField(blank=True)
     featured_video_url = models.URLField(blank=True)  # Add this
+    media_metadata = models.JSONField(default=dict, blank=True)
+    # Resolved embed/thumbnail/responsive image data, filled in by Celery
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -28,13 +41,19 @@ class Campaign(models.Model):
     
     def __str__(self):
         return self.title
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+        if is_stale(self.media_metadata, 'featured_image', self.featured_image) or \
+           is_stale(self.media_metadata, 'featured_video', self.featured_video_url):
+            from .tasks import resolve_campaign_media
+            transaction.on_commit(lambda: resolve_campaign_media.delay(self.pk))
         
     @property
     def progress_percentage(self):
         """Calculate percentage toward goal"""
-        if self.goal_amount and self.goal_amount > 0:
-            return min(100, (self.current_amount / self.goal_amount) * 100)
-        return 0
+        return progress_percentage(self.current_amount, self.goal_amount)
 class Donation(models.Model):
     """
     Individual donations - people can donate any amount they want
@@ -44,6 +63,7 @@ class Donation(models.Model):
         ('completed', 'Completed'),
         ('failed', 'Failed'),
         ('refunded', 'Refunded'),
+        ('expired', 'Expired'),  # Checkout abandoned; set by the pending-donation sweeper
     ]
     
     # Campaign relationship
@@ -61,7 +81,8 @@ class Donation(models.Model):
     message = models.TextField(blank=True)
     
     # Payment processing
-    stripe_session_id = models.CharField(max_length=200, unique=True)
+    stripe_session_id = models.CharField(max_length=200, unique=True, null=True, blank=True)
+    # NULL until the Checkout Session exists, so concurrent pending rows don't collide
     stripe_payment_intent_id = models.CharField(max_length=200, blank=True)
     payment_status = models.CharField(max_length=20, choices=PAYMENT_STATUS_CHOICES, default='pending')
     
@@ -78,6 +99,11 @@ class Donation(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Default ordering and the admin's date hierarchy
+            models.Index(fields=['created_at'], name='donation_created_at_idx'),
+            models.Index(fields=['payment_status', 'created_at'], name='donation_status_created_idx'),
+        ]
     
     def __str__(self):
         donor = self.donor_name or "Anonymous"
@@ -94,19 +120,94 @@ class Donation(models.Model):
             ).first()
 
         super().save(*args, **kwargs)
+        metrics.record_donation_transition(self, old_status, is_new)
+
+        # Credit on completion, debit on refund; the campaign total is folded from the ledger
+        from . import ledger
+        entry = ledger.entry_for_transition(self, old_status, is_new)
+        if entry is not None:
+            ledger.append([entry])
+
+
+class CampaignCounterShard(models.Model):
+    """
+    One of CAMPAIGN_COUNTER_SHARDS running totals per campaign. Settling a
+    donation adds to a random slot, so concurrent webhooks rarely wait on
+    the same row lock; the campaign total is the sum of its slots.
+    """
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='counter_shards')
+    slot = models.PositiveSmallIntegerField()
+    amount = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['campaign', 'slot'], name='unique_campaign_counter_slot'),
+        ]
+
+    def __str__(self):
+        return f"Campaign {self.campaign_id} slot {self.slot}: ${self.amount}"
 
-        # Atomic update: campaign total when payment status changed to completed
-        if (is_new and self.payment_status == 'completed') or \
-           (old_status and old_status != 'completed' and self.payment_status == 'completed'):
-            Campaign.objects.filter(pk=self.campaign_id).update(
-                current_amount=F('current_amount') + self.amount
-            )
 
-        # Atomic subtract if refunded
-        elif old_status == 'completed' and self.payment_status == 'refunded':
-            Campaign.objects.filter(pk=self.campaign_id).update(
-                current_amount=F('current_amount') - self.amount
-            )
+class LedgerQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        raise NotSupportedError("Donation ledger entries are append-only")
+
+    def delete(self):
+        raise NotSupportedError("Donation ledger entries are append-only")
+
+
+class DonationLedgerEntry(models.Model):
+    """
+    Append-only record of money moving in or out of a campaign. Amounts are
+    signed (debits negative), so any total is a plain SUM.
+    """
+    KIND_CHOICES = [
+        ('credit', 'Credit'),
+        ('debit', 'Debit'),
+        ('adjustment', 'Adjustment'),
+    ]
+
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='ledger_entries')
+    # Money moved for this donation, so it can't be deleted out from under the ledger
+    # (only together with its campaign, which takes the entries with it)
+    donation = models.ForeignKey(
+        Donation, on_delete=models.RESTRICT, null=True, blank=True, related_name='ledger_entries',
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    objects = LedgerQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # Folding and point-in-time totals are range sums over this
+            models.Index(fields=['campaign', 'created_at'], name='ledger_campaign_created_idx'),
+        ]
+        verbose_name_plural = 'donation ledger entries'
+
+    def __str__(self):
+        return f"{self.kind} ${self.amount} to campaign {self.campaign_id}"
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise NotSupportedError("Donation ledger entries are append-only")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise NotSupportedError("Donation ledger entries are append-only")
+
+
+class CampaignUpdateQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        # Sends no signals, so the cached feed is invalidated here (saves and
+        # deletes go through donations.signals)
+        rows = super().update(**kwargs)
+        from .feeds import invalidate_updates_feed
+        invalidate_updates_feed()
+        return rows
+
 
 class CampaignUpdate(models.Model):
     """
@@ -129,15 +230,50 @@ class CampaignUpdate(models.Model):
     
     video_embed_code = models.TextField(blank=True)
     # Full YouTube/Vimeo embed code if needed
+
+    # Normalized from video_url / video_embed_code on save
+    video_provider = models.CharField(max_length=20, blank=True)
+    video_id = models.CharField(max_length=64, blank=True)
+    video_embed_url = models.URLField(blank=True)
+    video_thumbnail_url = models.URLField(blank=True)
+    media_metadata = models.JSONField(default=dict, blank=True)
+    # Resolved oEmbed/responsive image data, filled in by Celery
     
     created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = CampaignUpdateQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_at']
     
     def __str__(self):
         return f"{self.title} - {self.created_at.strftime('%b %d, %Y')}"
-    
+
+    def normalize_video(self):
+        """Resolve provider, id, embed and thumbnail URLs once instead of per read"""
+        provider, video_id = parse_video_url(self.video_url)
+        if not provider:
+            provider, video_id = parse_embed_code(self.video_embed_code)
+
+        self.video_provider = provider
+        self.video_id = video_id
+        self.video_embed_url = embed_url_for(provider, video_id)
+        self.video_thumbnail_url = thumbnail_url_for(provider, video_id)
+
+    def save(self, *args, **kwargs):
+        self.normalize_video()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {
+                'video_provider', 'video_id', 'video_embed_url', 'video_thumbnail_url'
+            }
+        super().save(*args, **kwargs)
+
+        if is_stale(self.media_metadata, 'image', self.image_url) or \
+           is_stale(self.media_metadata, 'video', self.video_url):
+            from .tasks import resolve_campaign_update_media
+            transaction.on_commit(lambda: resolve_campaign_update_media.delay(self.pk))
+
     @property
     def has_video(self):
         return bool(self.video_url or self.video_embed_code)
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+Checks Campaign.current_amount and the donation ledger it is folded from
+against what the donations actually add up to, and optionally against
+Stripe for paid Checkout Sessions whose webhook never arrived.
+"""
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, Q, Sum, Value, When
+
+from django_project.sdk import stripe
+
+from . import counters, ledger
+from .bulk import bulk_set_status, resend_thank_you_emails
+from .ledger import ledger_total_subquery
+from .models import Campaign, Donation
+
+STRIPE_PAGE_SIZE = 100
+# Only these are moved to completed when Stripe says the session was paid
+UNSETTLED_STATUSES = ('pending', 'failed', 'expired')
+
+
+@dataclass
+class CampaignBalance:
+    campaign_id: int
+    title: str
+    current_amount: Decimal
+    ledger_amount: Decimal
+    expected_amount: Decimal
+    completed_count: int
+    refunded_amount: Decimal
+
+    @property
+    def drift(self):
+        return self.current_amount - self.expected_amount
+
+    @property
+    def balanced(self):
+        return self.current_amount == self.ledger_amount == self.expected_amount
+
+
+@dataclass
+class MissedWebhook:
+    donation_id: int
+    campaign_id: int
+    session_id: str
+    payment_intent: str
+    amount: Decimal
+
+
+def campaign_balances(campaign_ids=None):
+    """Every campaign's stored total next to its donation total, in one aggregate query"""
+    zero = Value(Decimal('0'), output_field=DecimalField(max_digits=10, decimal_places=2))
+    queryset = Campaign.objects.annotate(
+        # A subquery, so the ledger join doesn't multiply the donation sums
+        ledger_amount=ledger_total_subquery(),
+        expected_amount=Sum('donations__amount', filter=Q(donations__payment_status='completed'), default=zero),
+        completed_count=Count('donations', filter=Q(donations__payment_status='completed')),
+        refunded_amount=Sum('donations__amount', filter=Q(donations__payment_status='refunded'), default=zero),
+    ).order_by('id')
+    if campaign_ids:
+        queryset = queryset.filter(pk__in=campaign_ids)
+    return [
+        CampaignBalance(*row) for row in queryset.values_list(
+            'id', 'title', 'current_amount', 'ledger_amount', 'expected_amount', 'completed_count', 'refunded_amount',
+        )
+    ]
+
+
+def session_pages(page_size=STRIPE_PAGE_SIZE, **filters):
+    """Pages of Checkout Sessions matching ``filters`` (Session.list parameters), newest first"""
+    params = {'limit': page_size, **filters}
+    while True:
+        page = stripe.checkout.Session.list(**params)
+        if page['data']:
+            yield page['data']
+        if not page['has_more'] or not page['data']:
+            return
+        params['starting_after'] = page['data'][-1]['id']
+
+
+def paid_sessions(since, page_size=STRIPE_PAGE_SIZE):
+    """Pages of completed Checkout Sessions created since ``since``"""
+    return session_pages(page_size, status='complete', created={'gte': int(since.timestamp())})
+
+
+def missed_webhooks(since, campaign_ids=None, page_size=STRIPE_PAGE_SIZE):
+    """Donations Stripe has taken payment for that are still unsettled here"""
+    missed = []
+    for sessions in paid_sessions(since, page_size):
+        by_session = {session['id']: session for session in sessions if session.get('payment_status') == 'paid'}
+        # One indexed lookup (stripe_session_id is unique) per page of sessions
+        donations = Donation.objects.filter(
+            stripe_session_id__in=by_session, payment_status__in=UNSETTLED_STATUSES,
+        )
+        if campaign_ids:
+            donations = donations.filter(campaign_id__in=campaign_ids)
+        for donation_id, campaign_id, session_id, amount in donations.values_list(
+            'id', 'campaign_id', 'stripe_session_id', 'amount',
+        ):
+            missed.append(MissedWebhook(
+                donation_id, campaign_id, session_id, by_session[session_id].get('payment_intent') or '', amount,
+            ))
+    return missed
+
+
+def settle_missed_webhooks(missed):
+    """Do what the webhook would have: mark completed, record the intent, queue thank-yous"""
+    if not missed:
+        return 0
+    ids = [entry.donation_id for entry in missed]
+    with transaction.atomic():
+        changed, _ = bulk_set_status(Donation.objects.filter(pk__in=ids), 'completed')
+        Donation.objects.filter(pk__in=ids).update(stripe_payment_intent_id=Case(
+            *[When(pk=entry.donation_id, then=Value(entry.payment_intent)) for entry in missed],
+            default=Value(''),
+        ))
+        resend_thank_you_emails(Donation.objects.filter(pk__in=ids), force=False)
+    return changed
+
+
+def fix_drift(balances):
+    """Bring each drifted campaign's ledger and counters to its donation total, then fold in one UPDATE"""
+    campaign_ids = [balance.campaign_id for balance in balances]
+    if not campaign_ids:
+        return 0
+    for campaign_id in campaign_ids:
+        with transaction.atomic():
+            # Campaign row first, then its slots: the order adjust_to() and increment() take them in
+            list(Campaign.objects.select_for_update().filter(pk=campaign_id).values_list('pk'))
+            counters.lock(campaign_id)
+            # The balance was read before the lock; a donation may have settled since
+            expected = Donation.objects.filter(campaign_id=campaign_id, payment_status='completed') \
+                .aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+            ledger.adjust_to(campaign_id, expected)
+            # The counter slots are what gets folded; reset them from the (now correct) ledger
+            counters.rebuild(campaign_id, expected)
+    return ledger.fold(campaign_ids)
@@ -6,6 +6,7 @@ from .models import Campaign, Donation, CampaignUpdate
 class CampaignSerializer(serializers.ModelSerializer):
     progress_percentage = serializers.ReadOnlyField()
     tickets_sold = serializers.SerializerMethodField()
+    media = serializers.JSONField(source='media_metadata', read_only=True)
 
     class Meta:
         model = Campaign
@@ -13,7 +14,7 @@ class CampaignSerializer(serializers.ModelSerializer):
             'id', 'title', 'description', 'goal_amount',
             'current_amount', 'progress_percentage', 'tickets_sold', 'is_active',
             'start_date', 'end_date', 'featured_image', 'featured_video_url',
-            'created_at', 'updated_at'
+            'media', 'created_at', 'updated_at'
         ]
 
     def get_tickets_sold(self, obj):
@@ -40,6 +41,19 @@ class CampaignUpdateSerializer(serializers.ModelSerializer):
             'video_embed_code', 'image_url', 'has_video', 'created_at'
         ]
 
+class CampaignUpdateFeedSerializer(serializers.ModelSerializer):
+    """Compact feed item: normalized embed metadata instead of raw embed code"""
+    has_video = serializers.ReadOnlyField()
+    media = serializers.JSONField(source='media_metadata', read_only=True)
+
+    class Meta:
+        model = CampaignUpdate
+        fields = [
+            'id', 'title', 'content', 'image_url', 'video_url', 'has_video',
+            'video_provider', 'video_id', 'video_embed_url', 'video_thumbnail_url',
+            'media', 'created_at'
+        ]
+
 class CreateDonationSerializer(serializers.Serializer):
     ticket_quantity = serializers.IntegerField(min_value=0, default=0)
     donation_amount = serializers.DecimalField(
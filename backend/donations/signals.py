@@ -0,0 +1,17 @@
+"""
+Keeps the cached campaign updates feed (donations.feeds) in step with its
+rows. Receivers rather than CampaignUpdate.save()/delete() overrides, so
+queryset deletes (the admin's "delete selected", campaign cascades) are
+covered too; CampaignUpdateQuerySet.update() handles bulk updates.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .feeds import invalidate_updates_feed
+from .models import CampaignUpdate
+
+
+@receiver(post_save, sender=CampaignUpdate)
+@receiver(post_delete, sender=CampaignUpdate)
+def invalidate_feed_on_change(sender, instance, **kwargs):
+    invalidate_updates_feed()
@@ -0,0 +1,125 @@
+"""
+Sweeps pending donations left behind by abandoned checkouts.
+
+create_donation() saves a pending Donation before the Checkout Session
+exists, and nothing settles it if the donor never pays. Every
+PENDING_SWEEP_INTERVAL, beat walks pending donations older than
+PENDING_DONATION_MAX_AGE_HOURS in keyset batches. For each batch it lists the
+Checkout Sessions created in that time window (a few list calls rather
+than one retrieve per donation; sessions the window misses are retrieved
+one by one) and then:
+
+    paid session      settle it like the missed webhook it is
+    expired session   mark the donation expired
+    no session        mark it failed (Stripe was never reached)
+    open session      leave it; the donor can still pay
+
+With PENDING_SWEEP_POLICY = 'delete', swept rows are then deleted
+instead of kept as expired/failed.
+"""
+import datetime
+import logging
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from django_project.sdk import stripe
+
+from .models import Donation
+from .reconciliation import MissedWebhook, session_pages, settle_missed_webhooks
+
+logger = logging.getLogger(__name__)
+
+SWEEP_POLICIES = ('keep', 'delete')
+# Sessions are created in the same request as their donation; allow for a slow one
+SESSION_WINDOW_SLACK = datetime.timedelta(minutes=10)
+
+
+@dataclass
+class SweepResult:
+    checked: int = 0
+    settled: int = 0
+    expired: int = 0
+    failed: int = 0
+    still_open: int = 0
+    deleted: int = 0
+
+
+def pending_batches(cutoff, batch_size):
+    """Keyset pages of (id, campaign_id, stripe_session_id, amount, created_at) for old pending donations"""
+    last_id = 0
+    while True:
+        batch = list(
+            Donation.objects.filter(payment_status='pending', created_at__lt=cutoff, id__gt=last_id)
+            .order_by('id').values_list('id', 'campaign_id', 'stripe_session_id', 'amount', 'created_at')[:batch_size]
+        )
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1][0]
+
+
+def sessions_for(batch):
+    """Checkout Sessions created around the batch's donations, by id"""
+    created = [row[4] for row in batch]
+    window = {
+        'gte': int((min(created) - SESSION_WINDOW_SLACK).timestamp()),
+        'lte': int((max(created) + SESSION_WINDOW_SLACK).timestamp()),
+    }
+    wanted = {row[2] for row in batch if row[2]}
+    sessions = {}
+    for page in session_pages(created=window):
+        sessions.update((session['id'], session) for session in page if session['id'] in wanted)
+    for session_id in wanted - sessions.keys():
+        try:
+            sessions[session_id] = stripe.checkout.Session.retrieve(session_id)
+        except stripe.error.InvalidRequestError:
+            pass
+    return sessions
+
+
+def sweep_pending_donations(max_age=None, batch_size=None, policy=None):
+    max_age = max_age if max_age is not None else datetime.timedelta(hours=settings.PENDING_DONATION_MAX_AGE_HOURS)
+    batch_size = batch_size or settings.PENDING_SWEEP_BATCH_SIZE
+    policy = policy or settings.PENDING_SWEEP_POLICY
+    if policy not in SWEEP_POLICIES:
+        raise ValueError(f"PENDING_SWEEP_POLICY must be one of {', '.join(SWEEP_POLICIES)}, not {policy!r}")
+
+    result = SweepResult()
+    for batch in pending_batches(timezone.now() - max_age, batch_size):
+        sessions = sessions_for(batch)
+        paid, expired, failed = [], [], []
+        for donation_id, campaign_id, session_id, amount, _ in batch:
+            session = sessions.get(session_id)
+            if session is None:
+                failed.append(donation_id)
+            elif session.get('payment_status') == 'paid':
+                paid.append(MissedWebhook(
+                    donation_id, campaign_id, session_id, session.get('payment_intent') or '', amount,
+                ))
+            elif session['status'] == 'expired':
+                expired.append(donation_id)
+            else:
+                result.still_open += 1
+
+        # One short transaction per batch; the status filter skips rows a webhook settled meanwhile
+        with transaction.atomic():
+            now = timezone.now()
+            result.expired += Donation.objects.filter(pk__in=expired, payment_status='pending') \
+                .update(payment_status='expired', updated_at=now)
+            result.failed += Donation.objects.filter(pk__in=failed, payment_status='pending') \
+                .update(payment_status='failed', updated_at=now)
+            if policy == 'delete':
+                result.deleted += Donation.objects.filter(
+                    pk__in=expired + failed, payment_status__in=['expired', 'failed'],
+                ).delete()[1].get('donations.Donation', 0)
+        result.settled += settle_missed_webhooks(paid)
+        result.checked += len(batch)
+
+    logger.info(
+        f"Swept {result.checked} pending donation(s): {result.settled} settled, {result.expired} expired, "
+        f"{result.failed} failed, {result.still_open} still open, {result.deleted} deleted"
+    )
+    return result
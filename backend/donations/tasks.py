@@ -0,0 +1,65 @@
+from celery import shared_task
+import logging
+
+from .media import resolve_image, resolve_video
+from .models import Campaign, CampaignUpdate
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def resolve_campaign_media(campaign_id):
+    """Resolve the campaign's featured image/video into cached metadata"""
+    campaign = Campaign.objects.filter(id=campaign_id).first()
+    if not campaign:
+        return f"Campaign {campaign_id} not found"
+
+    media_metadata = {
+        'featured_image': resolve_image(campaign.featured_image),
+        'featured_video': resolve_video(campaign.featured_video_url),
+    }
+    # .update() so the save() hook doesn't schedule another resolution
+    Campaign.objects.filter(id=campaign_id).update(media_metadata=media_metadata)
+
+    logger.info(f"Resolved media for campaign {campaign_id}")
+    return f"Resolved media for campaign {campaign_id}"
+
+
+@shared_task
+def resolve_campaign_update_media(campaign_update_id):
+    """Resolve a campaign update's image/video into cached metadata"""
+    update = CampaignUpdate.objects.filter(id=campaign_update_id).first()
+    if not update:
+        return f"Campaign update {campaign_update_id} not found"
+
+    media_metadata = {
+        'image': resolve_image(update.image_url),
+        'video': resolve_video(update.video_url),
+    }
+    # Invalidates the cached updates feed (CampaignUpdateQuerySet.update)
+    CampaignUpdate.objects.filter(id=campaign_update_id).update(media_metadata=media_metadata)
+
+    logger.info(f"Resolved media for campaign update {campaign_update_id}")
+    return f"Resolved media for campaign update {campaign_update_id}"
+
+
+@shared_task
+def fold_campaign_ledgers(campaign_ids=None):
+    """Refresh Campaign.current_amount from the donation ledger (all campaigns when None)"""
+    from .ledger import fold
+
+    folded = fold(campaign_ids)
+    logger.debug(f"Folded the donation ledger into {folded} campaign(s)")
+    return f"Folded {folded} campaign(s)"
+
+
+@shared_task
+def sweep_pending_donations():
+    """Expire or fail pending donations whose checkout was abandoned (see donations.sweeper)"""
+    from .sweeper import sweep_pending_donations as sweep
+
+    result = sweep()
+    return (
+        f"Checked {result.checked}: {result.settled} settled, {result.expired} expired, "
+        f"{result.failed} failed, {result.deleted} deleted"
+    )
@@ -1,3 +1,1078 @@
-from django.test import TestCase
+import datetime
+import gzip
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import stripe
+from environ import Env
+from prometheus_client import REGISTRY
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import NotSupportedError, connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from rest_framework.renderers import JSONRenderer
+
+from django_project import admin_performance, health, retention
+from django_project.db_routers import PIN_COOKIE
+from django_project.renderers import ORJSONRenderer
+from django_project.sdk import LazySDK
+from django_project.settings.database import configure_database
+from django_project.settings.roles import detect_role
+from django_project.throttling import SlidingWindowAnonRateThrottle
+
+from .embeds import parse_video_url, parse_embed_code
+from .fake_stripe import FakeStripe, FakeStripeServer, parse_stripe_form
+from .media import resolve_video
+from .management.commands.benchmark_json import campaign_payload, donor_list_payload
+from . import counters, ledger
+from .bulk import bulk_set_status
+from .reconciliation import campaign_balances, fix_drift, paid_sessions
+from .sweeper import sweep_pending_donations
+from .models import Campaign, CampaignUpdate, Donation, DonationLedgerEntry
+from .serializers import CampaignSerializer, DonationSerializer, CampaignUpdateFeedSerializer
+from .values_serializers import (
+    CampaignValuesSerializer, DonationValuesSerializer, CampaignUpdateFeedValuesSerializer
+)
+
+
+class SlidingWindowThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = 1000.0
+        self.request = Request(APIRequestFactory().get('/', REMOTE_ADDR='10.0.0.1'))
+        self.request.user = None
+
+    def make_throttle(self, rate='3/min'):
+        throttle = SlidingWindowAnonRateThrottle()
+        throttle.rate = rate
+        throttle.num_requests, throttle.duration = throttle.parse_rate(rate)
+        throttle.timer = lambda: self.now
+        return throttle
+
+    def test_blocks_after_limit_within_window(self):
+        results = [self.make_throttle().allow_request(self.request, None) for _ in range(4)]
+        self.assertEqual(results, [True, True, True, False])
+
+    def test_rejected_requests_are_not_counted(self):
+        for _ in range(10):
+            self.make_throttle().allow_request(self.request, None)
+        # 40s into the next window the previous one weighs 1/3 -> 3 * 1/3 = 1
+        self.now = 1060.0
+        results = [self.make_throttle().allow_request(self.request, None) for _ in range(3)]
+        self.assertEqual(results, [True, True, False])
+
+    def test_wait_reports_time_until_next_slot(self):
+        throttles = [self.make_throttle() for _ in range(4)]
+        for throttle in throttles:
+            throttle.allow_request(self.request, None)
+        # Window 16 spans 960-1020; 20s remain, then 1/3 of the next window
+        self.assertAlmostEqual(throttles[-1].wait(), 40.0)
+
+    def test_clients_are_counted_separately(self):
+        for _ in range(3):
+            self.make_throttle().allow_request(self.request, None)
+        other = Request(APIRequestFactory().get('/', REMOTE_ADDR='10.0.0.2'))
+        other.user = None
+        self.assertTrue(self.make_throttle().allow_request(other, None))
+
+    def test_benchmark_removes_only_its_own_keys(self):
+        self.assertTrue(self.make_throttle().allow_request(self.request, None))
+        cache.set('auth:token:abc', 'snapshot')
+        call_command('benchmark_throttles', '--requests', '10', stdout=io.StringIO())
+        self.assertEqual(cache.get('auth:token:abc'), 'snapshot')
+        self.assertEqual(cache.get(f"{self.make_throttle().get_cache_key(self.request, None)}:16"), 1)
+        self.assertFalse([key for key in cache._cache if 'benchmark_throttle' in key])
+
+
+class VideoEmbedTests(TestCase):
+    def test_parses_youtube_and_vimeo_urls(self):
+        self.assertEqual(parse_video_url('https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=5'), ('youtube', 'dQw4w9WgXcQ'))
+        self.assertEqual(parse_video_url('https://youtu.be/dQw4w9WgXcQ'), ('youtube', 'dQw4w9WgXcQ'))
+        self.assertEqual(parse_video_url('https://www.youtube.com/shorts/dQw4w9WgXcQ'), ('youtube', 'dQw4w9WgXcQ'))
+        self.assertEqual(parse_video_url('https://vimeo.com/channels/staffpicks/123456'), ('vimeo', '123456'))
+        self.assertEqual(parse_video_url('https://example.com/video.mp4'), ('', ''))
+
+    def test_parses_embed_code(self):
+        embed = '<iframe src="https://player.vimeo.com/video/987654?h=abc" allowfullscreen></iframe>'
+        self.assertEqual(parse_embed_code(embed), ('vimeo', '987654'))
+
+
+class CampaignUpdatesFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.campaign = Campaign.objects.create(
+            title='Test', description='Test', goal_amount=Decimal('1000.00')
+        )
+        self.url = reverse('donations:campaign-updates')
+
+    def test_normalizes_video_on_save(self):
+        update = CampaignUpdate.objects.create(
+            campaign=self.campaign, title='Vlog', content='...',
+            video_url='https://youtu.be/dQw4w9WgXcQ'
+        )
+        self.assertEqual(update.video_provider, 'youtube')
+        self.assertEqual(update.video_embed_url, 'https://www.youtube-nocookie.com/embed/dQw4w9WgXcQ')
+        self.assertEqual(update.video_thumbnail_url, 'https://i.ytimg.com/vi/dQw4w9WgXcQ/hqdefault.jpg')
+
+    def test_feed_is_paginated(self):
+        for i in range(12):
+            CampaignUpdate.objects.create(campaign=self.campaign, title=f'Update {i}', content='...')
+
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['count'], 12)
+        self.assertEqual(len(data['results']), 10)
+        self.assertEqual(data['next'], f'{self.url}?page=2')
+        self.assertNotIn('video_embed_code', data['results'][0])
+
+        data = self.client.get(self.url, {'page': 2}).json()
+        self.assertEqual(len(data['results']), 2)
+        self.assertIsNone(data['next'])
+
+    def test_pages_past_the_end_are_not_cached(self):
+        CampaignUpdate.objects.create(campaign=self.campaign, title='Only', content='...')
+        self.assertEqual(self.client.get(self.url, {'page': 2}).status_code, 404)
+        for page in range(3, 50):
+            with self.assertNumQueries(1):  # active campaign lookup; the count is cached
+                self.assertEqual(self.client.get(self.url, {'page': page}).status_code, 404)
+        self.assertFalse([key for key in cache._cache if key.endswith((':2', ':49'))])
+        self.assertEqual(self.client.get(self.url, {'page': 1}).json()['count'], 1)
+
+    def test_cached_feed_is_invalidated_on_edit(self):
+        update = CampaignUpdate.objects.create(campaign=self.campaign, title='Before', content='...')
+        self.client.get(self.url)
+
+        with self.assertNumQueries(1):  # active campaign lookup only
+            self.client.get(self.url)
+
+        update.title = 'After'
+        update.save()
+        self.assertEqual(self.client.get(self.url).json()['results'][0]['title'], 'After')
+
+        CampaignUpdate.objects.create(campaign=self.campaign, title='New', content='...')
+        self.assertEqual(self.client.get(self.url).json()['count'], 2)
+
+    def test_cached_feed_is_invalidated_by_queryset_and_admin_changes(self):
+        updates = [
+            CampaignUpdate.objects.create(campaign=self.campaign, title=f'Update {i}', content='...')
+            for i in range(3)
+        ]
+        self.client.get(self.url)
+
+        CampaignUpdate.objects.filter(pk=updates[0].pk).update(title='Renamed')
+        self.assertIn('Renamed', [update['title'] for update in self.client.get(self.url).json()['results']])
+
+        CampaignUpdate.objects.filter(pk=updates[0].pk).delete()
+        self.assertEqual(self.client.get(self.url).json()['count'], 2)
+
+        self.client.force_login(get_user_model().objects.create_superuser(email='admin@example.com', password='pw'))
+        self.client.post(reverse('admin:donations_campaignupdate_changelist'), {
+            'action': 'delete_selected', '_selected_action': [update.pk for update in updates[1:]], 'post': 'yes',
+        })
+        self.assertEqual(self.client.get(self.url).json()['count'], 0)
+
+
+class MediaResolutionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_campaign_media_resolved_after_save(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            campaign = Campaign.objects.create(
+                title='Test', description='Test', goal_amount=Decimal('1000.00'),
+                featured_image='https://example.com/matt.jpg',
+                featured_video_url='https://vimeo.com/123456',
+            )
+
+        campaign.refresh_from_db()
+        video = campaign.media_metadata['featured_video']
+        self.assertEqual(video['provider'], 'vimeo')
+        self.assertEqual((video['width'], video['height']), (640, 360))
+        self.assertEqual(video['thumbnail_url'], 'https://thumbnails.invalid/vimeo/123456.jpg')
+        self.assertIn('/image/fetch/', video['responsive']['480'])
+
+        image = campaign.media_metadata['featured_image']
+        self.assertTrue(image['responsive']['960'].endswith('/https://example.com/matt.jpg'))
+        self.assertIn('w_960', image['responsive']['960'])
+
+        # Unchanged URLs don't queue another resolution
+        with self.captureOnCommitCallbacks() as callbacks:
+            campaign.save()
+        self.assertEqual(callbacks, [])
+
+    def test_resolver_failure_falls_back_to_url_metadata(self):
+        class BrokenResolver:
+            def resolve(self, url, provider, video_id):
+                raise ConnectionError('offline')
+
+        video = resolve_video('https://youtu.be/dQw4w9WgXcQ', resolver=BrokenResolver())
+        self.assertEqual(video['provider'], 'youtube')
+        self.assertEqual(video['thumbnail_url'], 'https://i.ytimg.com/vi/dQw4w9WgXcQ/hqdefault.jpg')
+
+
+class ORJSONRendererTests(TestCase):
+    def test_output_matches_drf_renderer(self):
+        for payload in [campaign_payload(), donor_list_payload(25), {'note': 'line\u2028break'}]:
+            self.assertEqual(ORJSONRenderer().render(payload), JSONRenderer().render(payload))
+
+    def test_settings_module_outside_the_project_keeps_drf_settings(self):
+        # Importing django_project (and its Celery app) must not load DRF settings early
+        import subprocess
+        import sys
+
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'local_settings.py'), 'w') as module:
+                module.write('from django_project.settings.test import *\n')
+            code = (
+                'import django; django.setup(); from rest_framework.settings import api_settings; '
+                'print(api_settings.DEFAULT_RENDERER_CLASSES[0].__name__)'
+            )
+            env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'local_settings',
+                   'PYTHONPATH': os.pathsep.join([directory, str(settings.BASE_DIR.parent)])}
+            output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), 'ORJSONRenderer')
+
+    def test_api_responses_use_orjson(self):
+        Campaign.objects.create(title='Test', description='Test', goal_amount=Decimal('1000.00'))
+        response = self.client.get(reverse('donations:current-campaign'))
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+        self.assertEqual(response.json()['goal_amount'], '1000.00')
+
+
+class ValuesSerializerParityTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.campaign = Campaign.objects.create(
+            title='Test', description='Test', goal_amount=Decimal('1000.00'),
+            current_amount=Decimal('333.33'), featured_video_url='https://youtu.be/dQw4w9WgXcQ',
+        )
+        for i, status in enumerate(['completed', 'completed', 'pending']):
+            Donation.objects.create(
+                campaign=self.campaign, amount=Decimal('50.00') * (i + 1), ticket_quantity=i + 1,
+                donor_name=f'Donor {i}', message='', stripe_session_id=f'cs_{i}', payment_status=status,
+            )
+        CampaignUpdate.objects.create(campaign=self.campaign, title='Text', content='...')
+        CampaignUpdate.objects.create(
+            campaign=self.campaign, title='Embed', content='...',
+            video_embed_code='<iframe src="https://player.vimeo.com/video/1"></iframe>',
+        )
+
+    def assertSameJSON(self, fast, slow):
+        self.assertEqual(JSONRenderer().render(fast), JSONRenderer().render(slow))
+
+    def test_campaign_parity(self):
+        campaigns = Campaign.objects.all()
+        self.assertSameJSON(
+            CampaignValuesSerializer.serialize_one(campaigns),
+            CampaignSerializer(campaigns.first()).data,
+        )
+
+    def test_donation_parity(self):
+        donations = Donation.objects.all()
+        self.assertSameJSON(
+            DonationValuesSerializer.serialize_many(donations),
+            DonationSerializer(donations, many=True).data,
+        )
+
+    def test_campaign_update_parity(self):
+        updates = CampaignUpdate.objects.all()
+        self.assertSameJSON(
+            CampaignUpdateFeedValuesSerializer.serialize_many(updates),
+            CampaignUpdateFeedSerializer(updates, many=True).data,
+        )
+
+    def test_campaign_endpoint_single_query(self):
+        with self.assertNumQueries(1):
+            data = self.client.get(reverse('donations:current-campaign')).json()
+        self.assertEqual(data['tickets_sold'], 3)
+
+
+class FakeStripeFunnelTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.campaign = Campaign.objects.create(title='Test', description='Test', goal_amount=Decimal('1000.00'))
+        self.fake_stripe = FakeStripe()
+
+    def test_checkout_and_signed_webhook_complete_donation(self):
+        with self.fake_stripe.patch_sdk(), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('donations:create-donation'),
+                {'ticket_quantity': 2, 'donor_email': 'donor@example.com'},
+                content_type='application/json',
+            )
+            session_id = response.json()['checkout_url'].rsplit('/', 1)[-1]
+            payload, signature = self.fake_stripe.signed_webhook(session_id, settings.STRIPE_WEBHOOK_SECRET)
+            response = self.client.post(
+                reverse('donations:stripe-webhook'), payload,
+                content_type='application/json', HTTP_STRIPE_SIGNATURE=signature,
+            )
+
+        self.assertEqual(response.status_code, 200)
+        donation = Donation.objects.get(stripe_session_id=session_id)
+        self.assertEqual(donation.payment_status, 'completed')
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.current_amount, Decimal('100.00'))
+
+    def test_bad_signature_rejected(self):
+        session = self.fake_stripe.create_session(metadata={'donation_id': '1'})
+        payload, _ = self.fake_stripe.signed_webhook(session['id'], 'whsec_wrong')
+        _, signature = self.fake_stripe.signed_webhook(session['id'], settings.STRIPE_WEBHOOK_SECRET)
+        response = self.client.post(
+            reverse('donations:stripe-webhook'), payload,
+            content_type='application/json', HTTP_STRIPE_SIGNATURE=signature,
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class FakeStripeServerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.server = FakeStripeServer().start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_parse_stripe_form(self):
+        body = 'line_items[0][price_data][unit_amount]=5000&line_items[0][quantity]=2&metadata[donation_id]=7&mode=payment'
+        self.assertEqual(parse_stripe_form(body), {
+            'line_items': [{'price_data': {'unit_amount': '5000'}, 'quantity': '2'}],
+            'metadata': {'donation_id': '7'},
+            'mode': 'payment',
+        })
+
+    def test_sdk_talks_to_server(self):
+        Campaign.objects.create(title='Test', description='Test', goal_amount=Decimal('1000.00'))
+        with self.server.sdk_pointed_here():
+            response = self.client.post(
+                reverse('donations:create-donation'), {'ticket_quantity': 1, 'donation_amount': '10.00'},
+                content_type='application/json',
+            )
+            session_id = response.json()['checkout_url'].rsplit('/', 1)[-1]
+            session = stripe.checkout.Session.retrieve(session_id)
+            with self.assertRaises(stripe.error.InvalidRequestError):
+                stripe.checkout.Session.retrieve('cs_missing')
+            self.server.fake_stripe.complete_session(session_id)
+            listed = stripe.checkout.Session.list(status='complete', limit=10)
+
+        self.assertEqual([listed_session['id'] for listed_session in listed['data']], [session_id])
+        self.assertTrue(response.json()['checkout_url'].startswith(self.server.url))
+        self.assertEqual(session['amount_total'], 6000)
+        donation = Donation.objects.get(stripe_session_id=session_id)
+        self.assertEqual(session['metadata']['donation_id'], str(donation.id))
+
+
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Campaign.objects.create(title='Test', description='Test', goal_amount=Decimal('1000.00'))
+
+    def test_server_timing_reports_queries_and_cache(self):
+        url = reverse('donations:campaign-updates')
+        self.client.get(url)
+        with self.assertLogs('django_project.instrumentation', level='INFO') as logs:
+            response = self.client.get(url)
+
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('desc="1 queries"', response['Server-Timing'])
+        # The cached feed page is a hit; other cache users (throttles) vary
+        cache_timing = re.search(r'cache;desc="(\d+) hits (\d+) misses"', response['Server-Timing'])
+        self.assertIsNotNone(cache_timing)
+        self.assertGreaterEqual(int(cache_timing[1]), 1)
+        self.assertIn('name=donations:campaign-updates', logs.output[0])
+
+    def test_unsampled_requests_are_not_instrumented(self):
+        with self.settings(INSTRUMENTATION_SAMPLE_RATE=0):
+            response = self.client.get(reverse('donations:current-campaign'))
+        self.assertNotIn('Server-Timing', response)
+
+
+class PrometheusMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.campaign = Campaign.objects.create(title='Test', description='Test', goal_amount=Decimal('1000.00'))
+
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_request_latency_labelled_by_route(self):
+        labels = {'method': 'GET', 'route': 'api/donations/campaign/', 'status': '200'}
+        before = self.sample('http_request_duration_seconds_count', **labels)
+        self.client.get(reverse('donations:current-campaign'))
+        self.assertEqual(self.sample('http_request_duration_seconds_count', **labels), before + 1)
+
+    def test_funnel_counters(self):
+        created = self.sample('donations_created_total')
+        completed = self.sample('donations_completed_total')
+        refunded = self.sample('donations_refunded_total')
+        amount = self.sample('donation_amount_dollars_total', status='completed')
+
+        donation = Donation.objects.create(campaign=self.campaign, amount=Decimal('25.00'))
+        donation.payment_status = 'completed'
+        donation.save()
+        donation.save()
+        donation.payment_status = 'refunded'
+        donation.save()
+
+        self.assertEqual(self.sample('donations_created_total'), created + 1)
+        self.assertEqual(self.sample('donations_completed_total'), completed + 1)
+        self.assertEqual(self.sample('donations_refunded_total'), refunded + 1)
+        self.assertEqual(self.sample('donation_amount_dollars_total', status='completed'), amount + 25)
+
+    def test_metrics_endpoint(self):
+        with self.settings(CELERY_BROKER_URL='memory://'):
+            # No token: closed outside DEBUG
+            self.assertEqual(self.client.get('/metrics/').status_code, 403)
+            with self.settings(DEBUG=True):
+                response = self.client.get('/metrics/')
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(b'http_request_duration_seconds_bucket', response.content)
+            self.assertIn(b'celery_queue_depth', response.content)
+
+            with self.settings(METRICS_AUTH_TOKEN='secret'):
+                self.assertEqual(self.client.get('/metrics/').status_code, 403)
+                response = self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer secret')
+                self.assertEqual(response.status_code, 200)
+
+
+class HealthCheckTests(TestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        health.monitor.snapshot = None
+
+    def test_readiness_reports_each_dependency(self):
+        cache.set(health.WORKER_HEARTBEAT_KEY, {'hostname': 'celery@test', 'at': time.time()})
+        with self.settings(CELERY_BROKER_URL='memory://'):
+            response = self.client.get('/health/ready/')
+
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual(report['status'], 'ready')
+        self.assertEqual(set(report['checks']), {'database', 'cache', 'broker', 'worker'})
+        self.assertIn('latency_ms', report['checks']['database'])
+        self.assertEqual(report['checks']['worker']['hostname'], 'celery@test')
+
+    def test_cached_verdict_served_until_stale(self):
+        with self.settings(CELERY_BROKER_URL='memory://'):
+            self.client.get('/health/ready/')
+            with mock.patch.object(health, 'run_checks') as run_checks:
+                self.assertEqual(self.client.get('/health/ready/').status_code, 200)
+            run_checks.assert_not_called()
+
+    def test_missing_worker_degrades_and_critical_failure_unavailable(self):
+        with self.settings(CELERY_BROKER_URL='memory://'):
+            response = self.client.get('/health/ready/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'degraded')
+
+        health.monitor.snapshot = None
+        with self.settings(CELERY_BROKER_URL='memory://'), \
+                mock.patch.dict(health.PROBES, database=mock.Mock(side_effect=RuntimeError('down'))):
+            response = self.client.get('/health/ready/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['checks']['database']['error'], 'down')
+
+    def test_liveness_does_not_probe(self):
+        with mock.patch.object(health, 'run_checks') as run_checks:
+            self.assertEqual(self.client.get('/health/live/').status_code, 200)
+        run_checks.assert_not_called()
+
+
+class ProcessRoleTests(SimpleTestCase):
+    def test_detect_role_from_command_line(self):
+        self.assertEqual(detect_role(['/usr/bin/celery', '-A', 'django_project', 'worker'], {}), 'worker')
+        self.assertEqual(detect_role(['/usr/bin/celery', '-A', 'django_project', 'beat'], {}), 'beat')
+        self.assertEqual(detect_role(['manage.py', 'migrate'], {}), 'manage')
+        self.assertEqual(detect_role(['manage.py', 'runserver'], {}), 'web')
+        self.assertEqual(detect_role(['/usr/local/bin/gunicorn', 'django_project.wsgi'], {}), 'web')
+
+    def test_explicit_role_wins(self):
+        self.assertEqual(detect_role(['manage.py', 'shell'], {'DJANGO_PROCESS_ROLE': 'worker'}), 'worker')
+        with self.assertRaises(ValueError):
+            detect_role([], {'DJANGO_PROCESS_ROLE': 'cron'})
+
+    def test_sdks_load_on_first_use(self):
+        sdk = LazySDK('json', lambda module: None)
+        self.assertIn('not loaded', repr(sdk))
+        self.assertEqual(sdk.dumps([1]), '[1]')
+        self.assertIs(sdk.decoder, __import__('json').decoder)
+        with self.assertRaises(AttributeError):
+            sdk.missing
+
+
+class DatabasePoolingTests(SimpleTestCase):
+    database = {'ENGINE': 'django.db.backends.postgresql', 'NAME': 'mff', 'CONN_MAX_AGE': 600, 'OPTIONS': {}}
+
+    def configure(self, role, **environ):
+        with mock.patch.dict(os.environ, environ):
+            return configure_database(self.database, role, Env())
+
+    def test_persistent_is_unchanged(self):
+        self.assertEqual(self.configure('web', DB_POOL_MODE='persistent'), self.database)
+
+    def test_native_pool_sized_per_role(self):
+        web = self.configure('web', DB_POOL_MODE='native', GUNICORN_THREADS='6')
+        worker = self.configure('worker', DB_POOL_MODE='native')
+        self.assertEqual(web['CONN_MAX_AGE'], 0)
+        self.assertEqual(web['OPTIONS']['pool']['max_size'], 6)
+        self.assertEqual(worker['OPTIONS']['pool']['max_size'], 2)
+        self.assertEqual(self.database['OPTIONS'], {})
+
+    def test_pgbouncer_disables_server_side_state(self):
+        database = self.configure('web', DB_POOL_MODE='pgbouncer')
+        self.assertTrue(database['DISABLE_SERVER_SIDE_CURSORS'])
+        self.assertIsNone(database['OPTIONS']['prepare_threshold'])
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.campaign = Campaign.objects.create(title='Test', description='Test', goal_amount=Decimal('1000.00'))
+
+    def test_public_reads_use_replica(self):
+        with CaptureQueriesContext(connections['replica']) as replica, \
+                CaptureQueriesContext(connections['default']) as primary:
+            self.client.get(reverse('donations:current-campaign'))
+            self.client.get(reverse('donations:recent-donations'))
+        self.assertEqual(len(replica), 2)
+        self.assertEqual(len(primary), 0)
+
+    def test_writes_and_other_reads_use_primary(self):
+        with CaptureQueriesContext(connections['replica']) as replica:
+            Campaign.objects.filter(is_active=True).exists()
+            with self.settings(CELERY_BROKER_URL='memory://'), FakeStripe().patch_sdk():
+                self.client.post(
+                    reverse('donations:create-donation'), {'ticket_quantity': 1}, content_type='application/json',
+                )
+        self.assertEqual(len(replica), 0)
+
+    def test_client_pinned_to_primary_after_writing(self):
+        with FakeStripe().patch_sdk():
+            response = self.client.post(
+                reverse('donations:create-donation'), {'ticket_quantity': 1}, content_type='application/json',
+            )
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        with CaptureQueriesContext(connections['replica']) as replica:
+            self.client.get(reverse('donations:current-campaign'))
+        self.assertEqual(len(replica), 0)
+
+        self.client.cookies.pop(PIN_COOKIE)
+        with CaptureQueriesContext(connections['replica']) as replica:
+            self.client.get(reverse('donations:current-campaign'))
+        self.assertEqual(len(replica), 1)
+
+
+class DonationExportTests(TestCase):
+    def setUp(self):
+        from emails.models import EmailLog
+
+        self.campaign = Campaign.objects.create(title='Test', description='Test', goal_amount=Decimal('1000.00'))
+        other = Campaign.objects.create(title='Other', description='Other', goal_amount=Decimal('1000.00'))
+        self.donation = Donation.objects.create(
+            campaign=self.campaign, amount=Decimal('50.00'), donor_name='Ann, "A"', donor_email='ann@example.com',
+            payment_status='completed',
+        )
+        EmailLog.objects.create(
+            recipient_email='ann@example.com', subject='Thanks', donation=self.donation,
+            was_sent=True, sent_at=self.donation.created_at,
+        )
+        Donation.objects.create(campaign=other, amount=Decimal('100.00'), donor_email='bob@example.com')
+        self.staff = get_user_model().objects.create_user(
+            email='staff@example.com', password='pw', is_staff=True,
+        )
+
+    def export(self, **params):
+        self.client.force_login(self.staff)
+        return self.client.get(reverse('donations:export-donations'), params)
+
+    def test_export_is_staff_only(self):
+        response = self.client.get(reverse('donations:export-donations'))
+        self.assertIn(response.status_code, (401, 403))
+
+    def test_csv_export_streams_filtered_rows(self):
+        import csv
+
+        response = self.export(campaign=self.campaign.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment', response['Content-Disposition'])
+
+        rows = list(csv.DictReader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['donor_name'], 'Ann, "A"')
+        self.assertEqual(rows[0]['amount'], '50.00')
+        self.assertEqual(rows[0]['campaign'], 'Test')
+        self.assertEqual(rows[0]['email_status'], 'sent')
+
+    def test_csv_export_defuses_formulas(self):
+        import csv
+
+        formula = '=HYPERLINK("https://evil.example","Click")'
+        Donation.objects.filter(pk=self.donation.pk).update(donor_name=formula, message='-1+2')
+        response = self.export(campaign=self.campaign.id)
+        row = next(csv.DictReader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(row['donor_name'], "'" + formula)
+        self.assertEqual(row['message'], "'-1+2")
+        self.assertEqual(row['amount'], '50.00')
+
+        # Parquet keeps the raw value
+        import io
+
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(io.BytesIO(b''.join(self.export(file_format='parquet').streaming_content)))
+        self.assertEqual(table.column('donor_name').to_pylist()[0], formula)
+
+    def test_date_range_and_bad_filters(self):
+        response = self.export(end='2000-01-01')
+        self.assertEqual(b''.join(response.streaming_content).decode().count('\n'), 1)  # header only
+        self.assertEqual(self.export(start='yesterday').status_code, 400)
+        self.assertEqual(self.export(file_format='xlsx').status_code, 400)
+
+    def test_parquet_export(self):
+        import io
+
+        import pyarrow.parquet as pq
+
+        response = self.export(file_format='parquet')
+        self.assertEqual(response.status_code, 200)
+        table = pq.read_table(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(table.num_rows, 2)
+        self.assertEqual(table.column('donor_email').to_pylist(), ['ann@example.com', 'bob@example.com'])
+        self.assertEqual(table.column('email_status').to_pylist(), ['sent', 'none'])
+
+
+class AdminPerformanceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.campaign = Campaign.objects.create(title='Test', description='Test', goal_amount=Decimal('1000.00'))
+        for _ in range(3):
+            Donation.objects.create(campaign=self.campaign, amount=Decimal('50.00'))
+        admin_user = get_user_model().objects.create_superuser(email='admin@example.com', password='pw')
+        self.client.force_login(admin_user)
+
+    def test_changelists_render(self):
+        for name in ('admin:donations_donation_changelist', 'admin:emails_emaillog_changelist'):
+            self.assertEqual(self.client.get(reverse(name)).status_code, 200)
+
+    def test_campaign_filter_choices_are_cached(self):
+        url = reverse('admin:donations_donation_changelist')
+        self.client.get(url)
+        Campaign.objects.create(title='Fresh campaign', description='New', goal_amount=Decimal('10.00'))
+        self.assertNotContains(self.client.get(url), 'Fresh campaign')
+        cache.clear()
+        self.assertContains(self.client.get(url), 'Fresh campaign')
+
+    def test_paginator_uses_estimate_above_threshold(self):
+        queryset = Donation.objects.all()
+        self.assertIsNone(admin_performance.estimated_row_count(queryset))  # not Postgres
+        with mock.patch.object(admin_performance, 'estimated_row_count', return_value=50000):
+            with self.settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=10000), self.assertNumQueries(0):
+                self.assertEqual(admin_performance.EstimatedCountPaginator(queryset, 100).count, 50000)
+            with self.settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=100000):
+                self.assertEqual(admin_performance.EstimatedCountPaginator(queryset, 100).count, 3)
+
+
+class AdminBulkActionTests(TestCase):
+    def setUp(self):
+        self.campaign = Campaign.objects.create(title='Test', description='Test', goal_amount=Decimal('1000.00'))
+        admin_user = get_user_model().objects.create_superuser(email='admin@example.com', password='pw')
+        self.client.force_login(admin_user)
+
+    def make_donations(self, count, status, amount='10.00'):
+        return [
+            Donation.objects.create(
+                campaign=self.campaign, amount=Decimal(amount), donor_email=f'donor{n}@example.com',
+                payment_status=status,
+            )
+            for n in range(count)
+        ]
+
+    def run_action(self, action, donations):
+        return self.client.post(reverse('admin:donations_donation_changelist'), {
+            'action': action, '_selected_action': [donation.pk for donation in donations],
+        })
+
+    def current_amount(self):
+        # Folds are scheduled on commit, which a TestCase never reaches
+        ledger.fold([self.campaign.pk])
+        self.campaign.refresh_from_db()
+        return self.campaign.current_amount
+
+    def test_mark_refunded_subtracts_completed_only(self):
+        completed = self.make_donations(3, 'completed')
+        pending = self.make_donations(1, 'pending')
+        self.assertEqual(self.current_amount(), Decimal('30.00'))
+
+        self.run_action('mark_refunded', completed + pending)
+
+        self.assertEqual(self.current_amount(), Decimal('0.00'))
+        self.assertEqual(Donation.objects.filter(payment_status='refunded').count(), 3)
+        self.assertEqual(Donation.objects.get(pk=pending[0].pk).payment_status, 'pending')
+
+    def test_mark_completed_adds_to_campaign(self):
+        self.run_action('mark_completed', self.make_donations(2, 'pending', amount='25.00'))
+        self.assertEqual(self.current_amount(), Decimal('50.00'))
+
+    def test_skipped_count_under_a_status_filter(self):
+        pending = self.make_donations(2, 'pending')
+        completed = self.make_donations(1, 'completed')
+        response = self.client.post(reverse('admin:donations_donation_changelist') + '?payment_status__exact=pending', {
+            'action': 'mark_completed', '_selected_action': [donation.pk for donation in pending + completed],
+        }, follow=True)
+        sent = [str(message) for message in response.context['messages']]
+        self.assertEqual(sent, ['Marked 2 donation(s) completed ($20.00).'])
+
+    def test_query_count_does_not_grow_with_selection(self):
+        small = Donation.objects.filter(pk__in=[d.pk for d in self.make_donations(2, 'pending')])
+        large = Donation.objects.filter(pk__in=[d.pk for d in self.make_donations(40, 'pending')])
+        counters.increment(self.campaign.pk, Decimal('0.00'))  # create the counter slots up front
+        with CaptureQueriesContext(connections['default']) as small_queries:
+            bulk_set_status(small, 'completed')
+        with CaptureQueriesContext(connections['default']) as large_queries:
+            bulk_set_status(large, 'completed')
+        self.assertEqual(len(small_queries), len(large_queries))
+        self.assertEqual(self.current_amount(), Decimal('420.00'))
+
+    def test_resend_thank_you_sends_again(self):
+        donations = self.make_donations(2, 'completed')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.run_action('resend_thank_you', donations)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.run_action('resend_thank_you', donations)
+        self.assertEqual(len(mail.outbox), 4)
+
+
+class ReconciliationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.campaign = Campaign.objects.create(title='Test', description='Test', goal_amount=Decimal('1000.00'))
+        self.fake_stripe = FakeStripe()
+
+    def reconcile(self, *args):
+        output = io.StringIO()
+        call_command('reconcile_campaigns', *args, stdout=output)
+        return output.getvalue()
+
+    def checkout(self, amount='10.00'):
+        with self.fake_stripe.patch_sdk():
+            response = self.client.post(
+                reverse('donations:create-donation'), {'donation_amount': amount, 'donor_email': 'd@example.com'},
+                content_type='application/json',
+            )
+        return response.json()['checkout_url'].rsplit('/', 1)[-1]
+
+    def test_reports_and_fixes_drift(self):
+        Donation.objects.create(campaign=self.campaign, amount=Decimal('40.00'), payment_status='completed')
+        Donation.objects.create(campaign=self.campaign, amount=Decimal('5.00'), payment_status='refunded')
+        Campaign.objects.filter(pk=self.campaign.pk).update(current_amount=Decimal('0.00'))
+
+        [balance] = campaign_balances()
+        self.assertEqual((balance.expected_amount, balance.drift), (Decimal('40.00'), Decimal('-40.00')))
+        self.assertIn('drift $-40.00', self.reconcile())
+        self.reconcile('--fix')
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.current_amount, Decimal('40.00'))
+        self.assertNotIn('drift', self.reconcile())
+
+    def test_fix_drift_counts_donations_settled_after_the_report(self):
+        Donation.objects.create(campaign=self.campaign, amount=Decimal('40.00'), payment_status='completed')
+        Campaign.objects.filter(pk=self.campaign.pk).update(current_amount=Decimal('0.00'))
+        drifted = [balance for balance in campaign_balances() if not balance.balanced]
+
+        Donation.objects.create(campaign=self.campaign, amount=Decimal('15.00'), payment_status='completed')
+        fix_drift(drifted)
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.current_amount, Decimal('55.00'))
+        self.assertEqual(ledger.total_at(self.campaign.pk, timezone.now()), Decimal('55.00'))
+        self.assertFalse(DonationLedgerEntry.objects.filter(kind='adjustment').exists())
+
+    def test_settles_paid_sessions_without_webhook(self):
+        paid, unpaid = self.checkout('25.00'), self.checkout('7.00')
+        self.fake_stripe.complete_session(paid)
+
+        with self.fake_stripe.patch_sdk():
+            self.assertIn(f'session {paid}', self.reconcile('--stripe'))
+            with self.captureOnCommitCallbacks(execute=True):
+                self.reconcile('--stripe', '--fix')
+
+        donation = Donation.objects.get(stripe_session_id=paid)
+        self.assertEqual(donation.payment_status, 'completed')
+        self.assertTrue(donation.stripe_payment_intent_id.startswith('pi_test_fake'))
+        self.assertEqual(Donation.objects.get(stripe_session_id=unpaid).payment_status, 'pending')
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.current_amount, Decimal('25.00'))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_pages_through_sessions(self):
+        for _ in range(5):
+            self.fake_stripe.complete_session(self.fake_stripe.create_session()['id'])
+        self.fake_stripe.create_session()
+        since = timezone.now() - datetime.timedelta(days=1)
+        with self.fake_stripe.patch_sdk():
+            pages = list(paid_sessions(since, page_size=2))
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+
+
+class DonationLedgerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.campaign = Campaign.objects.create(title='Test', description='Test', goal_amount=Decimal('1000.00'))
+
+    def test_transitions_append_entries_and_fold_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            donation = Donation.objects.create(campaign=self.campaign, amount=Decimal('30.00'))
+            donation.payment_status = 'completed'
+            donation.save()
+            # The campaign row isn't touched until the fold
+            self.campaign.refresh_from_db()
+            self.assertEqual(self.campaign.current_amount, Decimal('0.00'))
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.current_amount, Decimal('30.00'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            donation.payment_status = 'refunded'
+            donation.save()
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.current_amount, Decimal('0.00'))
+        self.assertEqual(
+            list(donation.ledger_entries.values_list('kind', 'amount')),
+            [('credit', Decimal('30.00')), ('debit', Decimal('-30.00'))],
+        )
+
+    def test_entries_are_append_only(self):
+        Donation.objects.create(campaign=self.campaign, amount=Decimal('5.00'), payment_status='completed')
+        entry = DonationLedgerEntry.objects.get()
+        with self.assertRaises(NotSupportedError):
+            entry.save()
+        with self.assertRaises(NotSupportedError):
+            entry.delete()
+        with self.assertRaises(NotSupportedError):
+            DonationLedgerEntry.objects.update(amount=0)
+
+    def test_point_in_time_total(self):
+        seven_pm = timezone.now().replace(hour=19, minute=0, second=0, microsecond=0)
+        for minutes, amount in ((-30, '10.00'), (-5, '15.00'), (10, '100.00')):
+            DonationLedgerEntry.objects.create(
+                campaign=self.campaign, kind='credit', amount=Decimal(amount),
+                created_at=seven_pm + datetime.timedelta(minutes=minutes),
+            )
+        self.assertEqual(ledger.total_at(self.campaign.pk, seven_pm), Decimal('25.00'))
+
+    def test_adjust_to_sets_ledger_total(self):
+        Donation.objects.create(campaign=self.campaign, amount=Decimal('40.00'), payment_status='completed')
+        self.assertEqual(ledger.adjust_to(self.campaign.pk, Decimal('0.00')), Decimal('-40.00'))
+        ledger.fold([self.campaign.pk])
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.current_amount, Decimal('0.00'))
+
+
+class CampaignCounterTests(TestCase):
+    def setUp(self):
+        self.campaign = Campaign.objects.create(title='Test', description='Test', goal_amount=Decimal('1000.00'))
+
+    def test_increments_spread_over_slots(self):
+        with self.settings(CAMPAIGN_COUNTER_SHARDS=4):
+            for _ in range(40):
+                counters.increment(self.campaign.pk, Decimal('2.50'))
+        slots = dict(self.campaign.counter_shards.values_list('slot', 'amount'))
+        self.assertEqual(sorted(slots), [0, 1, 2, 3])
+        self.assertGreater(sum(1 for amount in slots.values() if amount), 1)
+        self.assertEqual(counters.total(self.campaign.pk), Decimal('100.00'))
+
+    def test_fold_reads_slots_and_rebuild_collapses_them(self):
+        Donation.objects.create(campaign=self.campaign, amount=Decimal('12.00'), payment_status='completed')
+        Donation.objects.create(campaign=self.campaign, amount=Decimal('8.00'), payment_status='completed')
+        ledger.fold([self.campaign.pk])
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.current_amount, Decimal('20.00'))
+
+        counters.rebuild(self.campaign.pk, Decimal('5.00'))
+        self.assertEqual(
+            list(self.campaign.counter_shards.exclude(amount=0).values_list('slot', 'amount')),
+            [(0, Decimal('5.00'))],
+        )
+
+    def test_campaign_delete_takes_ledger_and_donations(self):
+        Donation.objects.create(campaign=self.campaign, amount=Decimal('12.00'), payment_status='completed')
+        self.campaign.delete()
+        self.assertFalse(DonationLedgerEntry.objects.exists())
+
+
+class PendingDonationSweeperTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.campaign = Campaign.objects.create(title='Test', description='Test', goal_amount=Decimal('1000.00'))
+        self.fake_stripe = FakeStripe()
+
+    def checkout(self, age=datetime.timedelta(days=2)):
+        with self.fake_stripe.patch_sdk():
+            response = self.client.post(
+                reverse('donations:create-donation'), {'donation_amount': '20.00'}, content_type='application/json',
+            )
+        session_id = response.json()['checkout_url'].rsplit('/', 1)[-1]
+        donation = Donation.objects.get(stripe_session_id=session_id)
+        Donation.objects.filter(pk=donation.pk).update(created_at=timezone.now() - age)
+        self.fake_stripe.sessions[session_id]['created'] = int((timezone.now() - age).timestamp())
+        return session_id
+
+    def status(self, session_id):
+        return Donation.objects.get(stripe_session_id=session_id).payment_status
+
+    def test_sweep_settles_expires_and_fails(self):
+        paid, expired, still_open = self.checkout(), self.checkout(), self.checkout()
+        recent = self.checkout(age=datetime.timedelta(hours=1))
+        self.fake_stripe.complete_session(paid)
+        self.fake_stripe.expire_session(expired)
+        self.fake_stripe.expire_session(recent)
+        no_session = Donation.objects.create(campaign=self.campaign, amount=Decimal('5.00'))
+        Donation.objects.filter(pk=no_session.pk).update(created_at=timezone.now() - datetime.timedelta(days=3))
+
+        with self.fake_stripe.patch_sdk(), self.captureOnCommitCallbacks(execute=True):
+            result = sweep_pending_donations(batch_size=2)
+
+        self.assertEqual((result.checked, result.settled, result.expired, result.failed, result.still_open),
+                         (4, 1, 1, 1, 1))
+        self.assertEqual(self.status(paid), 'completed')
+        self.assertEqual(self.status(expired), 'expired')
+        self.assertEqual(self.status(still_open), 'pending')
+        self.assertEqual(self.status(recent), 'pending')
+        self.assertEqual(Donation.objects.get(pk=no_session.pk).payment_status, 'failed')
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.current_amount, Decimal('20.00'))
+
+    def test_delete_policy_removes_swept_rows(self):
+        expired = self.checkout()
+        self.fake_stripe.expire_session(expired)
+        with self.fake_stripe.patch_sdk():
+            result = sweep_pending_donations(policy='delete')
+        self.assertEqual(result.deleted, 1)
+        self.assertFalse(Donation.objects.filter(stripe_session_id=expired).exists())
+
+
+class RetentionTests(TestCase):
+    def setUp(self):
+        from emails.models import EmailLog
+
+        self.EmailLog = EmailLog
+        self.campaign = Campaign.objects.create(title='Test', description='Test', goal_amount=Decimal('1000.00'))
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+        settings_override = override_settings(RETENTION_ARCHIVE_DIR=self.archive_dir, RETENTION_DAYS={
+            'emails.EmailLog': 30, 'django_celery_results.TaskResult': 7, 'donations.Donation': 30,
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def email(self, donation, was_sent=True, age=datetime.timedelta(days=60)):
+        log = self.EmailLog.objects.create(
+            recipient_email='donor@example.com', subject='Thanks', donation=donation, was_sent=was_sent,
+        )
+        self.EmailLog.objects.filter(pk=log.pk).update(created_at=timezone.now() - age)
+        return log
+
+    def policy(self, label):
+        return next(policy for policy in retention.POLICIES if policy.label == label)
+
+    def test_email_logs_archived_except_latest_sent_per_donation(self):
+        donation = Donation.objects.create(campaign=self.campaign, amount=Decimal('10.00'))
+        old_sent, latest_sent = self.email(donation), self.email(donation)
+        failed = self.email(donation, was_sent=False)
+        recent = self.email(None, age=datetime.timedelta(days=1))
+
+        report = retention.report(self.policy('emails.EmailLog'))
+        self.assertEqual((report.rows, report.kept), (2, 1))
+        self.assertGreater(report.estimated_bytes, 0)
+        self.assertEqual(self.EmailLog.objects.count(), 4)
+
+        result = retention.apply(self.policy('emails.EmailLog'), chunk_size=1)
+        self.assertEqual(result.rows, 2)
+        self.assertEqual(set(self.EmailLog.objects.values_list('pk', flat=True)), {latest_sent.pk, recent.pk})
+        # One complete file per chunk
+        parts = sorted(os.listdir(result.archive))
+        self.assertEqual(parts, ['part-00000.jsonl.gz', 'part-00001.jsonl.gz'])
+        archived = []
+        for part in parts:
+            with gzip.open(os.path.join(result.archive, part), 'rt') as archive:
+                archived += [json.loads(line) for line in archive]
+        self.assertEqual([row['id'] for row in archived], [old_sent.pk, failed.pk])
+        self.assertEqual(archived[0]['donation_id'], donation.pk)
+
+    def test_task_results_and_abandoned_donations(self):
+        from django_celery_results.models import TaskResult
+
+        old = TaskResult.objects.create(task_id='old', status='SUCCESS')
+        TaskResult.objects.filter(pk=old.pk).update(date_done=timezone.now() - datetime.timedelta(days=8))
+        TaskResult.objects.create(task_id='new', status='SUCCESS')
+        expired = Donation.objects.create(campaign=self.campaign, amount=Decimal('5.00'), payment_status='expired')
+        pending = Donation.objects.create(campaign=self.campaign, amount=Decimal('5.00'))
+        # Completed then marked failed: its ledger entry keeps it online
+        settled = Donation.objects.create(campaign=self.campaign, amount=Decimal('5.00'), payment_status='completed')
+        settled.payment_status = 'failed'
+        settled.save()
+        Donation.objects.update(updated_at=timezone.now() - datetime.timedelta(days=60))
+
+        out = io.StringIO()
+        call_command('apply_retention', stdout=out)
+
+        self.assertEqual(list(TaskResult.objects.values_list('task_id', flat=True)), ['new'])
+        self.assertEqual(set(Donation.objects.values_list('pk', flat=True)), {pending.pk, settled.pk})
+        self.assertFalse(Donation.objects.filter(pk=expired.pk).exists())
+        self.assertIn('django_celery_results.TaskResult: archived and deleted 1 row(s)', out.getvalue())
+
+    def test_dry_run_deletes_nothing(self):
+        self.email(None)
+        out = io.StringIO()
+        call_command('apply_retention', '--dry-run', '--policy', 'emails.EmailLog', stdout=out)
+        self.assertIn('emails.EmailLog: 1 row(s) older than 30 day(s)', out.getvalue())
+        self.assertEqual(self.EmailLog.objects.count(), 1)
+        self.assertEqual(os.listdir(self.archive_dir), [])
+
+    def test_nothing_deleted_without_archive_dir(self):
+        self.email(None)
+        with override_settings(RETENTION_ARCHIVE_DIR=''):
+            with self.assertRaises(ImproperlyConfigured):
+                retention.apply(self.policy('emails.EmailLog'))
+            with self.assertRaises(CommandError):
+                call_command('apply_retention', stdout=io.StringIO())
+            self.assertEqual(retention.apply_retention(), {})
+            out = io.StringIO()
+            call_command('apply_retention', '--dry-run', stdout=out)
+        self.assertIn('emails.EmailLog: 1 row(s)', out.getvalue())
+        self.assertEqual(self.EmailLog.objects.count(), 1)
+
+    def test_parquet_archive(self):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            self.skipTest('pyarrow not installed')
+        self.email(None)
+        self.email(None)
+        result = retention.apply(self.policy('emails.EmailLog'), archive_format='parquet', chunk_size=1)
+        self.assertEqual(len(os.listdir(result.archive)), 2)
+        table = pq.read_table(result.archive)
+        self.assertEqual(table.num_rows, 2)
+        self.assertEqual(table.column('subject').to_pylist(), ['Thanks', 'Thanks'])
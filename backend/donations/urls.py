@@ -11,4 +11,5 @@ urlpatterns = [
     path('stripe/webhook/', views.stripe_webhook, name='stripe-webhook'),
     path('success/', views.payment_success, name='payment-success'),
     path('cancel/', views.payment_cancel, name='payment-cancel'),
+    path('export/', views.export_donations, name='export-donations'),
 ]
\ No newline at end of file
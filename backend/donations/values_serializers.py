@@ -0,0 +1,102 @@
+"""
+Read-only serializers for the public GET endpoints.
+
+They read ``.values()`` rows instead of model instances and reuse the field
+representations of the matching ModelSerializer, built once per class, so the
+output is identical without per-request field introspection or per-row
+attribute lookups.
+"""
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+
+from .models import progress_percentage
+from .serializers import CampaignSerializer, DonationSerializer, CampaignUpdateFeedSerializer
+
+
+class ValuesSerializer:
+    """
+    Subclasses set ``model_serializer_class`` and map any field that isn't a
+    plain column (properties, method fields) in ``computed_fields`` to a
+    function of the row. ``extra_columns`` lists columns those functions need
+    beyond the serializer's own fields.
+    """
+    model_serializer_class = None
+    computed_fields = {}
+    extra_columns = ()
+
+    @classmethod
+    def field_map(cls):
+        """[(name, source column, to_representation or computed fn, is_computed)]"""
+        if '_field_map' not in cls.__dict__:
+            field_map = []
+            for name, field in cls.model_serializer_class().fields.items():
+                if name in cls.computed_fields:
+                    field_map.append((name, None, cls.computed_fields[name], True))
+                else:
+                    field_map.append((name, field.source, field.to_representation, False))
+            cls._field_map = field_map
+            columns = [source for _, source, _, is_computed in field_map if not is_computed]
+            cls._columns = columns + [c for c in cls.extra_columns if c not in columns]
+        return cls._field_map
+
+    @classmethod
+    def columns(cls):
+        cls.field_map()
+        return cls._columns
+
+    @classmethod
+    def prepare(cls, queryset):
+        """Hook for annotations the computed fields read"""
+        return queryset
+
+    @classmethod
+    def values(cls, queryset):
+        queryset = cls.prepare(queryset)
+        annotations = list(queryset.query.annotations)
+        return queryset.values(*cls.columns(), *annotations)
+
+    @classmethod
+    def to_representation(cls, row):
+        data = {}
+        for name, source, represent, is_computed in cls.field_map():
+            if is_computed:
+                data[name] = represent(row)
+            else:
+                value = row[source]
+                data[name] = None if value is None else represent(value)
+        return data
+
+    @classmethod
+    def serialize_many(cls, queryset):
+        return [cls.to_representation(row) for row in cls.values(queryset)]
+
+    @classmethod
+    def serialize_one(cls, queryset):
+        row = cls.values(queryset).first()
+        return None if row is None else cls.to_representation(row)
+
+
+class CampaignValuesSerializer(ValuesSerializer):
+    model_serializer_class = CampaignSerializer
+    computed_fields = {
+        'progress_percentage': lambda row: progress_percentage(row['current_amount'], row['goal_amount']),
+        'tickets_sold': lambda row: row['tickets_sold'],
+    }
+
+    @classmethod
+    def prepare(cls, queryset):
+        return queryset.annotate(tickets_sold=Coalesce(
+            Sum('donations__ticket_quantity', filter=Q(donations__payment_status='completed')), 0
+        ))
+
+
+class DonationValuesSerializer(ValuesSerializer):
+    model_serializer_class = DonationSerializer
+
+
+class CampaignUpdateFeedValuesSerializer(ValuesSerializer):
+    model_serializer_class = CampaignUpdateFeedSerializer
+    computed_fields = {
+        'has_video': lambda row: bool(row['video_url'] or row['video_embed_code']),
+    }
+    extra_columns = ('video_embed_code',)
@@ -3,24 +3,32 @@ from decimal import Decimal
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
-from rest_framework.throttling import AnonRateThrottle
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.views import APIView
 from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
-import stripe
 import logging
 
-from .models import Campaign, Donation, CampaignUpdate
-from .serializers import CampaignSerializer, DonationSerializer, CampaignUpdateSerializer, CreateDonationSerializer
+from django_project import metrics
+from django_project.db_routers import replica_reads
+from django_project.sdk import stripe
+from django_project.throttling import SlidingWindowAnonRateThrottle
+
+from .exports import CONTENT_TYPES, EXPORT_FORMATS, STREAMERS, export_queryset, parquet_available, parse_filters
+from .feeds import get_updates_feed_page
+from .models import Campaign, Donation
+from .serializers import CampaignSerializer, DonationSerializer, CreateDonationSerializer
+from .values_serializers import CampaignValuesSerializer, DonationValuesSerializer
 
 logger = logging.getLogger(__name__)
-stripe.api_key = settings.STRIPE_SECRET_KEY
 
 TICKET_PRICE_CENTS = 5000  # $50.00
 TICKET_PRICE = Decimal('50.00')
 
 
-class DonationCreateThrottle(AnonRateThrottle):
+class DonationCreateThrottle(SlidingWindowAnonRateThrottle):
     rate = '10/minute'
 
 
@@ -31,6 +39,13 @@ class CurrentCampaignView(generics.RetrieveAPIView):
     def get_object(self):
         return Campaign.objects.filter(is_active=True).first()
 
+    @replica_reads()
+    def retrieve(self, request, *args, **kwargs):
+        data = CampaignValuesSerializer.serialize_one(Campaign.objects.filter(is_active=True))
+        if data is None:
+            return super().retrieve(request, *args, **kwargs)
+        return Response(data)
+
 
 class RecentDonationsView(generics.ListAPIView):
     serializer_class = DonationSerializer
@@ -42,14 +57,25 @@ class RecentDonationsView(generics.ListAPIView):
             is_anonymous=False
         ).order_by('-created_at')[:10]
 
+    @replica_reads()
+    def list(self, request, *args, **kwargs):
+        return Response(DonationValuesSerializer.serialize_many(self.get_queryset()))
+
 
-class CampaignUpdatesView(generics.ListAPIView):
-    serializer_class = CampaignUpdateSerializer
+class CampaignUpdatesView(APIView):
+    """Paginated updates feed, served from a pre-rendered cached document"""
     permission_classes = [AllowAny]
 
-    def get_queryset(self):
-        campaign = Campaign.objects.filter(is_active=True).first()
-        return campaign.updates.all() if campaign else CampaignUpdate.objects.none()
+    @replica_reads()
+    def get(self, request):
+        try:
+            page = max(1, int(request.query_params.get('page', 1)))
+        except ValueError:
+            page = 1
+        body = get_updates_feed_page(page)
+        if body is None:
+            return Response({'detail': 'Invalid page.'}, status=status.HTTP_404_NOT_FOUND)
+        return HttpResponse(body, content_type='application/json')
 
 
 @api_view(['POST'])
@@ -79,7 +105,7 @@ def create_donation(request):
             donor_email=data.get('donor_email', ''),
             message=data.get('message', ''),
             is_anonymous=data.get('is_anonymous', False),
-            stripe_session_id='',
+            stripe_session_id=None,
             payment_status='pending'
         )
 
@@ -150,6 +176,7 @@ def stripe_webhook(request):
         return Response({'error': 'Invalid signature'}, status=400)
 
     logger.info(f"Webhook received: {event['type']}")
+    metrics.record_webhook_lag(event)
 
     if event['type'] == 'checkout.session.completed':
         session = event['data']['object']
@@ -210,3 +237,30 @@ def payment_success(request):
 @permission_classes([AllowAny])
 def payment_cancel(request):
     return Response({'status': 'cancelled', 'message': 'Payment was cancelled'})
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def export_donations(request):
+    """Staff-only streaming export: ?file_format=csv|parquet&campaign=<id>&start=YYYY-MM-DD&end=YYYY-MM-DD"""
+    # Not "format": DRF reserves that query parameter for renderer negotiation
+    file_format = request.query_params.get('file_format', 'csv')
+    if file_format not in EXPORT_FORMATS:
+        return Response({'error': f"file_format must be one of {', '.join(EXPORT_FORMATS)}"}, status=400)
+    if file_format == 'parquet' and not parquet_available():
+        return Response({'error': 'Parquet export needs pyarrow installed'}, status=400)
+    try:
+        filters = parse_filters(
+            request.query_params.get('campaign'),
+            request.query_params.get('start'),
+            request.query_params.get('end'),
+        )
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+
+    response = StreamingHttpResponse(
+        STREAMERS[file_format](export_queryset(**filters)), content_type=CONTENT_TYPES[file_format]
+    )
+    filename = f"donations-{timezone.localdate():%Y%m%d}.{file_format}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
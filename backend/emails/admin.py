@@ -1,4 +1,7 @@
 from django.contrib import admin
+
+from django_project.admin_performance import ScalableAdminMixin
+
 from .models import EmailTemplate, EmailLog
 
 @admin.register(EmailTemplate)
@@ -6,10 +9,13 @@ class EmailTemplateAdmin(admin.ModelAdmin):
     list_display = ['name', 'subject', 'is_active']
 
 @admin.register(EmailLog)
-class EmailLogAdmin(admin.ModelAdmin):
-    list_display = ['recipient_email', 'subject', 'was_sent', 'sent_at']
+class EmailLogAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ['recipient_email', 'subject', 'donation', 'was_sent', 'sent_at']
+    list_select_related = ['donation']
     readonly_fields = ['sent_at']
     list_filter = ['was_sent']
+    date_hierarchy = 'created_at'
+    raw_id_fields = ['donation', 'campaign_update']
     
     def has_add_permission(self, request):
-        return False  # Emails created automatically, not manually
\ No newline at end of file
+        return False  # Emails created automatically, not manually
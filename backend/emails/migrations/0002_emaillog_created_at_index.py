@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 12:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("donations", "0007_donation_admin_indexes"),
+        ("emails", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="emaillog",
+            index=models.Index(fields=["created_at"], name="emaillog_created_at_idx"),
+        ),
+    ]
@@ -35,6 +35,11 @@ class EmailLog(models.Model):
     was_sent = models.BooleanField(default=False)
     sent_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='emaillog_created_at_idx'),
+        ]
     
     def __str__(self):
         return f"{self.subject} → {self.recipient_email}"
\ No newline at end of file
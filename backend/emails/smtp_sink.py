@@ -0,0 +1,102 @@
+"""
+Minimal local SMTP server that accepts and counts every message.
+
+Used by the load tests so email tasks exercise Django's real SMTP backend
+without sending anything. Can also be run standalone:
+
+    python -m emails.smtp_sink --port 1025
+"""
+import argparse
+import socketserver
+import threading
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.reply("220 localhost SMTP sink ready")
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors='replace').strip()
+            verb = command[:4].upper()
+
+            if verb == 'EHLO':
+                self.reply("250-localhost")
+                self.reply("250 8BITMIME")
+            elif verb == 'HELO':
+                self.reply("250 localhost")
+            elif verb == 'MAIL':
+                recipients = []
+                self.reply("250 OK")
+            elif verb == 'RCPT':
+                recipients.append(command[8:].strip(' <>'))
+                self.reply("250 OK")
+            elif verb == 'DATA':
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                size = 0
+                for data_line in iter(self.rfile.readline, b''):
+                    if data_line in (b'.\r\n', b'.\n'):
+                        break
+                    size += len(data_line)
+                self.server.record(recipients, size)
+                self.reply("250 OK: queued")
+            elif verb == 'RSET':
+                recipients = []
+                self.reply("250 OK")
+            elif verb == 'NOOP':
+                self.reply("250 OK")
+            elif verb == 'QUIT':
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0):
+        super().__init__((host, port), SMTPSinkHandler)
+        self.lock = threading.Lock()
+        self.message_count = 0
+        self.recipient_count = 0
+        self.total_bytes = 0
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def record(self, recipients, size):
+        with self.lock:
+            self.message_count += 1
+            self.recipient_count += len(recipients)
+            self.total_bytes += size
+
+    def start(self):
+        """Serve on a background thread and return self"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=1025)
+    args = parser.parse_args()
+
+    sink = SMTPSink(args.host, args.port)
+    print(f"SMTP sink listening on {args.host}:{sink.port}")
+    try:
+        sink.serve_forever()
+    except KeyboardInterrupt:
+        print(f"Received {sink.message_count} message(s)")
@@ -5,6 +5,8 @@ from django.utils.html import escape
 from django.core.mail import send_mail
 import logging
 
+from django_project import metrics
+
 from .models import EmailTemplate, EmailLog
 from donations.models import Donation
 
@@ -12,8 +14,8 @@ logger = logging.getLogger(__name__)
 
 
 @shared_task
-def send_thank_you_email(donation_id):
-    """Send thank you email after successful donation"""
+def send_thank_you_email(donation_id, force=False):
+    """Send thank you email after successful donation (force: resend even if already sent)"""
     try:
         donation = Donation.objects.get(id=donation_id)
 
@@ -22,7 +24,7 @@ def send_thank_you_email(donation_id):
             return f"Skipped email for donation {donation_id} (anonymous or no email)"
 
         # Check if email already sent
-        if EmailLog.objects.filter(donation=donation, was_sent=True).exists():
+        if not force and EmailLog.objects.filter(donation=donation, was_sent=True).exists():
             return f"Email already sent for donation {donation_id}"
 
         # Get email template
@@ -111,10 +113,12 @@ def send_thank_you_email(donation_id):
                 sent_at=timezone.now()
             )
 
+            metrics.record_email('thank_you', sent=True)
             logger.info(f"Thank you email sent for donation {donation_id}")
             return f"Email sent to {donation.donor_email}"
 
         except Exception as email_error:
+            metrics.record_email('thank_you', sent=False)
             logger.error(f"Email sending failed for donation {donation_id}: {email_error}")
 
             EmailLog.objects.create(
@@ -193,6 +197,7 @@ def send_donation_notification(donation_id):
             fail_silently=False,
         )
 
+        metrics.record_email('owner_notification', sent=True)
         logger.info(f"Donation notification sent for donation {donation_id}")
         return f"Notification sent for donation {donation_id}"
 
@@ -200,6 +205,7 @@ def send_donation_notification(donation_id):
         logger.error(f"Donation {donation_id} not found for notification")
         return f"Donation {donation_id} not found"
     except Exception as e:
+        metrics.record_email('owner_notification', sent=False)
         logger.error(f"Donation notification failed for {donation_id}: {e}")
         return f"Notification failed: {str(e)}"
 
@@ -1,3 +1,38 @@
-from django.test import TestCase
+import smtplib
+from decimal import Decimal
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase
+from prometheus_client import REGISTRY
+
+from donations.models import Campaign, Donation
+
+from .smtp_sink import SMTPSink
+from .tasks import send_donation_notification
+
+
+class SMTPSinkTests(SimpleTestCase):
+    def test_accepts_and_counts_messages(self):
+        sink = SMTPSink().start()
+        try:
+            with smtplib.SMTP('127.0.0.1', sink.port) as smtp:
+                smtp.sendmail('from@example.com', ['a@example.com', 'b@example.com'], 'Subject: hi\r\n\r\nbody')
+        finally:
+            sink.stop()
+        self.assertEqual(sink.message_count, 1)
+        self.assertEqual(sink.recipient_count, 2)
+
+
+class EmailMetricsTests(TestCase):
+    def test_send_and_task_duration_recorded(self):
+        campaign = Campaign.objects.create(title='Test', description='Test', goal_amount=Decimal('1000.00'))
+        donation = Donation.objects.create(campaign=campaign, amount=Decimal('10.00'))
+        sent = {'kind': 'owner_notification', 'result': 'success'}
+        timed = {'task': 'emails.tasks.send_donation_notification', 'state': 'SUCCESS'}
+        sent_before = REGISTRY.get_sample_value('emails_sent_total', sent) or 0
+        timed_before = REGISTRY.get_sample_value('celery_task_duration_seconds_count', timed) or 0
+
+        with self.settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
+            send_donation_notification.delay(donation.id)
+
+        self.assertEqual(REGISTRY.get_sample_value('emails_sent_total', sent), sent_before + 1)
+        self.assertEqual(REGISTRY.get_sample_value('celery_task_duration_seconds_count', timed), timed_before + 1)
@@ -0,0 +1,96 @@
+# gunicorn.conf.py
+"""
+Gunicorn settings, all overridable from the environment.
+
+The app is imported once in the master (preload) and the heap is frozen
+with gc.freeze() before forking, so workers share those pages copy-on-write
+instead of each importing Django and every app. GUNICORN_WORKLOAD picks the
+worker model:
+
+    io     gthread workers: requests wait on Stripe/Postgres/Redis (default)
+    cpu    sync workers, one request per process
+    async  uvicorn workers on the ASGI app (requires `pip install uvicorn`;
+           only pays off once views are async)
+
+Workers are recycled after max_requests (+ jitter, so they don't all
+restart together) to cap slow memory growth.
+"""
+import gc
+import multiprocessing
+import os
+import shutil
+
+
+def _env_bool(name, default):
+    return os.environ.get(name, str(default)).lower() in ('1', 'true', 'yes', 'on')
+
+
+cpus = multiprocessing.cpu_count()
+workload = os.environ.get('GUNICORN_WORKLOAD', 'io')
+
+WORKLOADS = {
+    'io': {'worker_class': 'gthread', 'workers': cpus + 1, 'threads': 4},
+    'cpu': {'worker_class': 'sync', 'workers': cpus * 2 + 1, 'threads': 1},
+    'async': {'worker_class': 'uvicorn.workers.UvicornWorker', 'workers': cpus + 1, 'threads': 1},
+}
+if workload not in WORKLOADS:
+    raise ValueError(f"GUNICORN_WORKLOAD must be one of {', '.join(WORKLOADS)}, not {workload!r}")
+profile = WORKLOADS[workload]
+
+wsgi_app = 'django_project.asgi:application' if workload == 'async' else 'django_project.wsgi:application'
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', profile['worker_class'])
+workers = int(os.environ.get('GUNICORN_WORKERS', profile['workers']))
+threads = int(os.environ.get('GUNICORN_THREADS', profile['threads']))
+
+preload_app = _env_bool('GUNICORN_PRELOAD', True)
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+accesslog = os.environ.get('GUNICORN_ACCESSLOG') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOGLEVEL', 'info')
+
+# Samples left by a previous run's workers would be aggregated forever. This
+# runs when the config is read, before the preloaded app creates its own.
+_multiproc_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+if _multiproc_dir:
+    shutil.rmtree(_multiproc_dir, ignore_errors=True)
+    os.makedirs(_multiproc_dir, exist_ok=True)
+
+if preload_app:
+    # No collections while importing: the objects all end up frozen anyway,
+    # and a collection would only touch (and un-share) pages for nothing
+    gc.disable()
+
+
+def when_ready(server):
+    if preload_app:
+        # Anything the import opened must not be shared with the children,
+        # including a psycopg pool (DB_POOL_MODE=native)
+        from django.db import connections
+        connections.close_all()
+        for connection in connections.all(initialized_only=True):
+            if hasattr(connection, 'close_pool'):
+                connection.close_pool()
+        gc.freeze()
+        server.log.info(f"Preloaded app; froze {gc.get_freeze_count()} objects before forking")
+
+    # Unauthenticated metrics for an internal scraper, aggregated across workers
+    metrics_port = os.environ.get('APP_METRICS_PORT')
+    if metrics_port and _multiproc_dir:
+        from django_project.metrics import serve_app_metrics
+        serve_app_metrics(int(metrics_port))
+
+
+def post_fork(server, worker):
+    gc.enable()
+
+
+def child_exit(server, worker):
+    if _multiproc_dir:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
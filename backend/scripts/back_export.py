@@ -5,9 +5,10 @@ Creates a clean snapshot of the donation platform code for debugging and develop
 """
 
 import os
-from pathlib import Path
 from datetime import datetime
 
+from snapshot import build_snapshot, walk
+
 # Focus on donation platform directories
 INCLUDE_DIRS = [
     "donations",     # Main donations app
@@ -75,6 +76,25 @@ def should_include_file(file_path, filename):
         return False
     return any(file_path.endswith(ext) for ext in INCLUDE_EXTENSIONS)
 
+# Snapshot sections, in output order
+CATEGORIES = [
+    ('config', 'CONFIGURATION FILES'),
+    ('python', 'PYTHON CODE'),
+    ('templates', 'HTML TEMPLATES'),
+    ('data', 'DATA & CONFIG FILES'),
+    ('assets', 'FRONTEND ASSETS')
+]
+
+# Code fence language by extension
+FENCES = [
+    ('.py', 'python'),
+    (('.yml', '.yaml'), 'yaml'),
+    ('.html', 'html'),
+    ('.js', 'javascript'),
+    ('.css', 'css'),
+    ('.json', 'json')
+]
+
 def get_file_category(file_path):
     """Categorize files for better organization"""
     if file_path.endswith(('.txt', '.yml', '.yaml', '.toml', '.env.example')):
@@ -90,127 +110,87 @@ def get_file_category(file_path):
     else:
         return 'python'
 
+def skip_reason(path, content):
+    """Empty and oversized files stay out of the snapshot"""
+    if len(content.strip()) == 0:
+        return "empty file"
+    if len(content) > 50000:  # Skip files over 50KB
+        return f"large file ({len(content)} chars)"
+    return None
+
 def collect_files():
-    """Collect all essential files for the donation platform"""
+    """Collect (path, stat) for all essential files of the donation platform"""
     collected = []
     
     print("🔍 Scanning donation platform directories...")
     
-    # Collect from specific directories
+    # Collect from specific directories (excluded directories are never entered)
     for base_dir in INCLUDE_DIRS:
         if not os.path.exists(base_dir):
             print(f"⚠️  Directory {base_dir} does not exist, skipping...")
             continue
             
         print(f"📁 Scanning {base_dir}/...")
-        for root, dirs, files in os.walk(base_dir):
-            # Filter out excluded directories
-            dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
-            
-            for file in files:
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(full_path)
-                
-                if should_include_file(full_path, file):
-                    try:
-                        with open(full_path, "r", encoding="utf-8", errors="ignore") as f:
-                            content = f.read()
-                        
-                        # Skip empty files or files that are too large
-                        if len(content.strip()) == 0:
-                            print(f"⏭️  Skipping empty file: {rel_path}")
-                            continue
-                        if len(content) > 50000:  # Skip files over 50KB
-                            print(f"⏭️  Skipping large file: {rel_path} ({len(content)} chars)")
-                            continue
-                            
-                        collected.append((rel_path, content))
-                        print(f"✅ Included: {rel_path}")
-                    except Exception as e:
-                        print(f"❌ Error reading {rel_path}: {e}")
+        for rel_path, stat in walk(base_dir, EXCLUDE_DIRS):
+            if should_include_file(rel_path, os.path.basename(rel_path)):
+                collected.append((rel_path, stat))
 
     # Add essential root files
     print("📄 Adding root configuration files...")
     for file in ROOT_FILES:
         if os.path.exists(file):
-            try:
-                with open(file, "r", encoding="utf-8", errors="ignore") as f:
-                    content = f.read()
-                collected.append((file, content))
-                print(f"✅ Included: {file}")
-            except Exception as e:
-                print(f"❌ Error reading {file}: {e}")
+            collected.append((file, os.stat(file)))
 
     return collected
 
+def render_file(path, code):
+    """One file's block, fenced by language"""
+    for extensions, language in FENCES:
+        if path.endswith(extensions):
+            return f"\n# ==== {path} ====\n\n```{language}\n{code}\n```\n"
+    return f"\n# ==== {path} ====\n\n```\n{code}\n```\n"
+
+def render_header(result):
+    return (
+        "# MATT FREEDOM FUNDRAISER V2 - CODE SNAPSHOT\n"
+        "# Generated for donation platform development and debugging\n"
+        f"# Created: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"  # Still show when it was created
+        f"# Total files: {len(result.files)}\n"
+        "# Focus: Donation platform, emails, profiles, authentication\n\n"
+    )
+
 def write_snapshot(files):
-    """Write the clean snapshot with better organization"""
+    """Stream the snapshot to disk, re-reading only files changed since the last run"""
     # 🔥 FIXED: Use static filename instead of timestamp
-    os.makedirs("scripts", exist_ok=True)
     output_path = "scripts/donation_platform_snapshot.txt"  # Always the same filename
-    
-    # Organize files by category
-    categorized = {
-        'config': [],
-        'python': [],
-        'templates': [],
-        'assets': [],
-        'data': []
-    }
-    
-    for path, code in files:
-        category = get_file_category(path)
-        categorized[category].append((path, code))
-    
-    with open(output_path, "w", encoding="utf-8") as out:
-        out.write("# MATT FREEDOM FUNDRAISER V2 - CODE SNAPSHOT\n")
-        out.write("# Generated for donation platform development and debugging\n")
-        out.write(f"# Created: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")  # Still show when it was created
-        out.write(f"# Total files: {len(files)}\n")
-        out.write("# Focus: Donation platform, emails, profiles, authentication\n\n")
-        
-        # Write each category
-        categories = [
-            ('config', 'CONFIGURATION FILES'),
-            ('python', 'PYTHON CODE'),
-            ('templates', 'HTML TEMPLATES'),
-            ('data', 'DATA & CONFIG FILES'),
-            ('assets', 'FRONTEND ASSETS')
-        ]
-        
-        for cat_key, cat_title in categories:
-            if categorized[cat_key]:
-                out.write(f"\n# ==================== {cat_title} ====================\n\n")
-                
-                for path, code in categorized[cat_key]:
-                    out.write(f"\n# ==== {path} ====\n\n")
-                    if path.endswith('.py'):
-                        out.write(f"```python\n{code}\n```\n")
-                    elif path.endswith(('.yml', '.yaml')):
-                        out.write(f"```yaml\n{code}\n```\n")
-                    elif path.endswith('.html'):
-                        out.write(f"```html\n{code}\n```\n")
-                    elif path.endswith('.js'):
-                        out.write(f"```javascript\n{code}\n```\n")
-                    elif path.endswith('.css'):
-                        out.write(f"```css\n{code}\n```\n")
-                    elif path.endswith('.json'):
-                        out.write(f"```json\n{code}\n```\n")
-                    else:
-                        out.write(f"```\n{code}\n```\n")
-    
-    return output_path
-
-def print_summary(files, output_path):
+    return build_snapshot(
+        output_path, files,
+        categorize=get_file_category,
+        sections=CATEGORIES,
+        render=render_file,
+        section_header=lambda title: f"\n# ==================== {title} ====================\n\n",
+        header=render_header,
+        skip=skip_reason,
+    )
+
+def print_summary(result):
     """Print a summary of what was included"""
+    files, output_path = result.files, result.output_path
+    for path, reason in result.skipped:
+        print(f"⏭️  Skipping {reason}: {path}")
+    
     file_count_by_type = {}
-    for path, _ in files:
+    for path in files:
         ext = os.path.splitext(path)[1] or 'config'
         file_count_by_type[ext] = file_count_by_type.get(ext, 0) + 1
     
     print(f"\n🎯 DONATION PLATFORM SNAPSHOT COMPLETE")
     print(f"📁 Output: {output_path}")
     print(f"📊 Total files: {len(files)}")
+    if result.unchanged:
+        print("♻️  No files changed since the last run, snapshot left as is")
+    else:
+        print(f"♻️  Re-read {result.read} changed file(s), reused {result.reused} from the last snapshot")
     print(f"\n📋 File breakdown:")
     for ext, count in sorted(file_count_by_type.items()):
         print(f"  • {ext}: {count} files")
@@ -235,8 +215,8 @@ def main():
         print("⚠️  No files found! Check your directory structure.")
         return
     
-    output_path = write_snapshot(collected_files)
-    print_summary(collected_files, output_path)
+    result = write_snapshot(collected_files)
+    print_summary(result)
     
     print(f"\n✅ Snapshot ready for debugging Matt's donation platform!")
     print(f"🔄 File will be overwritten on next run (no more duplicates!)")
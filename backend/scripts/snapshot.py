@@ -0,0 +1,233 @@
+"""
+Shared code snapshot builder used by back_export.py and front_export.py
+
+walk() prunes excluded directories before descending into them, so
+node_modules and friends are never listed. build_snapshot() reads files on
+a thread pool and streams their blocks straight to disk in section order.
+A cache next to the output (.<snapshot>.cache.json) keeps each file's
+mtime, size and content hash plus where its block sits in the previous
+snapshot: files whose mtime and size haven't moved are copied from there
+instead of being re-read, and if nothing changed the snapshot is left as is.
+Delete the cache file after changing how blocks are rendered.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+CACHE_VERSION = 1
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def walk(base_dir, exclude_dirs):
+    """Yield (path, stat) for every file under base_dir, skipping excluded directories entirely"""
+    pending = [base_dir]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            print(f"❌ Error scanning {directory}: {e}")
+            continue
+
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in exclude_dirs:
+                    subdirs.append(entry.path)
+            elif entry.is_file():
+                yield os.path.relpath(entry.path), entry.stat()
+        # Depth first, in name order, like os.walk
+        pending.extend(reversed(subdirs))
+
+
+def list_files(directory):
+    """(path, stat) for the files directly inside directory"""
+    try:
+        with os.scandir(directory) as it:
+            return [(os.path.relpath(entry.path), entry.stat())
+                    for entry in sorted(it, key=lambda entry: entry.name) if entry.is_file()]
+    except OSError as e:
+        print(f"❌ Error scanning {directory}: {e}")
+        return []
+
+
+@dataclass
+class SnapshotResult:
+    output_path: str
+    files: list = field(default_factory=list)      # included paths, in snapshot order
+    skipped: list = field(default_factory=list)    # (path, reason) from the skip hook
+    lines: int = 0
+    chars: int = 0
+    read: int = 0       # files re-read this run
+    reused: int = 0     # blocks copied from the previous snapshot
+    unchanged: bool = False
+
+
+def _cache_path(output_path):
+    directory, name = os.path.split(output_path)
+    return os.path.join(directory, f".{name}.cache.json")
+
+
+def _load_cache(output_path):
+    try:
+        with open(_cache_path(output_path), encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if cache.get("version") == CACHE_VERSION else {}
+
+
+def _previous_snapshot(output_path, cache):
+    """The previous snapshot, if it is still exactly what the cache describes"""
+    recorded = cache.get("output") or {}
+    try:
+        stat = os.stat(output_path)
+    except OSError:
+        return None
+    if (stat.st_size, stat.st_mtime_ns) != (recorded.get("size"), recorded.get("mtime_ns")):
+        return None
+    return recorded
+
+
+def _read(path, stat, render, skip):
+    """Read, hash and render one file (runs on the pool)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    text = data.decode("utf-8", errors="replace")
+    meta = {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "digest": hashlib.sha1(data).hexdigest(),
+        "lines": text.count("\n"),
+        "chars": len(text),
+        "skip": skip(path, text) if skip else None,
+    }
+    block = None if meta["skip"] else render(path, text).encode("utf-8")
+    return meta, block
+
+
+def _in_order(pool, jobs, window):
+    """Run jobs on the pool, yielding results in order with at most ``window`` in flight"""
+    in_flight = deque()
+    for job in jobs:
+        in_flight.append(pool.submit(*job) if job else None)
+        if len(in_flight) >= window:
+            future = in_flight.popleft()
+            yield future.result() if future else None
+    while in_flight:
+        future = in_flight.popleft()
+        yield future.result() if future else None
+
+
+def build_snapshot(output_path, candidates, *, categorize, sections, render, section_header, header,
+                   skip=None, workers=DEFAULT_WORKERS):
+    """
+    Write the snapshot of ``candidates`` ((path, stat) pairs) to output_path
+
+    categorize(path) picks the file's key in ``sections`` (key, title pairs,
+    in output order); render(path, text) and section_header(title) produce
+    the text written for a file and a section; header(result) produces the
+    preamble once totals are known; skip(path, text) may return a reason to
+    leave a file out.
+    """
+    order = {key: index for index, (key, _) in enumerate(sections)}
+    titles = dict(sections)
+    candidates = sorted(
+        ((categorize(path), path, stat) for path, stat in candidates), key=lambda item: order[item[0]],
+    )
+
+    cache = _load_cache(output_path)
+    cached_files = cache.get("files", {})
+    previous = _previous_snapshot(output_path, cache)
+
+    def cached(path, stat):
+        meta = cached_files.get(path)
+        if meta and (meta["mtime_ns"], meta["size"]) == (stat.st_mtime_ns, stat.st_size):
+            return meta
+        return None
+
+    result = SnapshotResult(output_path)
+    hits = [cached(path, stat) for _, path, stat in candidates]
+    if previous and all(hits) and [path for _, path, _ in candidates] == cache.get("paths"):
+        # Same files, none touched since the last run: nothing to write
+        for (_, path, _), meta in zip(candidates, hits):
+            if meta["skip"]:
+                result.skipped.append((path, meta["skip"]))
+            else:
+                result.files.append(path)
+                result.lines += meta["lines"]
+                result.chars += meta["chars"]
+        result.unchanged = True
+        return result
+
+    def job(path, stat, meta):
+        if meta and (meta["skip"] or (previous and "offset" in meta)):
+            return None
+        return (_read, path, stat, render, skip)
+
+    directory = os.path.dirname(output_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    new_files = {}
+    old_snapshot = open(output_path, "rb") if previous else None
+    body = tempfile.TemporaryFile(dir=directory)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            jobs = (job(path, stat, meta) for (_, path, stat), meta in zip(candidates, hits))
+            current_section = None
+            for (category, path, stat), meta, read in zip(candidates, hits, _in_order(pool, jobs, workers * 4)):
+                if read:
+                    meta, block = read
+                    result.read += 1
+                else:
+                    meta, block = dict(meta), None
+                if meta["skip"]:
+                    meta.pop("offset", None)
+                    meta.pop("length", None)
+                    new_files[path] = meta
+                    result.skipped.append((path, meta["skip"]))
+                    continue
+
+                if category != current_section:
+                    current_section = category
+                    body.write(section_header(titles[category]).encode("utf-8"))
+                offset = body.tell()
+                if block is None:
+                    old_snapshot.seek(previous["body_offset"] + meta["offset"])
+                    block = old_snapshot.read(meta["length"])
+                    result.reused += 1
+                body.write(block)
+                meta.update(offset=offset, length=len(block))
+                new_files[path] = meta
+                result.files.append(path)
+                result.lines += meta["lines"]
+                result.chars += meta["chars"]
+
+        preamble = header(result).encode("utf-8")
+        # Swap the finished snapshot in atomically so an interrupted run keeps the old one
+        with tempfile.NamedTemporaryFile(dir=directory, delete=False) as out:
+            out.write(preamble)
+            body.seek(0)
+            shutil.copyfileobj(body, out)
+        os.chmod(out.name, 0o644)
+        os.replace(out.name, output_path)
+    finally:
+        body.close()
+        if old_snapshot:
+            old_snapshot.close()
+
+    stat = os.stat(output_path)
+    with open(_cache_path(output_path), "w", encoding="utf-8") as f:
+        json.dump({
+            "version": CACHE_VERSION,
+            "output": {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "body_offset": len(preamble)},
+            "paths": [path for _, path, _ in candidates],
+            "files": new_files,
+        }, f)
+    return result
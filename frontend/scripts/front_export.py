@@ -1,4 +1,9 @@
 import os
+import sys
+
+# The snapshot machinery is shared with the backend's back_export.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend", "scripts"))
+from snapshot import build_snapshot, list_files, walk  # noqa: E402
 
 # Auto-detect if we're in frontend directory or project root
 def detect_directories():
@@ -87,16 +92,8 @@ def should_include_file(file_path, filename):
         
     return any(file_path.endswith(ext) for ext in INCLUDE_EXTENSIONS)
 
-def get_file_size_mb(file_path):
-    """Get file size in MB"""
-    try:
-        size_bytes = os.path.getsize(file_path)
-        return size_bytes / (1024 * 1024)
-    except:
-        return 0
-
 def walk_and_collect(include_dirs):
-    """Walk through frontend directories and collect relevant files"""
+    """Collect (path, stat) for the relevant frontend files, never entering excluded directories"""
     collected = []
     found_important_src_files = []
     skipped_binary_files = []
@@ -109,70 +106,35 @@ def walk_and_collect(include_dirs):
             
         print(f"🔍 Scanning directory: {base_dir}")
         
-        # Handle root-level frontend files
-        if base_dir in [".", "frontend"]:
-            for file in os.listdir(base_dir):
-                file_path = os.path.join(base_dir, file)
-                if os.path.isfile(file_path):
-                    # 🔥 FIXED: Check for binary files and skip them
-                    if is_binary_file(file_path):
-                        skipped_binary_files.append(file)
-                        print(f"  🚫 Skipped binary file: {file}")
-                        continue
-                        
-                    # 🔥 FIXED: Check file size (skip huge files)
-                    file_size_mb = get_file_size_mb(file_path)
-                    if file_size_mb > 1:  # Skip files larger than 1MB
-                        large_files_skipped.append(f"{file} ({file_size_mb:.1f}MB)")
-                        print(f"  🚫 Skipped large file: {file} ({file_size_mb:.1f}MB)")
-                        continue
-                        
-                    if should_include_file(file_path, file):
-                        try:
-                            with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-                                content = f.read()
-                            collected.append((file_path, content))
-                            print(f"  ✅ Found root file: {file}")
-                        except Exception as e:
-                            print(f"❌ Error reading {file_path}: {e}")
-        else:
-            # Handle subdirectories
-            for root, dirs, files in os.walk(base_dir):
-                # Filter out excluded directories
-                dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
-                
-                for file in files:
-                    full_path = os.path.join(root, file)
-                    rel_path = os.path.relpath(full_path)
-                    
-                    # 🔥 FIXED: Skip binary files
-                    if is_binary_file(full_path):
-                        skipped_binary_files.append(rel_path)
-                        continue
-                    
-                    # 🔥 FIXED: Skip large files
-                    file_size_mb = get_file_size_mb(full_path)
-                    if file_size_mb > 1:
-                        large_files_skipped.append(f"{rel_path} ({file_size_mb:.1f}MB)")
-                        continue
-                    
-                    # Track important src files
-                    if file in IMPORTANT_SRC_FILES:
-                        found_important_src_files.append(file)
-                        print(f"  ✅ Found important src file: {file}")
-                    
-                    if should_include_file(full_path, file):
-                        try:
-                            with open(full_path, "r", encoding="utf-8", errors="replace") as f:
-                                content = f.read()
-                            collected.append((rel_path, content))
-                            
-                            # Extra logging for key React files
-                            if file.endswith(('.tsx', '.jsx')) and 'App' in file:
-                                print(f"  🎯 Captured React App file: {rel_path}")
-                                
-                        except Exception as e:
-                            print(f"❌ Error reading {rel_path}: {e}")
+        # Root-level frontend files only; src/ and public/ are walked on their own
+        root_level = base_dir in [".", "frontend"]
+        files = list_files(base_dir) if root_level else walk(base_dir, EXCLUDE_DIRS)
+        for rel_path, stat in files:
+            file = os.path.basename(rel_path)
+            
+            # 🔥 FIXED: Skip binary files
+            if is_binary_file(rel_path):
+                skipped_binary_files.append(rel_path)
+                continue
+            
+            # 🔥 FIXED: Skip large files (over 1MB)
+            file_size_mb = stat.st_size / (1024 * 1024)
+            if file_size_mb > 1:
+                large_files_skipped.append(f"{rel_path} ({file_size_mb:.1f}MB)")
+                continue
+            
+            # Track important src files
+            if not root_level and file in IMPORTANT_SRC_FILES:
+                found_important_src_files.append(file)
+                print(f"  ✅ Found important src file: {file}")
+            
+            if should_include_file(rel_path, file):
+                collected.append((rel_path, stat))
+                if root_level:
+                    print(f"  ✅ Found root file: {file}")
+                # Extra logging for key React files
+                elif file.endswith(('.tsx', '.jsx')) and 'App' in file:
+                    print(f"  🎯 Captured React App file: {rel_path}")
 
     # Report on what was found/skipped
     print(f"\n📋 Important src files found: {len(found_important_src_files)}")
@@ -199,72 +161,60 @@ def walk_and_collect(include_dirs):
 
     return collected
 
-def write_snapshot(files, output_path):
-    """Write collected files to snapshot file"""
-    # Ensure output directory exists
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    
-    # 🔥 FIXED: Calculate total size
-    total_chars = sum(len(content) for _, content in files)
-    total_lines = sum(content.count('\n') for _, content in files)
+# Snapshot sections, in output order
+SECTIONS = [
+    ("config", "Configuration Files"),
+    ("types", "Type Definitions"),
+    ("services", "Services & API"),
+    ("react_main", "Main React Files"),
+    ("components", "React Components"),
+    ("styles", "Styles"),
+    ("other", "Other Files")
+]
+
+def categorize(path):
+    """Group files by type for better organization"""
+    filename = os.path.basename(path)
     
-    with open(output_path, "w", encoding="utf-8") as out:
-        out.write("# FRONTEND CODE SNAPSHOT\n")
-        out.write("# Generated for React/TypeScript project\n")
-        out.write(f"# Total files: {len(files)}\n")
-        out.write(f"# Total lines: {total_lines:,}\n")
-        out.write(f"# Total characters: {total_chars:,}\n\n")
-        
-        # Group files by type for better organization
-        config_files = []
-        react_main_files = []
-        component_files = []
-        service_files = []
-        type_files = []
-        style_files = []
-        other_files = []
-        
-        for path, code in files:
-            filename = os.path.basename(path)
-            
-            # Configuration files (root level)
-            if any(path.endswith(ext) for ext in ['.json', '.js', '.ts', '.toml', '.yml', '.yaml']) and not '/src/' in path:
-                config_files.append((path, code))
-            # Main React files (App.tsx, main.tsx, etc.)
-            elif filename in IMPORTANT_SRC_FILES and filename.endswith(('.tsx', '.jsx', '.ts', '.js')):
-                react_main_files.append((path, code))
-            # Component files
-            elif '/components/' in path or '/component/' in path:
-                component_files.append((path, code))
-            # Service files  
-            elif '/services/' in path or '/service/' in path or '/api/' in path:
-                service_files.append((path, code))
-            # Type files
-            elif '/types/' in path or '/type/' in path or filename.endswith('.d.ts'):
-                type_files.append((path, code))
-            # Style files
-            elif any(path.endswith(ext) for ext in ['.css', '.scss', '.sass']):
-                style_files.append((path, code))
-            else:
-                other_files.append((path, code))
-        
-        # Write in organized sections
-        sections = [
-            ("Configuration Files", config_files),
-            ("Type Definitions", type_files),
-            ("Services & API", service_files),
-            ("Main React Files", react_main_files),
-            ("React Components", component_files),
-            ("Styles", style_files),
-            ("Other Files", other_files)
-        ]
-        
-        for section_name, section_files in sections:
-            if section_files:
-                out.write(f"\n\n# ==================== {section_name} ====================\n\n")
-                for path, code in section_files:
-                    out.write(f"\n\n# ==== {path} ====\n\n")
-                    out.write(code)
+    # Configuration files (root level)
+    if any(path.endswith(ext) for ext in ['.json', '.js', '.ts', '.toml', '.yml', '.yaml']) and not '/src/' in path:
+        return "config"
+    # Main React files (App.tsx, main.tsx, etc.)
+    elif filename in IMPORTANT_SRC_FILES and filename.endswith(('.tsx', '.jsx', '.ts', '.js')):
+        return "react_main"
+    # Component files
+    elif '/components/' in path or '/component/' in path:
+        return "components"
+    # Service files  
+    elif '/services/' in path or '/service/' in path or '/api/' in path:
+        return "services"
+    # Type files
+    elif '/types/' in path or '/type/' in path or filename.endswith('.d.ts'):
+        return "types"
+    # Style files
+    elif any(path.endswith(ext) for ext in ['.css', '.scss', '.sass']):
+        return "styles"
+    return "other"
+
+def render_header(result):
+    return (
+        "# FRONTEND CODE SNAPSHOT\n"
+        "# Generated for React/TypeScript project\n"
+        f"# Total files: {len(result.files)}\n"
+        f"# Total lines: {result.lines:,}\n"
+        f"# Total characters: {result.chars:,}\n\n"
+    )
+
+def write_snapshot(files, output_path):
+    """Stream the snapshot to disk, re-reading only files changed since the last run"""
+    return build_snapshot(
+        output_path, files,
+        categorize=categorize,
+        sections=SECTIONS,
+        render=lambda path, code: f"\n\n# ==== {path} ====\n\n{code}",
+        section_header=lambda name: f"\n\n# ==================== {name} ====================\n\n",
+        header=render_header,
+    )
 
 def main():
     """Main execution function"""
@@ -288,27 +238,28 @@ def main():
         print("⚠️  No frontend files found!")
         return
     
-    write_snapshot(collected_files, output_path)
+    result = write_snapshot(collected_files, output_path)
     
     print(f"✅ Frontend snapshot created: {output_path}")
-    print(f"📊 Files included: {len(collected_files)}")
+    print(f"📊 Files included: {len(result.files)}")
+    if result.unchanged:
+        print("♻️  No files changed since the last run, snapshot left as is")
+    else:
+        print(f"♻️  Re-read {result.read} changed file(s), reused {result.reused} from the last snapshot")
     
     # Print detailed summary
     file_types = {}
     important_files_found = []
     react_files_found = []
     
-    total_lines = 0
-    total_chars = 0
+    total_lines = result.lines
+    total_chars = result.chars
     
-    for path, content in collected_files:
+    for path in result.files:
         filename = os.path.basename(path)
         ext = os.path.splitext(path)[1] or "no extension"
         file_types[ext] = file_types.get(ext, 0) + 1
         
-        total_lines += content.count('\n')
-        total_chars += len(content)
-        
         if filename in IMPORTANT_ROOT_FILES:
             important_files_found.append(filename)
         
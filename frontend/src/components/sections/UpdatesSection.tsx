@@ -5,13 +5,17 @@ import type { CampaignUpdate } from '../../types/index';
 
 const UpdatesSection: React.FC = () => {
   const [updates, setUpdates] = useState<CampaignUpdate[]>([]);
+  const [page, setPage] = useState(1);
+  const [hasMore, setHasMore] = useState(false);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     const fetchUpdates = async () => {
       try {
         const data = await DonationAPI.getCampaignUpdates();
-        setUpdates(data);
+        setUpdates(data.results);
+        setHasMore(data.next !== null);
       } catch (error) {
         console.error('Failed to load updates:', error);
       } finally {
@@ -21,6 +25,24 @@ const UpdatesSection: React.FC = () => {
     fetchUpdates();
   }, []);
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const data = await DonationAPI.getCampaignUpdates(page + 1);
+      // Skip anything already shown if a new update shifted the pages
+      setUpdates((current) => [
+        ...current,
+        ...data.results.filter((update) => !current.some((shown) => shown.id === update.id)),
+      ]);
+      setPage(page + 1);
+      setHasMore(data.next !== null);
+    } catch (error) {
+      console.error('Failed to load more updates:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   if (loading) {
     return (
       <section className="section-spacing section-ocean-mist">
@@ -81,6 +103,19 @@ const UpdatesSection: React.FC = () => {
             ))}
           </div>
         )}
+
+        {hasMore && (
+          <div className="text-center mt-12">
+            <button
+              type="button"
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="btn-ocean-secondary inline-flex items-center justify-center gap-2"
+            >
+              {loadingMore ? 'Loading...' : 'Load more updates'}
+            </button>
+          </div>
+        )}
       </div>
     </section>
   );
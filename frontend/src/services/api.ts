@@ -3,6 +3,7 @@ import type {
   Campaign,
   Donation,
   CampaignUpdate,
+  PaginatedResponse,
   ApiError,
   CreateDonationRequest,
   CreateDonationResponse
@@ -31,9 +32,11 @@ export class DonationAPI {
     }
   }
 
-  static async getCampaignUpdates(): Promise<CampaignUpdate[]> {
+  static async getCampaignUpdates(page = 1): Promise<PaginatedResponse<CampaignUpdate>> {
     try {
-      const response = await api.get<CampaignUpdate[]>('/api/donations/updates/');
+      const response = await api.get<PaginatedResponse<CampaignUpdate>>('/api/donations/updates/', {
+        params: { page },
+      });
       return response.data;
     } catch (error) {
       throw this.handleApiError(error);
@@ -11,10 +11,27 @@ export interface Campaign {
   end_date?: string;
   featured_image?: string;
   featured_video_url?: string;
+  media?: {
+    featured_image?: MediaMetadata;
+    featured_video?: MediaMetadata;
+  };
   created_at: string;
   updated_at: string;
 }
 
+export interface MediaMetadata {
+  source_url: string;
+  type: 'image' | 'video';
+  provider?: string;
+  video_id?: string;
+  embed_url?: string;
+  title?: string;
+  width?: number;
+  height?: number;
+  thumbnail_url?: string;
+  responsive?: Record<string, string>;
+}
+
 export interface Donation {
   id: number;
   amount: number;
@@ -46,12 +63,26 @@ export interface CampaignUpdate {
   title: string;
   content: string;
   video_url?: string;
-  video_embed_code?: string;
   image_url?: string;
   has_video: boolean;
+  video_provider?: 'youtube' | 'vimeo' | '';
+  video_id?: string;
+  video_embed_url?: string;
+  video_thumbnail_url?: string;
+  media?: {
+    image?: MediaMetadata;
+    video?: MediaMetadata;
+  };
   created_at: string;
 }
 
+export interface PaginatedResponse<T> {
+  count: number;
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
 export interface CreateDonationRequest {
   ticket_quantity: number;
   donation_amount: number;